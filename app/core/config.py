@@ -17,6 +17,8 @@ class Settings(BaseSettings):
     db_user: str = "user"            # DB_USER
     db_password: str = "1234"        # DB_PASSWORD
     db_name: str = "admanager_mariadb"  # DB_NAME
+    db_pool_size: int = 10           # DB_POOL_SIZE (비동기 엔진 커넥션 풀 크기)
+    db_max_overflow: int = 20        # DB_MAX_OVERFLOW
 
     # ===== Redis 설정 =====
     redis_host: str = "127.0.0.1"    # REDIS_HOST
@@ -29,6 +31,16 @@ class Settings(BaseSettings):
     # 브라우저에는 이 이름으로 session_id가 저장된다.
     session_cookie_name: str = "admin_session"  # SESSION_COOKIE_NAME
     session_expire_seconds: int = 8640000000    # SESSION_EXPIRE_SECONDS
+    # 워커 메모리 세션 캐시. 관리자 API 마다 Redis 를 다시 조회하지 않도록 짧게 보관한다.
+    # 로그아웃은 Redis pub/sub 으로 모든 워커에 바로 전파된다.
+    session_cache_enabled: bool = True          # SESSION_CACHE_ENABLED
+    session_cache_seconds: float = 5.0          # SESSION_CACHE_SECONDS
+    session_cache_size: int = 1024              # SESSION_CACHE_SIZE
+    # ===== 관리자 비밀번호(bcrypt) 설정 =====
+    # 해시 cost. 바꾸면 기존 계정은 다음 로그인 때 새 cost 로 다시 해시된다.
+    bcrypt_rounds: int = 12                     # BCRYPT_ROUNDS
+    bcrypt_workers: int = 2                     # bcrypt 전용 스레드 수
+    bcrypt_max_pending: int = 16                # 실행 + 대기 최대 건수 (넘으면 503 LOGIN_BUSY)
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -42,6 +54,83 @@ class Settings(BaseSettings):
     buly_api_url: str = "https://www.buly.kr/api/shoturl.siso"  # BULY_API_URL
     buly_customer_id: str = "205341530"                        # BULY_CUSTOMER_ID
     buly_partner_api_id: str = "6131D27090895F3699A6B4D9F9B67023"
+    buly_timeout_seconds: float = 5.0                          # BULY_TIMEOUT_SECONDS
+
+    # ===== 단축 URL 백그라운드 처리 설정 =====
+    short_url_concurrency: int = 4             # 동시에 buly 를 호출하는 워커 태스크 수
+    short_url_queue_size: int = 10000          # 대기 큐 최대 길이 (초과분은 재기동 시 backfill)
+    short_url_max_retries: int = 3             # 재시도 횟수 (최초 시도 제외)
+    short_url_backoff_seconds: float = 0.5     # 지수 백오프 시작 간격
+    short_url_breaker_failures: int = 5        # 연속 실패 몇 번에 서킷을 열지
+    short_url_breaker_reset_seconds: float = 30.0  # 서킷이 열려 있는 시간
+    short_url_reject_ttl_seconds: int = 7 * 24 * 3600  # buly 가 거절한 URL 을 backfill 에서 건너뛰는 기간
+    short_link_cache_size: int = 10000         # target_url → short_url 메모리 LRU 크기
+
+    # ===== 광고 이미지 업로드 설정 =====
+    ad_image_max_bytes: int = 5 * 1024 * 1024  # AD_IMAGE_MAX_BYTES (기본 5MB)
+    # 파생 이미지 너비 버킷(px). 원본보다 작은 버킷만 생성한다.
+    ad_image_variant_widths: list[int] = [320, 640, 960, 1280]
+    # 파생 이미지 포맷. 설치된 Pillow 가 지원하지 않는 포맷은 건너뛴다.
+    ad_image_variant_formats: list[str] = ["webp", "avif"]
+    # 파생 이미지 인코딩용 프로세스 풀 크기
+    image_pipeline_workers: int = 2
+
+    # ===== 광고 풀(메모리 캐시) 설정 =====
+    # 활성 광고 스냅샷을 DB 에서 통째로 다시 읽는 주기(초).
+    # 광고 변경은 Redis pub/sub 이벤트로 즉시 전파되므로, 이 값은 이벤트 유실에 대비한 안전망이다.
+    ad_pool_refresh_seconds: float = 300.0  # AD_POOL_REFRESH_SECONDS
+
+    # ===== 여러 광고 조회 / 시청자별 노출 빈도 제한 =====
+    public_ads_max_n: int = 10                     # GET /api/public/ads 의 n 최대값
+    frequency_cap_impressions: int = 3             # 윈도우당 같은 시청자에게 같은 광고 최대 노출 수 (0 이면 제한 없음)
+    frequency_cap_window_seconds: int = 3600       # 빈도 제한 윈도우 (고정 구간)
+    frequency_cap_slots: int = 1024                # 시청자당 8bit 카운터 수 = 시청자당 Redis 메모리(byte)
+
+    # ===== 광고 노출 예산(일/전체 노출 한도, 페이싱) =====
+    # 워커가 Redis 에서 한 번에 빌려 오는 노출 수. 클수록 Redis 왕복이 줄고, 워커에 묶여 쓰이지 않는 몫이 늘어난다.
+    budget_lease_block: int = 20
+    budget_lease_low_water: int = 5            # 빌린 몫이 이만큼 남으면 미리 다음 몫을 빌린다
+    # 페이싱: 일 한도를 하루에 고르게 나눈 속도로 토큰을 채우는 버킷의 최대 적립량(초 단위 분량)
+    budget_pacing_burst_seconds: float = 300.0
+    # 페이싱 버킷이 비면 광고를 이 시간(초)만큼 추첨 대상에서 뺐다가 그동안 쌓인 토큰을 한 번에 빌린다.
+    # (짧을수록 고르게 나가지만 광고 풀 스냅샷 교체가 잦아진다)
+    budget_pacing_pause_seconds: float = 5.0
+    # Redis 장애 중 워커 하나가 광고 하나를 빌린 몫 없이 내보낼 수 있는 최대 노출 수 (0 이면 장애 중 노출 안 함)
+    # 이렇게 나간 노출은 초과(overshoot)로 집계하고, Redis 가 살아나면 카운터에 더한다.
+    budget_fail_open_impressions: int = 20
+    budget_retry_seconds: float = 1.0          # Redis 오류 후 다시 빌리기까지 기다리는 시간
+
+    # ===== 계측 (/metrics) =====
+    # 라우트별 응답 시간, 요청별 SQL 수/시간, 커넥션 풀 대기, Redis 왕복 시간을 Prometheus 형식으로 내보낸다.
+    metrics_enabled: bool = True               # METRICS_ENABLED
+
+    # ===== 관리자 광고 목록 설정 =====
+    # 검색 조건별 전체 건수 캐시. 광고가 바뀌면 바로 비우고, 그 외에는 TTL 동안 재사용한다.
+    ad_count_cache_seconds: float = 30.0       # AD_COUNT_CACHE_SECONDS
+    ad_count_cache_size: int = 256             # 캐시할 검색 조건(keyword) 수
+    # 제목/설명 검색을 워커 메모리 2-gram 색인으로 처리할지 (끄면 LIKE '%kw%' 전체 스캔)
+    ad_search_index_enabled: bool = True       # AD_SEARCH_INDEX_ENABLED
+    # 커서 방식 목록에서 검색 결과를 id IN (...) 으로 넘길 최대 건수 (넘으면 LIKE 로 조회)
+    ad_search_in_limit: int = 1000
+
+    # ===== 광고 일괄 작업 설정 =====
+    # 일괄 수정으로 바뀐 광고가 이 수보다 많으면 광고 필드 대신 전체 재적재 이벤트를 보낸다.
+    ad_batch_notify_limit: int = 1000
+
+    # ===== 광고 일괄 가져오기/내보내기 설정 =====
+    ad_import_batch_size: int = 500            # 한 번의 multi-row INSERT 에 넣는 행 수
+    ad_import_shorten_concurrency: int = 8     # 가져오기 중 동시에 buly 를 호출하는 최대 수
+    ad_import_max_errors: int = 100            # 응답에 담는 행 오류 최대 개수 (개수 집계는 전부)
+    ad_export_yield_per: int = 1000            # 내보내기 때 서버 측 커서에서 한 번에 가져오는 행 수
+
+    # ===== 노출/클릭 이벤트 수집 설정 =====
+    ad_event_buffer_size: int = 100000         # 워커 메모리 버퍼 최대 이벤트 수 (초과분은 버리고 집계)
+    ad_event_ship_batch: int = 500             # stream 항목 하나에 묶는 이벤트 수
+    ad_event_ship_interval_seconds: float = 0.2  # 버퍼 → Redis stream 전송 주기
+    ad_event_stream_maxlen: int = 200000       # stream 최대 항목 수 (DB 장애 시 Redis 메모리 상한)
+    ad_event_flush_entries: int = 20           # 한 번에 읽어 DB 에 넣는 stream 항목 수
+    ad_event_claim_idle_seconds: float = 60.0  # 이 시간 이상 ACK 안 된 항목은 다른 워커가 가져가 재처리
+    ad_event_max_deliveries: int = 10          # 이만큼 전달되고도 적재 못 한 항목은 dead-letter stream 으로 옮김
 
 
 settings = Settings()
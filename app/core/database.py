@@ -1,13 +1,23 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
+from app.core.metrics import CheckoutTimedPool
 
-DATABASE_URL = (
-    f"mysql+pymysql://{settings.db_user}:{settings.db_password}"
+_DB_LOCATION = (
+    f"{settings.db_user}:{settings.db_password}"
     f"@{settings.db_host}:{settings.db_port}/{settings.db_name}"
 )
 
+# 동기 드라이버 (pymysql)
+# - 테이블 생성(create_all), app/scripts/* 같은 일회성 스크립트에서만 사용한다.
+DATABASE_URL = f"mysql+pymysql://{_DB_LOCATION}"
+
+# 비동기 드라이버 (aiomysql)
+# - FastAPI 라우터/서비스는 전부 이쪽을 사용해서 쿼리 중에도 이벤트 루프를 막지 않는다.
+ASYNC_DATABASE_URL = f"mysql+aiomysql://{_DB_LOCATION}"
+
 engine = create_engine(
     DATABASE_URL,
     echo=False,        # 필요하면 True 로 켜서 SQL 로그 보기
@@ -16,12 +26,30 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=3600,  # MariaDB wait_timeout 보다 짧게 잡아서 끊긴 커넥션 재사용 방지
+    poolclass=CheckoutTimedPool,  # 커넥션 체크아웃 대기 시간 계측 (/metrics)
+)
+
+# expire_on_commit=False:
+# 커밋 후 ORM 속성에 접근할 때 암묵적인 lazy load(동기 I/O)가 일어나지 않게 한다.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    """
+    FastAPI Depends 에서 사용할 비동기 DB 세션 의존성.
+    요청마다 AsyncSession 을 하나 열고, 응답 후 닫는다.
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
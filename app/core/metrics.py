@@ -0,0 +1,348 @@
+# app/core/metrics.py
+"""
+요청/SQL/Redis 계측과 Prometheus 텍스트 형식 출력. (GET /metrics)
+
+[수집 항목]
+- http_request_duration_seconds{method,route,status} : 라우트 템플릿(/api/admin/ads/{ad_id})별 응답 시간
+- http_request_db_queries{route}, http_request_db_seconds{route} : 요청 하나가 실행한 SQL 수/시간
+- db_query_duration_seconds{operation} : SQL 한 건의 실행 시간 (SELECT/INSERT/UPDATE/DELETE/OTHER)
+- db_pool_checkout_wait_seconds : 커넥션 풀에서 커넥션을 받기까지 기다린 시간 (새 연결 생성 포함)
+- redis_command_duration_seconds{command} : Redis 명령 왕복 시간 (파이프라인은 PIPELINE 한 건)
+- 게이지: 처리 중인 요청 수, 커넥션 풀 크기/사용 중/overflow
+
+[비용]
+- 요청마다: 시각 두 번, dict 조회 몇 번, bisect 한 번. (문자열 포맷/락 없음)
+  이벤트 루프 한 스레드에서만 갱신하므로 락을 두지 않는다. (SQLAlchemy 이벤트/풀 대기도 같은 스레드의 greenlet)
+- 라벨은 라우트 템플릿이라 경로 파라미터 값마다 시계열이 늘지 않는다. 맞는 라우트가 없으면 route="unmatched".
+- 문자열 출력은 /metrics 조회 때만 만든다.
+
+값은 워커 프로세스 단위다. (admin_stats 의 다른 통계와 같음)
+"""
+import contextvars
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 응답/SQL/Redis 시간 버킷(초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 20, 50, 100)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: Labels, extra: str | None = None) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """라벨 값 튜플별 버킷 카운터. 버킷별 개수를 따로 세고, 출력할 때 누적한다."""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...], buckets: Iterable[float]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # 라벨 값 → [버킷별 개수..., +Inf 개수, 합계]
+        self._series: dict[Labels, list] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for le, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                le_label = f'le="{_number(le)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le_label)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]!r}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge:
+    """출력할 때 callback 으로 값을 읽는 게이지. (커넥션 풀처럼 상태를 이미 들고 있는 객체용)"""
+
+    def __init__(self, name: str, help_text: str, callback: Callable[[], float | None]):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+
+    def render(self) -> Iterable[str]:
+        value = self.callback()
+        if value is None:
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_number(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Histogram | Counter | Gauge] = {}
+
+    def _register(self, metric):
+        # 같은 이름으로 다시 등록하면 (엔진 재계측 등) 새 것으로 바꾼다.
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple[str, ...] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], float | None]) -> Gauge:
+        return self._register(Gauge(name, help_text, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 워커 단위 전역 레지스트리
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "HTTP 응답 시간 (라우트 템플릿별)", ("method", "route", "status"),
+)
+HTTP_REQUEST_DB_QUERIES = metrics.histogram(
+    "http_request_db_queries", "요청 하나가 실행한 SQL 수", ("route",), QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = metrics.histogram(
+    "http_request_db_seconds", "요청 하나가 SQL 실행에 쓴 시간", ("route",),
+)
+DB_QUERY_SECONDS = metrics.histogram(
+    "db_query_duration_seconds", "SQL 한 건 실행 시간", ("operation",),
+)
+DB_POOL_CHECKOUT_SECONDS = metrics.histogram(
+    "db_pool_checkout_wait_seconds", "커넥션 풀 체크아웃 대기 시간 (새 연결 생성 포함)",
+)
+REDIS_COMMAND_SECONDS = metrics.histogram(
+    "redis_command_duration_seconds", "Redis 명령 왕복 시간", ("command",),
+)
+REDIS_COMMAND_ERRORS = metrics.counter(
+    "redis_command_errors_total", "Redis 명령 오류 수", ("command",),
+)
+
+_in_flight = 0
+metrics.gauge("http_requests_in_flight", "처리 중인 HTTP 요청 수", lambda: _in_flight)
+
+
+# -------------------------
+# 요청 계측 (ASGI 미들웨어)
+# -------------------------
+class _RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# 현재 요청의 SQL 집계. 요청 밖(백그라운드 태스크)에서 실행한 SQL 은 전역 히스토그램에만 들어간다.
+_request_stats: contextvars.ContextVar[_RequestStats | None] = contextvars.ContextVar(
+    "request_stats", default=None,
+)
+
+
+def _route_label(scope: Scope, root_path: str) -> str:
+    # include_router(prefix=...) 로 붙인 라우트는 scope["route"].path 에 prefix 가 빠져 있다.
+    # FastAPI 가 남기는 실제 매칭 경로(prefix 포함)를 먼저 쓴다.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path_format = getattr(context, "path_format", None)
+    if path_format:
+        return path_format
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", None) or route.path
+    # Mount(/static 등)는 route 를 남기지 않고 root_path 에 마운트 경로를 붙인다.
+    mounted = scope.get("root_path", "")
+    if len(mounted) > len(root_path):
+        return mounted[len(root_path):] + "/{path}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    요청별 응답 시간/SQL 수/SQL 시간을 라우트 템플릿 라벨로 기록하는 ASGI 미들웨어.
+    (BaseHTTPMiddleware 를 쓰지 않는다. 응답 본문을 다시 감싸지 않도록 send 만 가로챈다)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        root_path = scope.get("root_path", "")
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        _in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _in_flight -= 1
+            _request_stats.reset(token)
+            route = _route_label(scope, root_path)
+            HTTP_REQUEST_SECONDS.observe((scope["method"], route, str(status)), elapsed)
+            HTTP_REQUEST_DB_QUERIES.observe((route,), stats.queries)
+            if stats.queries:
+                HTTP_REQUEST_DB_SECONDS.observe((route,), stats.db_seconds)
+
+
+# -------------------------
+# SQL / 커넥션 풀
+# -------------------------
+_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_start
+    operation = statement[:16].lstrip()[:6].upper()
+    DB_QUERY_SECONDS.observe((operation if operation in _OPERATIONS else "OTHER",), elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+class CheckoutTimedPool(AsyncAdaptedQueuePool):
+    """체크아웃(connect) 시간을 재는 비동기 커넥션 풀. create_async_engine(poolclass=...) 로 쓴다."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe((), time.perf_counter() - start)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """SQL 실행 시간/요청별 SQL 수 이벤트와 커넥션 풀 게이지를 건다."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+    def pool_value(method: str) -> Callable[[], float | None]:
+        # engine.dispose() 로 풀이 바뀌어도 현재 풀을 읽는다. (QueuePool 계열이 아니면 출력하지 않음)
+        def read() -> float | None:
+            fn = getattr(sync_engine.pool, method, None)
+            return fn() if fn is not None else None
+        return read
+
+    metrics.gauge("db_pool_size", "커넥션 풀 크기 (pool_size)", pool_value("size"))
+    metrics.gauge("db_pool_checked_out", "사용 중인 커넥션 수", pool_value("checkedout"))
+    metrics.gauge("db_pool_overflow", "pool_size 를 넘어 연 커넥션 수 (음수면 아직 덜 연 수)", pool_value("overflow"))
+
+
+# -------------------------
+# Redis
+# -------------------------
+def instrument_redis(client: Redis) -> None:
+    """
+    Redis 클라이언트 인스턴스의 execute_command / pipeline().execute 를 감싸 왕복 시간을 잰다.
+    서비스 모듈들이 같은 전역 인스턴스를 들고 있으므로 인스턴스 하나만 감싸면 된다.
+    (pub/sub 구독 연결은 재지 않는다)
+    """
+    if getattr(client, "_metrics_instrumented", False):
+        return
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def timed_execute_command(*args, **options):
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            return await execute_command(*args, **options)
+        except Exception:
+            REDIS_COMMAND_ERRORS.inc((command,))
+            raise
+        finally:
+            REDIS_COMMAND_SECONDS.observe((command,), time.perf_counter() - start)
+
+    def timed_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def timed_execute(*execute_args, **execute_kwargs):
+            start = time.perf_counter()
+            try:
+                return await execute(*execute_args, **execute_kwargs)
+            except Exception:
+                REDIS_COMMAND_ERRORS.inc(("PIPELINE",))
+                raise
+            finally:
+                REDIS_COMMAND_SECONDS.observe(("PIPELINE",), time.perf_counter() - start)
+
+        pipe.execute = timed_execute
+        return pipe
+
+    client.execute_command = timed_execute_command
+    client.pipeline = timed_pipeline
+    client._metrics_instrumented = True
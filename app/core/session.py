@@ -1,10 +1,15 @@
 # app/core/session.py
+import asyncio
+import logging
 import uuid
 from fastapi import Request, Response, HTTPException, status, Depends
 from redis.asyncio import Redis
 
 from app.core.config import settings
-from app.core.redis_client import get_redis
+from app.core.redis_client import get_redis, redis_client
+from app.core.ttl_cache import TTLCache
+
+log = logging.getLogger("session")
 
 # 쿠키 이름은 설정값을 그대로 사용
 SESSION_COOKIE_NAME = settings.session_cookie_name
@@ -12,10 +17,144 @@ SESSION_COOKIE_NAME = settings.session_cookie_name
 SESSION_PREFIX = "admin_session:"
 
 
+# 로그아웃한 session_id 를 모든 워커에 알리는 채널
+SESSION_INVALIDATE_CHANNEL = "admin_session:invalidate"
+
+
 def _session_key(session_id: str) -> str:
     return f"{SESSION_PREFIX}{session_id}"
 
 
+class SessionCache:
+    """
+    get_current_admin 용 워커 메모리 세션 캐시.
+
+    [동작 개요]
+    - Redis 에서 읽은 세션 Hash 를 ttl 초 동안 보관해서 같은 세션의 연속 요청은 Redis 를 다시 조회하지 않는다.
+    - 로그아웃(delete_admin_session)은 자기 워커 캐시에서 지우고
+      SESSION_INVALIDATE_CHANNEL 로 session_id 를 PUBLISH 해서 다른 워커 캐시에서도 지운다.
+    - 구독이 끊겨 있는 동안에는 무효화 알림을 받을 수 없으므로 캐시를 비우고 쓰지 않는다.
+      (재구독하면 다시 사용)
+    세션이 없는 경우(401)는 캐시하지 않는다.
+
+    [로그아웃과 겹친 조회]
+    HGETALL 을 보낸 뒤 응답을 받기 전에 로그아웃(무효화)이 처리되면, 로그아웃 전 세션을 캐시에 다시 넣을 수 있다.
+    무효화/캐시 비우기마다 세대(generation) 번호를 올리고, 조회 시작 때의 번호와 다르면 캐시에 넣지 않는다.
+    (어느 세션이든 무효화가 겹치면 그 조회 한 번만 캐시를 건너뛴다)
+    """
+
+    def __init__(self, redis: Redis, maxsize: int, ttl: float, enabled: bool = True):
+        self.redis = redis
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._subscribed = False
+        self._task: asyncio.Task | None = None
+        self._generation = 0
+
+        self.redis_lookups = 0
+        self.invalidations = 0
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and self._subscribed
+
+    def get(self, session_id: str) -> dict | None:
+        if not self.active:
+            return None
+        return self._cache.get(session_id)
+
+    @property
+    def generation(self) -> int:
+        """Redis 조회 전에 읽어 두고 set() 에 넘긴다."""
+        return self._generation
+
+    def set(self, session_id: str, data: dict, generation: int) -> None:
+        # 조회하는 동안 무효화가 있었으면 로그아웃 전 값일 수 있으므로 넣지 않는다.
+        if self.active and generation == self._generation:
+            self._cache.set(session_id, data)
+
+    def _drop(self, session_id: str) -> None:
+        self._generation += 1
+        self._cache.pop(session_id)
+
+    def _clear(self) -> None:
+        self._generation += 1
+        self._cache.clear()
+
+    async def invalidate(self, session_id: str) -> None:
+        """로그아웃 시 호출. 이 워커와 다른 워커의 캐시에서 세션을 지운다."""
+        self._drop(session_id)
+        if not self.enabled:
+            return
+        try:
+            await self.redis.publish(SESSION_INVALIDATE_CHANNEL, session_id)
+        except Exception:
+            log.exception("Session invalidation publish failed")
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(SESSION_INVALIDATE_CHANNEL)
+                # 구독 전 사이의 로그아웃을 놓쳤을 수 있으므로 비우고 시작한다.
+                self._clear()
+                self._subscribed = True
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self._drop(message["data"])
+                    self.invalidations += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Session invalidation subscriber disconnected, retrying")
+                await asyncio.sleep(1.0)
+            finally:
+                self._subscribed = False
+                self._clear()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        cache = self._cache.stats()
+        return {
+            **cache,
+            "enabled": self.enabled,
+            "active": self.active,
+            # 캐시 적중 1번 = Redis HGETALL 왕복 1번 절약
+            "redis_round_trips": self.redis_lookups,
+            "redis_round_trips_saved": cache["hits"],
+            "invalidations_received": self.invalidations,
+        }
+
+
+# 워커 단위 전역 인스턴스
+session_cache = SessionCache(
+    redis=redis_client,
+    maxsize=settings.session_cache_size,
+    ttl=settings.session_cache_seconds,
+    enabled=settings.session_cache_enabled,
+)
+
+
 async def create_admin_session(
     login_id: str,
     response: Response,
@@ -70,11 +209,13 @@ async def delete_admin_session(
     [동작 개요]
     1. 요청 쿠키에서 session_id를 읽어온다.
     2. Redis에서 "admin_session:{session_id}" 키를 삭제한다.
+       모든 워커의 메모리 세션 캐시에서도 지운다. (session_cache)
     3. 응답에 delete_cookie 를 호출해서 브라우저 쿠키도 제거한다.
     """
     session_id = request.cookies.get(SESSION_COOKIE_NAME)
     if session_id:
         await redis.delete(_session_key(session_id))
+        await session_cache.invalidate(session_id)
 
     response.delete_cookie(SESSION_COOKIE_NAME, path="/")
 
@@ -88,7 +229,7 @@ async def get_current_admin(
     [동작 개요]
     1. 요청 쿠키에서 session_id 를 읽는다.
        - 없으면 401 UNAUTHORIZED.
-    2. Redis에서 "admin_session:{session_id}" 키를 조회한다.
+    2. 메모리 세션 캐시 → 없으면 Redis에서 "admin_session:{session_id}" 키를 조회한다.
        - 세션 정보가 없거나 TTL로 만료된 경우 401 UNAUTHORIZED.
     3. 세션 Hash에서 loginId 등 필요한 값을 반환한다.
     이 함수는 FastAPI Depends 로 주입하여,
@@ -101,13 +242,20 @@ async def get_current_admin(
             detail="UNAUTHORIZED",
         )
 
+    cached = session_cache.get(session_id)
+    if cached is not None:
+        return dict(cached)
+
     key = _session_key(session_id)
+    generation = session_cache.generation
     data = await redis.hgetall(key)
+    session_cache.redis_lookups += 1
     if not data:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="UNAUTHORIZED",
         )
 
+    session_cache.set(session_id, data, generation)
     # data: {"loginId": "..."} 형태 (redis가 str dict 반환)
-    return data
+    return dict(data)
@@ -0,0 +1,169 @@
+# app/core/static_files.py
+import hashlib
+import os
+import re
+from functools import lru_cache
+from mimetypes import guess_type
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+STATIC_DIR = "static"
+
+# 내용 해시로 이름 붙인 광고 이미지/파생본 (예: <sha256>.png, <sha256>_w320.webp)
+CONTENT_ADDRESSED_RE = re.compile(r"^[0-9a-f]{64}(_w\d+)?\.[a-z0-9]+$")
+
+# 미리 압축본(.br/.gz)을 만들고 협상하는 텍스트 계열 확장자
+COMPRESSIBLE_EXTS = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+
+# Accept-Encoding 협상 우선순위 (압축률 좋은 순)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# static_url() 의 ?v= 값 길이 (내용 sha256 앞부분)
+VERSION_LEN = 12
+# 이름이 바뀌지 않는 파일: 캐시는 하되 매번 ETag 로 재검증
+REVALIDATE = "no-cache"
+
+
+@lru_cache(maxsize=256)
+def accepted_encodings(header: str) -> tuple[str, ...]:
+    """
+    Accept-Encoding 헤더 → 보낼 수 있는 압축 형식 (ENCODINGS 중, q 높은 순 / 같으면 ENCODINGS 순).
+    "br;q=0" 처럼 q=0 인 형식과, 명시하지 않았는데 "*;q=0" 인 형식은 뺀다.
+    """
+    q_values: dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        q_values[coding] = q
+
+    wildcard = q_values.get("*", 0.0)
+    ranked = []
+    for order, (encoding, _) in enumerate(ENCODINGS):
+        q = q_values.get(encoding, wildcard)
+        if q > 0:
+            ranked.append((-q, order, encoding))
+    return tuple(encoding for _, _, encoding in sorted(ranked))
+
+
+@lru_cache(maxsize=2048)
+def _digest(full_path: str, mtime_ns: int, size: int) -> str:
+    h = hashlib.sha256()
+    with open(full_path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_digest(full_path: str, stat_result: os.stat_result | None = None) -> str:
+    """파일 내용의 sha256. (경로, mtime, 크기)가 같으면 캐시된 값을 쓴다."""
+    st = stat_result or os.stat(full_path)
+    return _digest(full_path, st.st_mtime_ns, st.st_size)
+
+
+def static_url(path: str) -> str:
+    """
+    템플릿용 버전(fingerprint) URL 생성.
+    예: static_url("js/ads_list.js") → "/static/js/ads_list.js?v=1a2b3c4d5e6f"
+    내용이 바뀌면 URL 도 바뀌므로 브라우저는 immutable 캐시를 그대로 써도 된다.
+    """
+    full_path = os.path.join(STATIC_DIR, path)
+    try:
+        version = file_digest(full_path)[:VERSION_LEN]
+    except FileNotFoundError:
+        return f"/static/{path}"
+    return f"/static/{path}?v={version}"
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    캐시 친화적인 정적 파일 서빙.
+
+    - Cache-Control
+      * 내용 해시 이름의 광고 이미지, ?v= 가 지금 내용의 버전(static_url 과 같은 값)인 요청 → 1년 immutable
+      * 그 외 (?v= 가 옛 버전이거나 임의 값인 경우 포함) → no-cache (ETag 로 재검증)
+    - ETag: mtime 기반이 아닌 내용 기반 강한 ETag
+      (해시 이름 파일은 이름 자체, 나머지는 sha256 을 캐시해서 사용)
+    - 미리 압축: app/scripts/build_static.py 가 만든 .br/.gz 가 있으면
+      Accept-Encoding 에 맞춰 그 파일을 Content-Encoding 과 함께 내려준다.
+    - Range / If-Range 는 Starlette FileResponse 가 처리한다.
+    """
+
+    def _cache_control(self, name: str, digest: str, scope: Scope) -> str:
+        if CONTENT_ADDRESSED_RE.match(name):
+            return IMMUTABLE
+        # 옛 페이지나 손으로 친 ?v= 로 지금 내용이 1년 동안 공유 캐시에 박히지 않도록 값까지 맞춰 본다.
+        version = QueryParams(scope.get("query_string", b"")).get("v")
+        if version == digest[:VERSION_LEN]:
+            return IMMUTABLE
+        return REVALIDATE
+
+    def _negotiate(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        request_headers: Headers,
+    ) -> tuple[str | None, str, os.stat_result]:
+        suffixes = dict(ENCODINGS)
+        for encoding in accepted_encodings(request_headers.get("accept-encoding", "")):
+            encoded_path = full_path + suffixes[encoding]
+            try:
+                encoded_stat = os.stat(encoded_path)
+            except OSError:
+                continue
+            # 원본이 더 새로우면 압축본은 낡은 것이므로 쓰지 않는다.
+            if encoded_stat.st_mtime >= stat_result.st_mtime:
+                return encoding, encoded_path, encoded_stat
+        return None, full_path, stat_result
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        name = os.path.basename(full_path)
+        ext = os.path.splitext(name)[1].lower()
+
+        if CONTENT_ADDRESSED_RE.match(name):
+            etag_base = os.path.splitext(name)[0]
+        else:
+            etag_base = file_digest(full_path, stat_result)
+
+        headers = {"cache-control": self._cache_control(name, etag_base, scope)}
+        encoding, served_path, served_stat = None, full_path, stat_result
+        if ext in COMPRESSIBLE_EXTS:
+            headers["vary"] = "Accept-Encoding"
+            encoding, served_path, served_stat = self._negotiate(full_path, stat_result, request_headers)
+        if encoding:
+            headers["content-encoding"] = encoding
+            headers["etag"] = f'"{etag_base}-{encoding}"'
+        else:
+            headers["etag"] = f'"{etag_base}"'
+
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=guess_type(full_path)[0],
+            stat_result=served_stat,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
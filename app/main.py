@@ -1,28 +1,79 @@
 # main.py
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
-from app.core.database import engine
+from app.core.config import settings
+from app.core.database import async_engine, engine
+from app.core.metrics import MetricsMiddleware, instrument_engine, instrument_redis
+from app.core.redis_client import redis_client
+from app.core.session import session_cache
+from app.services.password_hasher import password_hasher
+from app.core.static_files import CachedStaticFiles
 from app.models import Base
 
-from app.routers import admin_auth, admin_ads, public_ads, page_ads
+from app.routers import admin_auth, admin_ads, admin_placements, admin_stats, metrics, public_ads, page_ads, redirect
+from app.services.ad_pool import ad_pool
+from app.services.ad_catalog_sync import ad_catalog
+from app.services.short_url_worker import short_url_worker
+from app.services.image_pipeline import image_pipeline
+from app.services.ad_event_pipeline import ad_events
+from app.services.impression_budget import impression_budget
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 워커 시작 시 활성 광고 풀 백그라운드 재적재 + 다른 워커의 변경 이벤트 구독 시작
+    ad_pool.start()
+    ad_catalog.start()
+    # buly 단축링크 백그라운드 워커
+    short_url_worker.start()
+    # 노출/클릭 이벤트 → Redis stream → ad_events 테이블 적재
+    ad_events.start()
+    # 로그아웃 세션 무효화 알림 구독 (메모리 세션 캐시)
+    session_cache.start()
+    yield
+    await session_cache.stop()
+    password_hasher.stop()
+    # 빌려 두고 쓰지 않은 노출 예산을 돌려준다.
+    await impression_budget.stop()
+    await ad_events.stop()
+    await image_pipeline.stop()
+    await short_url_worker.stop()
+    await ad_catalog.stop()
+    await ad_pool.stop()
 
-app = FastAPI()
 
-# DB 테이블 생성 (개발 단계에서만 사용)
-Base.metadata.create_all(bind=engine)
+app = FastAPI(lifespan=lifespan)
+
+# DB 테이블 생성 (로컬 개발에서만 사용)
+# 그 외 환경은 마이그레이션으로 스키마를 관리한다: alembic upgrade head
+if settings.app_env == "local":
+    Base.metadata.create_all(bind=engine)
+
+# 계측: 라우트별 응답 시간 + 요청별 SQL 수/시간 + 커넥션 풀 대기 + Redis 왕복 시간 → GET /metrics
+if settings.metrics_enabled:
+    instrument_engine(async_engine)
+    instrument_redis(redis_client)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
 
 # 정적 파일: / → static/index.html
 app.mount(
     "/static",  # 루트에 마운트 ("/static"으로 하고 싶으면 바꿔도 됨)
-    StaticFiles(directory="static", html=True),
+    CachedStaticFiles(directory="static", html=True),
     name="static",
 )
 
 # API 라우터
 app.include_router(admin_auth.router, prefix="/api")
 app.include_router(admin_ads.router, prefix="/api")
+app.include_router(admin_placements.router, prefix="/api")
+app.include_router(admin_stats.router, prefix="/api")
 app.include_router(public_ads.router, prefix="/api")
 
+# 클릭 리다이렉트 (/r/{ad_id})
+app.include_router(redirect.router)
+
 # 페이지 라우터
-app.include_router(page_ads.router)
\ No newline at end of file
+app.include_router(page_ads.router)
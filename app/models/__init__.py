@@ -2,9 +2,15 @@ from app.core.database import Base  # 외부에서 Base 접근용
 
 from .admin import AdminUser
 from .ad import Ad
+from .short_link import ShortLink
+from .ad_event import AdEvent
+from .placement import Placement
 
 __all__ = [
     "Base",
     "AdminUser",
     "Ad",
+    "ShortLink",
+    "AdEvent",
+    "Placement",
 ]
@@ -7,6 +7,8 @@ from sqlalchemy import (
     Text,
     DateTime,
     Boolean,
+    JSON,
+    Index,
     func,
 )
 
@@ -31,6 +33,12 @@ class Ad(Base):
     # IMAGE 전용
     # 정적 파일 경로 (예: /static/ads/1_abcdef.jpg)
     image_url = Column(String(500), nullable=True)
+    # 원본 이미지 크기 (image_pipeline 이 채움)
+    image_width = Column(Integer, nullable=True)
+    image_height = Column(Integer, nullable=True)
+    # 리사이즈/재인코딩 파생본 목록
+    # 예: [{"url": "/static/ads/<hash>_w320.webp", "width": 320, "height": 160, "format": "webp"}, ...]
+    image_variants = Column(JSON, nullable=True)
     # 원본 이동 URL (제휴 링크, 링크프라이스 딥링크 등)
     target_url = Column(String(1000), nullable=True)
     # buly 등 외부 숏링크
@@ -41,6 +49,23 @@ class Ad(Base):
     embed_width = Column(Integer, nullable=True)
     embed_height = Column(Integer, nullable=True)
 
+    # 노출할 광고 자리(placements.id) 목록. 비어 있으면 종류/크기가 맞는 모든 자리에 노출
+    placement_ids = Column(JSON, nullable=True)
+
+    # 노출 가중치 (높을수록 자주 노출, 0 이면 노출 안 됨)
+    weight = Column(Integer, nullable=False, server_default="1")
+
+    # 노출 기간 (서버 로컬 시각, 비우면 그쪽으로 제한 없음). start_at <= now < end_at 인 동안만 노출
+    # 공개 API 는 요청마다 비교하지 않고, 광고 풀이 경계 시각에 맞춰 노출 대상에 넣고 뺀다. (ad_pool 참고)
+    start_at = Column(DateTime, nullable=True)
+    end_at = Column(DateTime, nullable=True)
+
+    # 노출 예산 (비우면 제한 없음). 한도에 닿으면 그날(일 한도) 또는 이후(전체 한도)로 노출을 멈춘다.
+    daily_impression_cap = Column(Integer, nullable=True)
+    total_impression_cap = Column(Integer, nullable=True)
+    # 일 한도를 하루에 고르게 나눠 노출할지 (아침에 한도를 다 쓰지 않도록)
+    pacing = Column(Boolean, nullable=False, server_default="0")
+
     # 논리적 활성화 여부 (soft delete 용도)
     is_active = Column(Boolean, nullable=False, server_default="1")
 
@@ -56,5 +81,12 @@ class Ad(Base):
         onupdate=func.now(),
     )
 
+    __table_args__ = (
+        # 관리자 목록: WHERE is_active = 1 ORDER BY created_at DESC, id DESC (offset / 커서 방식 공통)
+        Index("ix_ads_active_created", "is_active", "created_at", "id"),
+        # 공개 광고 DB 폴백: WHERE is_active = 1 AND weight > 0
+        Index("ix_ads_active_weight", "is_active", "weight"),
+    )
+
     def __repr__(self) -> str:
         return f"<Ad(id={self.id}, title={self.title})>"
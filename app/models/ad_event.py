@@ -0,0 +1,43 @@
+from sqlalchemy import (
+    Column,
+    BigInteger,
+    Integer,
+    SmallInteger,
+    String,
+    DateTime,
+    Index,
+    UniqueConstraint,
+)
+
+from app.core.database import Base
+
+
+class AdEvent(Base):
+    """
+    광고 노출/클릭 이벤트 테이블
+    - ad_event_pipeline 이 Redis stream 에서 묶음으로 꺼내 한꺼번에 INSERT 한다.
+    - stream 항목 하나에 이벤트 여러 개가 들어가므로 (stream_id, seq) 로 이벤트를 식별한다.
+      전달은 at-least-once 라 같은 항목이 다시 들어올 수 있는데,
+      이 unique 키 덕분에 INSERT IGNORE 로 중복 없이 적재된다.
+    """
+    __tablename__ = "ad_events"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+
+    # Redis stream 항목 ID (예: "1700000000000-0") + 항목 안에서의 순번
+    stream_id = Column(String(32), nullable=False)
+    seq = Column(SmallInteger, nullable=False)
+
+    ad_id = Column(Integer, nullable=False)
+    # IMPRESSION | CLICK
+    event_type = Column(String(10), nullable=False)
+    # 이벤트가 발생한 시각 (적재 시각이 아니라 요청 처리 시각)
+    occurred_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("stream_id", "seq", name="uq_ad_events_stream_seq"),
+        Index("ix_ad_events_ad_occurred", "ad_id", "occurred_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AdEvent(id={self.id}, ad_id={self.ad_id}, type={self.event_type})>"
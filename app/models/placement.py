@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, UniqueConstraint, func
+
+from app.core.database import Base
+
+
+class Placement(Base):
+    """
+    광고 자리(placement) 테이블
+    - site + slot 으로 식별한다. (예: site="blog", slot="sidebar")
+    - width / height: 자리 크기(px). IFRAME 광고는 embed_width/embed_height 가 이 안에 들어가야 한다.
+      비워 두면 그 방향으로는 크기 제한이 없다.
+    - ad_types: 이 자리에 내보낼 수 있는 광고 종류 (쉼표 구분, 예: "IMAGE,IFRAME")
+    광고는 ads.placement_ids 로 특정 자리들을 지정하고, 지정하지 않은 광고는 종류/크기가 맞는 모든 자리에 나간다.
+    """
+    __tablename__ = "placements"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    site = Column(String(100), nullable=False)
+    slot = Column(String(100), nullable=False)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    ad_types = Column(String(40), nullable=False, server_default="IMAGE,IFRAME")
+
+    # 논리적 활성화 여부 (soft delete 용도)
+    is_active = Column(Boolean, nullable=False, server_default="1")
+
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        UniqueConstraint("site", "slot", name="uq_placements_site_slot"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Placement(id={self.id}, site={self.site}, slot={self.slot})>"
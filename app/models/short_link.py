@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+
+from app.core.database import Base
+
+
+class ShortLink(Base):
+    """
+    단축링크 캐시 테이블
+    - 정규화한 target_url 하나당 buly 단축링크 하나를 보관한다.
+    - target_url 은 최대 1000자라 그대로 unique 인덱스를 걸 수 없으므로
+      정규화 URL 의 sha256 (url_hash) 에 unique 인덱스를 건다.
+    같은 제휴 링크로 광고를 여러 번 만들어도 buly 는 한 번만 호출된다.
+    """
+    __tablename__ = "short_links"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url_hash = Column(String(64), nullable=False, unique=True, index=True)
+    # 정규화된 원본 URL
+    target_url = Column(String(1000), nullable=False)
+    short_url = Column(String(500), nullable=False)
+
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ShortLink(id={self.id}, short_url={self.short_url})>"
@@ -1,10 +1,14 @@
 # app/routers/admin_ads.py
+from datetime import datetime
 from math import ceil
-from typing import Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.common import ApiResponse
 from app.schemas.ad import (
@@ -12,10 +16,14 @@ from app.schemas.ad import (
     AdPageResponse,
     AdCreate,
     AdUpdate,
+    AdBatchRequest,
+    AdBatchUpdateRequest,
+    AdBatchResponse,
 )
 from app.core.session import get_current_admin
 from app.core.database import get_db
 from app.services.ad_service import AdService
+from app.services.ad_bulk import AdBulkService, BulkFormat, detect_format
 
 router = APIRouter(tags=["admin-ads"])
 
@@ -25,26 +33,47 @@ async def create_ad(
     title: str = Form(...),
     description: Optional[str] = Form(None),
     target_url: Optional[str] = Form(None),
+    weight: int = Form(1, ge=0),
+    placement_ids: Optional[List[int]] = Form(None),
+    start_at: Optional[datetime] = Form(None),
+    end_at: Optional[datetime] = Form(None),
+    daily_impression_cap: Optional[int] = Form(None, ge=1),
+    total_impression_cap: Optional[int] = Form(None, ge=1),
+    pacing: bool = Form(False),
     image: UploadFile = File(...),
     current_admin=Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     광고 등록
     - 이미지 파일 저장
+    - start_at / end_at 으로 노출 기간을 정할 수 있다. (비우면 제한 없음)
+    - placement_ids 를 여러 번 보내 노출할 광고 자리를 정할 수 있다. (비우면 종류/크기가 맞는 모든 자리)
+    - daily_impression_cap / total_impression_cap / pacing 으로 노출 예산을 정할 수 있다. (비우면 제한 없음)
     """
-    # 1) 이미지 저장
-    image_url = AdService.save_image(image)
+    # 1) 생성 DTO 구성 (노출 기간 검증이 실패하면 이미지를 저장하지 않는다)
+    try:
+        create_dto = AdCreate(
+            title=title,
+            description=description,
+            target_url=target_url,
+            weight=weight,
+            placement_ids=placement_ids,
+            start_at=start_at,
+            end_at=end_at,
+            daily_impression_cap=daily_impression_cap,
+            total_impression_cap=total_impression_cap,
+            pacing=pacing,
+        )
+    except ValidationError as e:
+        # 폼 필드 검증 실패와 같은 422 응답
+        raise RequestValidationError(e.errors(include_url=False))
 
-    # 2) 생성 DTO 구성
-    create_dto = AdCreate(
-        title=title,
-        description=description,
-        target_url=target_url,
-    )
+    # 2) 이미지 저장
+    image_url = await AdService.save_image(image)
 
     # 3) DB Insert
-    ad = AdService.create_ad(db, create_dto, image_url=image_url)
+    ad = await AdService.create_ad(db, create_dto, image_url=image_url)
 
     return ApiResponse(
         code=200,
@@ -58,13 +87,24 @@ async def list_ads(
     page: int = 0,
     size: int = 10,
     keyword: Optional[str] = None,
+    paging: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
     current_admin=Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     광고 목록 + 검색
+    - paging=offset (기본): page 번호로 조회
+    - paging=cursor 또는 cursor 지정: 응답의 next_cursor / prev_cursor 로 앞뒤 페이지 이동
+      (깊은 페이지도 첫 페이지와 같은 비용)
     """
-    ads, total = AdService.list_ads(db, page=page, size=size, keyword=keyword)
+    next_cursor = prev_cursor = None
+    if paging == "cursor" or cursor:
+        ads, total, next_cursor, prev_cursor = await AdService.list_ads_keyset(
+            db, size=size, keyword=keyword, cursor=cursor
+        )
+    else:
+        ads, total = await AdService.list_ads(db, page=page, size=size, keyword=keyword)
     total_pages = ceil(total / size) if size > 0 else 1
 
     page_res = AdPageResponse(
@@ -73,6 +113,8 @@ async def list_ads(
         size=size,
         total_elements=total,
         total_pages=total_pages,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
     )
 
     return ApiResponse(
@@ -82,16 +124,129 @@ async def list_ads(
     )
 
 
+@router.post("/admin/ads/import", response_model=ApiResponse[dict])
+async def import_ads(
+    request: Request,
+    format: Optional[BulkFormat] = None,
+    shorten: bool = True,
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 일괄 등록 (CSV / JSON Lines)
+    - 요청 본문에 파일 내용을 그대로 보낸다. (Content-Type: text/csv 또는 application/x-ndjson)
+      format 으로 직접 지정할 수도 있다.
+    - 컬럼/키: ad_type, title, description, target_url, image_url, embed_src, embed_width, embed_height, weight
+      (내보내기 파일을 그대로 다시 넣을 수 있다. 나머지 컬럼은 무시)
+    - shorten=false 면 단축링크를 기다리지 않고 넣은 뒤 백그라운드 워커에 맡긴다.
+    - 잘못된 행은 건너뛰고 result.errors 에 행 번호와 이유를 담는다.
+    """
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="format 은 csv 또는 jsonl 이어야 합니다.",
+        )
+
+    result = await AdBulkService.import_ads(db, request.stream(), fmt, shorten=shorten)
+
+    return ApiResponse(
+        code=200,
+        message="광고 일괄 등록 완료",
+        result=result,
+    )
+
+
+@router.get("/admin/ads/export")
+async def export_ads(
+    format: BulkFormat = "csv",
+    include_inactive: bool = False,
+    current_admin=Depends(get_current_admin),
+):
+    """
+    광고 일괄 내보내기 (CSV / JSON Lines, id 순)
+    - 테이블 전체를 메모리에 올리지 않고 서버 측 커서로 읽는 대로 흘려보낸다.
+    - include_inactive=true 면 삭제(비활성)된 광고도 포함한다.
+    """
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        AdBulkService.export_ads(format, include_inactive=include_inactive),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="ads.{format}"'},
+    )
+
+
+@router.post("/admin/ads/batch/activate", response_model=ApiResponse[AdBatchResponse])
+async def batch_activate_ads(
+    body: AdBatchRequest,
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 일괄 활성화 (ids 또는 filter)
+    - UPDATE 한 문장으로 처리하고 id 별 결과(updated / unchanged / not_found)를 돌려준다.
+    """
+    result = await AdService.batch_update(db, body.ids, body.filter, {"is_active": True})
+
+    return ApiResponse(
+        code=200,
+        message="광고 일괄 활성화 완료",
+        result=AdBatchResponse(**result),
+    )
+
+
+@router.post("/admin/ads/batch/deactivate", response_model=ApiResponse[AdBatchResponse])
+async def batch_deactivate_ads(
+    body: AdBatchRequest,
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 일괄 비활성화(soft delete) (ids 또는 filter)
+    - 장애 대응 등으로 많은 광고를 한꺼번에 내릴 때 사용한다.
+    """
+    result = await AdService.batch_update(db, body.ids, body.filter, {"is_active": False})
+
+    return ApiResponse(
+        code=200,
+        message="광고 일괄 비활성화 완료",
+        result=AdBatchResponse(**result),
+    )
+
+
+@router.post("/admin/ads/batch/update", response_model=ApiResponse[AdBatchResponse])
+async def batch_update_ads(
+    body: AdBatchUpdateRequest,
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 일괄 수정 (ids 또는 filter)
+    - weight, description 중 지정한 값을 대상 광고 모두에 똑같이 적용한다.
+    """
+    values = body.model_dump(include={"weight", "description"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="수정할 값(weight, description)이 없다.")
+
+    result = await AdService.batch_update(db, body.ids, body.filter, values)
+
+    return ApiResponse(
+        code=200,
+        message="광고 일괄 수정 완료",
+        result=AdBatchResponse(**result),
+    )
+
+
 @router.get("/admin/ads/{ad_id}", response_model=ApiResponse[AdResponse])
 async def get_ad(
     ad_id: int,
     current_admin=Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     광고 단건 조회
     """
-    ad = AdService.get_ad(db, ad_id)
+    ad = await AdService.get_ad(db, ad_id)
     if not ad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,13 +265,13 @@ async def update_ad(
     ad_id: int,
     body: AdUpdate,
     current_admin=Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     광고 수정 (JSON 기반 부분 업데이트)
     - 이미지까지 PATCH 하고 싶으면 별도 엔드포인트로 빼거나 multipart 처리 추가
     """
-    ad = AdService.get_ad(db, ad_id)
+    ad = await AdService.get_ad(db, ad_id)
     if not ad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -124,7 +279,7 @@ async def update_ad(
         )
 
     update_data = body.model_dump(exclude_unset=True)
-    updated = AdService.update_ad(db, ad, update_data)
+    updated = await AdService.update_ad(db, ad, update_data)
 
     return ApiResponse(
         code=200,
@@ -137,19 +292,19 @@ async def update_ad(
 async def delete_ad(
     ad_id: int,
     current_admin=Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     광고 삭제 (soft delete: is_active = False)
     """
-    ad = AdService.get_ad(db, ad_id)
+    ad = await AdService.get_ad(db, ad_id)
     if not ad:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="광고를 찾을 수 없습니다.",
         )
 
-    AdService.delete_ad(db, ad)
+    await AdService.delete_ad(db, ad)
 
     return ApiResponse(
         code=200,
@@ -161,7 +316,7 @@ async def delete_ad(
 async def create_iframe_ad(
     body: AdCreate,
     current_admin=Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     외부 위젯(iframe) 광고 등록 (JSON)
@@ -171,7 +326,7 @@ async def create_iframe_ad(
     if not body.embed_src:
         raise HTTPException(status_code=400, detail="embed_src는 필수다.")
 
-    ad = AdService.create_iframe_ad(db, body)
+    ad = await AdService.create_iframe_ad(db, body)
 
     return ApiResponse(
         code=200,
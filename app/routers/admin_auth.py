@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, Response, Request
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.common import ApiResponse
 from app.schemas.admin import AdminLoginRequest, AdminMeResponse
@@ -19,7 +19,7 @@ router = APIRouter(tags=["admin-auth"])
 async def admin_login(
     req: AdminLoginRequest,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     redis=Depends(get_redis),
 ):
     """
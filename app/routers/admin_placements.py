@@ -0,0 +1,102 @@
+# app/routers/admin_placements.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.common import ApiResponse
+from app.schemas.placement import PlacementCreate, PlacementUpdate, PlacementResponse
+from app.core.session import get_current_admin
+from app.core.database import get_db
+from app.services.placement_service import PlacementService
+
+router = APIRouter(tags=["admin-placements"])
+
+
+@router.get("/admin/placements", response_model=ApiResponse[List[PlacementResponse]])
+async def list_placements(
+    site: Optional[str] = Query(None, max_length=100),
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 자리 목록 (site 로 거를 수 있음)
+    """
+    placements = await PlacementService.list_placements(db, site)
+
+    return ApiResponse(
+        code=200,
+        message="광고 자리 목록 조회 성공",
+        result=[PlacementResponse.model_validate(p) for p in placements],
+    )
+
+
+@router.post("/admin/placements", response_model=ApiResponse[PlacementResponse])
+async def create_placement(
+    body: PlacementCreate,
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 자리 등록
+    - site + slot 이 같은 자리는 하나만 둘 수 있다.
+    """
+    placement = await PlacementService.create_placement(db, body)
+
+    return ApiResponse(
+        code=200,
+        message="광고 자리 등록 성공",
+        result=PlacementResponse.model_validate(placement),
+    )
+
+
+@router.patch("/admin/placements/{placement_id}", response_model=ApiResponse[PlacementResponse])
+async def update_placement(
+    placement_id: int,
+    body: PlacementUpdate,
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 자리 수정 (크기 / 광고 종류). width, height 에 null 을 주면 크기 제한을 푼다.
+    """
+    placement = await PlacementService.get_placement(db, placement_id)
+    if not placement or not placement.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="광고 자리를 찾을 수 없습니다.",
+        )
+
+    updated = await PlacementService.update_placement(db, placement, body.model_dump(exclude_unset=True))
+
+    return ApiResponse(
+        code=200,
+        message="광고 자리 수정 성공",
+        result=PlacementResponse.model_validate(updated),
+    )
+
+
+@router.delete("/admin/placements/{placement_id}", response_model=ApiResponse[None])
+async def delete_placement(
+    placement_id: int,
+    current_admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    광고 자리 삭제 (soft delete: is_active = False)
+    - 이 자리만 지정한 광고는 다시 등록될 때까지 어느 자리에도 나가지 않는다.
+    """
+    placement = await PlacementService.get_placement(db, placement_id)
+    if not placement or not placement.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="광고 자리를 찾을 수 없습니다.",
+        )
+
+    await PlacementService.delete_placement(db, placement)
+
+    return ApiResponse(
+        code=200,
+        message="광고 자리 삭제 성공",
+        result=None,
+    )
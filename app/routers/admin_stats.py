@@ -0,0 +1,150 @@
+# app/routers/admin_stats.py
+from fastapi import APIRouter, Depends
+
+from app.schemas.common import ApiResponse
+from app.core.session import get_current_admin, session_cache
+from app.services.ad_pool import ad_pool
+from app.services.ad_catalog_sync import ad_catalog
+from app.services.ad_search import ad_search
+from app.services.frequency_cap import frequency_cap
+from app.services.placement_index import placement_index
+from app.services.short_url_worker import short_url_worker
+from app.services.image_pipeline import image_pipeline
+from app.services.ad_event_pipeline import ad_events
+from app.services.password_hasher import password_hasher
+from app.services.impression_budget import impression_budget
+
+router = APIRouter(tags=["admin-stats"])
+
+
+@router.get("/admin/stats/ad-pool", response_model=ApiResponse[dict])
+async def ad_pool_stats(
+    current_admin=Depends(get_current_admin),
+):
+    """
+    메모리 광고 풀 상태 조회
+    - hit/miss 횟수, 적재된 활성 광고 수, 마지막 재적재 이후 경과 시간(초)
+    - sync: 워커 간 변경 이벤트 발행/반영 현황 (버전, 전체 재적재 횟수, 마지막 전파 지연)
+    - search: 제목/설명 2-gram 색인 현황 (색인 광고 수, gram 수, 마지막 동기화 시간)
+    - frequency_cap: 시청자별 노출 빈도 제한 현황 (조회 수, 한도로 뺀 광고 수, 예비 광고로 채운 수)
+    - placements: 광고 자리 색인 현황 (자리 수, 자리 지정 광고 수, 없는 자리/후보 없는 자리 조회 수)
+    """
+    return ApiResponse(
+        code=200,
+        message="광고 풀 상태 조회 성공",
+        result={
+            **ad_pool.stats(),
+            "sync": ad_catalog.stats(),
+            "search": ad_search.stats(),
+            "frequency_cap": frequency_cap.stats(),
+            "placements": placement_index.stats(),
+        },
+    )
+
+
+@router.get("/admin/stats/short-url", response_model=ApiResponse[dict])
+async def short_url_stats(
+    current_admin=Depends(get_current_admin),
+):
+    """
+    buly 단축링크 백그라운드 워커 상태 조회
+    - 대기 중인 작업 수, 성공/실패/재시도 횟수, 서킷 브레이커 상태
+    """
+    return ApiResponse(
+        code=200,
+        message="단축링크 워커 상태 조회 성공",
+        result=short_url_worker.stats(),
+    )
+
+
+@router.get("/admin/stats/image-pipeline", response_model=ApiResponse[dict])
+async def image_pipeline_stats(
+    current_admin=Depends(get_current_admin),
+):
+    """
+    광고 이미지 파생본 생성 파이프라인 상태 조회
+    """
+    return ApiResponse(
+        code=200,
+        message="이미지 파이프라인 상태 조회 성공",
+        result=image_pipeline.stats(),
+    )
+
+
+@router.get("/admin/stats/ad-events", response_model=ApiResponse[dict])
+async def ad_event_stats(
+    current_admin=Depends(get_current_admin),
+):
+    """
+    노출/클릭 이벤트 수집 파이프라인 상태 조회
+    - 버퍼 크기, 버린 이벤트 수, stream 전송/DB 적재 건수, 재처리(claim) 건수, dead-letter 로 옮긴 건수
+    """
+    return ApiResponse(
+        code=200,
+        message="이벤트 파이프라인 상태 조회 성공",
+        result=ad_events.stats(),
+    )
+
+
+@router.get("/admin/stats/session-cache", response_model=ApiResponse[dict])
+async def session_cache_stats(
+    current_admin=Depends(get_current_admin),
+):
+    """
+    관리자 세션 메모리 캐시 상태 조회
+    - 적중률, Redis 조회 횟수 / 절약한 Redis 왕복 수, 받은 로그아웃 무효화 알림 수
+    """
+    return ApiResponse(
+        code=200,
+        message="세션 캐시 상태 조회 성공",
+        result=session_cache.stats(),
+    )
+
+
+@router.get("/admin/stats/password-hasher", response_model=ApiResponse[dict])
+async def password_hasher_stats(
+    current_admin=Depends(get_current_admin),
+):
+    """
+    bcrypt 전용 스레드 풀 상태 조회
+    - 실행/대기 중인 건수, 완료/거절(503) 횟수, 현재 cost, 로그인 시 재해시한 계정 수
+    """
+    return ApiResponse(
+        code=200,
+        message="비밀번호 해시 풀 상태 조회 성공",
+        result=password_hasher.stats(),
+    )
+
+
+@router.get("/admin/stats/impression-budget", response_model=ApiResponse[dict])
+async def impression_budget_stats(
+    current_admin=Depends(get_current_admin),
+):
+    """
+    광고 노출 예산(일/전체 한도, 페이싱) 상태 조회
+    - 이 워커가 빌려 둔 몫, 빌린/돌려준/내보낸/거절한 노출 수, 한도 소진으로 멈춘 광고 수
+    - overshoot_by_ad: Redis 장애 중 몫 없이 나간 노출 수 (전체 워커 합계, 광고 id 별)
+    """
+    return ApiResponse(
+        code=200,
+        message="노출 예산 상태 조회 성공",
+        result={
+            **impression_budget.stats(),
+            "overshoot_by_ad": await impression_budget.overshoot_by_ad(),
+        },
+    )
+
+
+@router.get("/admin/stats/impression-budget/{ad_id}", response_model=ApiResponse[dict])
+async def ad_impression_budget(
+    ad_id: int,
+    current_admin=Depends(get_current_admin),
+):
+    """
+    광고 하나의 노출 예산 사용량 (전체/오늘 빌려 간 수, 누적 초과 노출 수)
+    """
+    return ApiResponse(
+        code=200,
+        message="광고 노출 예산 조회 성공",
+        result=await impression_budget.usage(ad_id),
+    )
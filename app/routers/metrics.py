@@ -0,0 +1,16 @@
+# app/routers/metrics.py
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Prometheus scrape 엔드포인트 (텍스트 형식 0.0.4)
+    - 라우트별 응답 시간, 요청별 SQL 수/시간, SQL 실행 시간, 커넥션 풀 대기/사용량, Redis 명령 왕복 시간
+    - 값은 이 요청을 받은 워커 프로세스의 것이다.
+    """
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
@@ -3,7 +3,11 @@ from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
+from app.core.static_files import static_url
+
 templates = Jinja2Templates(directory="app/templates")
+# JS/CSS 를 내용 해시가 붙은 URL 로 내보내기 위한 템플릿 함수
+templates.env.globals["static_url"] = static_url
 
 router = APIRouter(tags=["pages-ads"])
 
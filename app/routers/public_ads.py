@@ -1,46 +1,179 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
 
 from app.schemas.common import ApiResponse
 from app.schemas.ad import PublicAdResponse
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.services.ad_service import AdService
+from app.services.ad_pool import PooledAd, ad_pool, api_response_bytes, render_public_ad
+from app.services.ad_event_pipeline import ad_events, IMPRESSION, CLICK
+from app.services.frequency_cap import frequency_cap
+from app.services.placement_index import placement_index
+from app.services.impression_budget import impression_budget
 
 router = APIRouter(tags=["public-ads"])
 
+# 노출 예산이 바닥난 광고를 뽑았을 때 다시 뽑는 최대 횟수
+_PICK_ATTEMPTS = 4
+
+
+def _pick_for_placement(site: str | None, slot: str | None, count: int) -> list[tuple[PooledAd, bytes]]:
+    """
+    site/slot 광고 자리에 맞는 서로 다른 광고를 최대 count 개 고른다. (광고 JSON 포함)
+    자리 → 후보 역색인(placement_index)에서 바로 추첨하며, 자리 크기와 맞지 않는 광고는 후보에 없다.
+    """
+    if not site or not slot:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="PLACEMENT_REQUIRES_SITE_AND_SLOT",
+        )
+    snapshot = ad_pool.snapshot
+    if snapshot is None or not placement_index.ready:
+        # 자리 정보는 광고 풀과 함께 적재되므로, 적재 전에는 DB 폴백 대신 잠시 뒤 다시 요청하게 한다.
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AD_POOL_NOT_READY",
+            headers={"Retry-After": "1"},
+        )
+    placement = placement_index.placement(site, slot)
+    if placement is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PLACEMENT_NOT_FOUND",
+        )
+    return [(ad, snapshot.body(ad)) for ad in placement_index.pick_many(placement, count)]
+
 
 @router.get("/public/ad", response_model=ApiResponse[PublicAdResponse])
-async def random_ad(db: Session = Depends(get_db)):
+async def random_ad(
+    site: Optional[str] = Query(None, max_length=100),
+    slot: Optional[str] = Query(None, max_length=100),
+):
     """
     여러 백엔드 서버에서 공용으로 사용하는 랜덤 광고 조회 API.
 
     - is_active=True
-    - (start_at <= now <= end_at) 또는 기간 미설정
+    - (start_at <= now < end_at) 또는 기간 미설정
     중에서 랜덤 1개 선택.
+
+    평소에는 메모리 광고 풀(ad_pool)에서 O(1) 로 고르고,
+    풀이 아직 적재되지 않은 경우에만 DB 를 직접 조회한다.
+    노출 기간은 요청마다 비교하지 않는다. 광고 풀이 경계 시각에 타이머로 추첨 대상을 바꿔 둔다.
+
+    응답 본문은 광고 풀이 광고별로 미리 직렬화해 둔 JSON bytes 를 그대로 내려준다.
+    (요청마다 pydantic 모델 생성/검증/직렬화를 하지 않는다. 형식은 response_model 과 같다)
+    DB 세션도 폴백할 때만 연다. (요청마다 get_db 세션을 만들고 닫지 않도록)
+
+    site + slot 을 주면 그 광고 자리에 맞는 광고(자리 지정 광고 + 종류/크기가 맞는 미지정 광고) 중에서 고른다.
+
+    노출 예산(일/전체 한도)이 있는 광고는 워커가 빌려 둔 몫에서 1 을 빼고 내보낸다. (impression_budget)
+    몫이 없는 광고가 뽑히면 다시 뽑는다.
     """
-    ad = AdService.random_ad(db)
-    if not ad:
+    picked = None
+    for _ in range(_PICK_ATTEMPTS):
+        if site is not None or slot is not None:
+            picked = next(iter(_pick_for_placement(site, slot, 1)), None)
+        else:
+            picked = ad_pool.pick_rendered()
+        if picked is None or impression_budget.consume(picked[0]):
+            break
+        picked = None
+    if picked is None and not ad_pool.is_loaded:
+        async with AsyncSessionLocal() as db:
+            orm_ad = await AdService.random_ad(db)
+        if orm_ad is not None:
+            ad = PooledAd.from_orm(orm_ad)
+            if impression_budget.consume(ad):
+                picked = ad, render_public_ad(ad)
+    if not picked:
         # 유효한 광고가 1개도 없을 때
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="NO_ACTIVE_AD",
         )
 
-    dto = PublicAdResponse(
-        id=ad.id,
-        ad_type=(ad.ad_type or "IMAGE"),
-        title=ad.title,
-        description=ad.description,
-        image_url=ad.image_url,
-        short_url=ad.short_url,
-        target_url=ad.target_url,
-        embed_src=getattr(ad, "embed_src", None),
-        embed_width=getattr(ad, "embed_width", None),
-        embed_height=getattr(ad, "embed_height", None),
-    )
+    ad, body = picked
+    # 노출 이벤트는 메모리 버퍼에 붙이기만 하고, 적재는 백그라운드 파이프라인이 묶어서 한다.
+    ad_events.record(ad.id, IMPRESSION)
+
+    return Response(content=api_response_bytes("광고 조회 성공", body), media_type="application/json")
+
+
+@router.get("/public/ads", response_model=ApiResponse[List[PublicAdResponse]])
+async def random_ads(
+    n: int = Query(3, ge=1, le=settings.public_ads_max_n),
+    viewer: Optional[str] = Query(None, max_length=128),
+    site: Optional[str] = Query(None, max_length=100),
+    slot: Optional[str] = Query(None, max_length=100),
+):
+    """
+    한 페이지의 여러 광고 자리를 한 번에 채우는 API. 서로 다른 광고를 최대 n 개 돌려준다.
+
+    - viewer(쿠키 id 등 시청자 식별값)를 주면 시청자별 노출 빈도 제한을 적용한다.
+      (윈도우당 같은 광고 최대 FREQUENCY_CAP_IMPRESSIONS 번, Redis 왕복 1번)
+      제한에 걸린 광고는 빼므로 n 개보다 적게(빈 목록 포함) 돌려줄 수 있다.
+    - site + slot 을 주면 그 광고 자리에 맞는 광고 중에서 고른다. (/public/ad 와 같음)
+    - 노출 예산 몫이 없는 광고는 뺀다. (/public/ad 와 같음)
+    - 광고 풀이 적재되기 전에는 DB 에서 광고 1개만 골라 돌려준다.
+    """
+    # 빈도 제한을 적용하면 제한에 걸린 광고를 대신할 예비 후보까지 같이 뽑는다.
+    count = n * 2 if frequency_cap.enabled and viewer else n
+    if site is not None or slot is not None:
+        picked = _pick_for_placement(site, slot, count)
+    else:
+        picked = ad_pool.pick_many(count)
+
+    if picked is None:
+        async with AsyncSessionLocal() as db:
+            orm_ad = await AdService.random_ad(db)
+        if orm_ad is not None:
+            ad = PooledAd.from_orm(orm_ad)
+            picked = [(ad, render_public_ad(ad))]
+    if picked:
+        # 노출 예산 몫이 없는 광고는 빈도 제한에 넘기기 전에 뺀다.
+        picked = [(ad, body) for ad, body in picked if impression_budget.available(ad)]
+    if not picked:
+        # 유효한 광고가 1개도 없을 때
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="NO_ACTIVE_AD",
+        )
+
+    bodies = {ad.id: body for ad, body in picked}
+    ads = [ad for ad, _ in picked]
+    if frequency_cap.enabled and viewer:
+        ads = await frequency_cap.select(viewer, ads, n)
+    else:
+        ads = ads[:n]
+    ads = [ad for ad in ads if impression_budget.consume(ad)]
+
+    for ad in ads:
+        ad_events.record(ad.id, IMPRESSION)
+
+    result = b"[" + b",".join(bodies[ad.id] for ad in ads) + b"]"
+    return Response(content=api_response_bytes("광고 목록 조회 성공", result), media_type="application/json")
+
+
+@router.post("/public/ad/{ad_id}/click", response_model=ApiResponse[None])
+async def click_ad(ad_id: int):
+    """
+    광고 클릭 기록 API.
+    - 프론트에서 광고를 클릭할 때 호출 (navigator.sendBeacon 등)
+    - DB 를 건드리지 않고 이벤트 버퍼에 기록만 한다.
+    """
+    snapshot = ad_pool.snapshot
+    if snapshot is not None and ad_id not in snapshot.by_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="AD_NOT_FOUND",
+        )
+
+    ad_events.record(ad_id, CLICK)
 
     return ApiResponse(
         code=200,
-        message="광고 조회 성공",
-        result=dto,
+        message="광고 클릭 기록 성공",
+        result=None,
     )
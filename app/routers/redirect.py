@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.ad import Ad
+from app.services.ad_pool import ad_pool
+from app.services.ad_event_pipeline import ad_events, CLICK
+
+router = APIRouter(tags=["redirect"])
+
+# 클릭마다 서버를 거쳐야 집계되므로 브라우저/프록시가 리다이렉트를 캐시하지 않게 한다.
+_NO_STORE = {"Cache-Control": "no-store"}
+
+
+async def _lookup_destination(ad_id: int) -> str | None:
+    """풀에 없는 광고(다른 워커에서 방금 생성 등)는 PK 로 한 번만 조회한다."""
+    async with AsyncSessionLocal() as db:
+        row = (
+            await db.execute(
+                select(Ad.short_url, Ad.target_url).where(Ad.id == ad_id, Ad.is_active == True)
+            )
+        ).first()
+    if row is None:
+        return None
+    return row.short_url or row.target_url
+
+
+@router.get("/r/{ad_id}", include_in_schema=False)
+async def redirect_ad(ad_id: int):
+    """
+    광고 클릭 리다이렉트.
+
+    - 메모리 광고 풀(id → 광고)에서 이동할 URL(short_url, 없으면 target_url)을 찾아 302 로 보낸다.
+      평소에는 DB 를 전혀 건드리지 않는다.
+    - 클릭은 이벤트 버퍼에 기록만 하고, 적재는 ad_event_pipeline 이 묶어서 한다.
+    - 풀에 없으면 PK 조회 1번으로 대체한다.
+    """
+    snapshot = ad_pool.snapshot
+    ad = snapshot.by_id.get(ad_id) if snapshot is not None else None
+
+    if ad is not None:
+        url = ad.short_url or ad.target_url
+    else:
+        url = await _lookup_destination(ad_id)
+
+    if not url:
+        # 존재하지 않거나 비활성, 또는 이동 URL 이 없는 광고(IFRAME 등)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="AD_NOT_FOUND",
+        )
+
+    ad_events.record(ad_id, CLICK)
+    return RedirectResponse(url, status_code=status.HTTP_302_FOUND, headers=_NO_STORE)
@@ -2,25 +2,80 @@
 from datetime import datetime
 from typing import Optional, List, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 AdType = Literal["IMAGE", "IFRAME"]
 
+
+def to_local_naive(value: datetime | None) -> datetime | None:
+    """
+    DB 의 DateTime 컬럼은 시간대 없이 서버 로컬 시각으로 저장한다. (created_at 의 now() 와 같은 기준)
+    시간대가 붙은 값(예: 2026-10-18T10:00:00+09:00)은 로컬 시각으로 바꾼 뒤 시간대를 뗀다.
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+class AdSchedule(BaseModel):
+    """
+    광고 노출 기간. start_at <= now < end_at 인 동안만 공개 API 에 나간다. (비우면 그쪽으로 제한 없음)
+    """
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+
+    @field_validator("start_at", "end_at")
+    @classmethod
+    def _local_naive(cls, value):
+        return to_local_naive(value)
+
+    @model_validator(mode="after")
+    def _ordered(self):
+        if self.start_at is not None and self.end_at is not None and self.start_at >= self.end_at:
+            raise ValueError("end_at 은 start_at 보다 뒤여야 한다.")
+        return self
+
+
+class ImageVariant(BaseModel):
+    """리사이즈/재인코딩된 광고 이미지 파생본"""
+    url: str
+    width: int
+    height: int
+    format: str
+
+
 class AdBase(BaseModel):
     ad_type: AdType = "IMAGE"
     title: str
     description: Optional[str] = None
 
     image_url: Optional[str] = None
+    image_width: Optional[int] = None
+    image_height: Optional[int] = None
+    image_variants: Optional[List[ImageVariant]] = None
     target_url: Optional[str] = None
     short_url: Optional[str] = None
 
     embed_src: Optional[str] = None
     embed_width: Optional[int] = None
     embed_height: Optional[int] = None
-   
 
-class AdCreate(BaseModel):
+    # 노출 가중치
+    weight: int = 1
+    # 노출할 광고 자리 id (없으면 종류/크기가 맞는 모든 자리)
+    placement_ids: Optional[List[int]] = None
+
+    # 노출 기간 (없으면 제한 없음)
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+
+    # 노출 예산 (없으면 제한 없음)
+    daily_impression_cap: Optional[int] = None
+    total_impression_cap: Optional[int] = None
+    pacing: bool = False
+
+
+class AdCreate(AdSchedule):
     ad_type: Literal["IMAGE", "IFRAME"] = "IMAGE"
     title: str
     description: Optional[str] = None
@@ -33,11 +88,65 @@ class AdCreate(BaseModel):
     embed_width: Optional[int] = 300
     embed_height: Optional[int] = 250
 
-class AdUpdate(BaseModel):
+    # 노출 가중치 (0 이면 노출 안 됨)
+    weight: int = Field(default=1, ge=0)
+    # 노출할 광고 자리 id (없거나 빈 목록이면 종류/크기가 맞는 모든 자리)
+    placement_ids: Optional[List[int]] = Field(default=None, max_length=1000)
+
+    # 노출 예산: 일/전체 노출 한도 (없으면 제한 없음), 일 한도를 하루에 고르게 나눠 노출할지
+    daily_impression_cap: Optional[int] = Field(default=None, ge=1)
+    total_impression_cap: Optional[int] = Field(default=None, ge=1)
+    pacing: bool = False
+
+class AdUpdate(AdSchedule):
     title: Optional[str] = None
     description: Optional[str] = None
     target_url: Optional[str] = None
-   
+    weight: Optional[int] = Field(default=None, ge=0)
+    # 노출할 광고 자리 id. 빈 목록이면 지정을 풀어 종류/크기가 맞는 모든 자리에 노출
+    placement_ids: Optional[List[int]] = Field(default=None, max_length=1000)
+    # start_at / end_at 은 null 을 보내면 그쪽 기간 제한을 푼다. (보내지 않으면 그대로)
+
+    # 노출 예산. 한도는 null 을 보내면 제한을 푼다. (보내지 않으면 그대로)
+    daily_impression_cap: Optional[int] = Field(default=None, ge=1)
+    total_impression_cap: Optional[int] = Field(default=None, ge=1)
+    pacing: Optional[bool] = None
+
+
+class AdBatchFilter(BaseModel):
+    """일괄 작업 대상 조건. 지정한 조건을 모두 만족하는 광고가 대상 (빈 객체면 전체)"""
+    keyword: Optional[str] = None
+    ad_type: Optional[AdType] = None
+    is_active: Optional[bool] = None
+
+
+class AdBatchRequest(BaseModel):
+    """ids 또는 filter 중 하나로 대상을 지정한다."""
+    ids: Optional[List[int]] = Field(default=None, min_length=1, max_length=10000)
+    filter: Optional[AdBatchFilter] = None
+
+    @model_validator(mode="after")
+    def _one_target(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("ids 와 filter 중 하나만 지정해야 한다.")
+        return self
+
+
+class AdBatchUpdateRequest(AdBatchRequest):
+    weight: Optional[int] = Field(default=None, ge=0)
+    description: Optional[str] = None
+
+
+class AdBatchItemResult(BaseModel):
+    id: int
+    # updated: 바뀜 / unchanged: 이미 같은 값 / not_found: 없는 id
+    status: Literal["updated", "unchanged", "not_found"]
+
+
+class AdBatchResponse(BaseModel):
+    matched: int
+    updated: int
+    results: List[AdBatchItemResult]
 
 
 class AdResponse(AdBase):
@@ -53,6 +162,9 @@ class AdPageResponse(BaseModel):
     size: int
     total_elements: int
     total_pages: int
+    # 커서(keyset) 방식일 때만 채워진다. 그 방향으로 페이지가 없으면 None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class PublicAdResponse(BaseModel):
@@ -62,6 +174,10 @@ class PublicAdResponse(BaseModel):
     description: Optional[str] = None
 
     image_url: Optional[str] = None
+    # 원본 크기 + 파생본 목록 (임베드하는 쪽에서 가장 작은 적합한 이미지를 고를 수 있도록)
+    image_width: Optional[int] = None
+    image_height: Optional[int] = None
+    image_variants: Optional[List[ImageVariant]] = None
     short_url: Optional[str] = None
     target_url: Optional[str] = None
 
@@ -0,0 +1,43 @@
+# app/schemas/placement.py
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.ad import AdType
+
+
+class PlacementCreate(BaseModel):
+    site: str = Field(min_length=1, max_length=100)
+    slot: str = Field(min_length=1, max_length=100)
+    # 자리 크기(px). 비우면 그 방향으로는 크기 제한 없음 (IFRAME 광고 크기 비교에만 사용)
+    width: Optional[int] = Field(default=None, gt=0)
+    height: Optional[int] = Field(default=None, gt=0)
+    # 이 자리에 내보낼 광고 종류
+    ad_types: List[AdType] = Field(default=["IMAGE", "IFRAME"], min_length=1)
+
+
+class PlacementUpdate(BaseModel):
+    width: Optional[int] = Field(default=None, gt=0)
+    height: Optional[int] = Field(default=None, gt=0)
+    ad_types: Optional[List[AdType]] = Field(default=None, min_length=1)
+
+
+class PlacementResponse(BaseModel):
+    id: int
+    site: str
+    slot: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    ad_types: List[str]
+    is_active: bool
+
+    @field_validator("ad_types", mode="before")
+    @classmethod
+    def _split_ad_types(cls, value):
+        # DB 에는 "IMAGE,IFRAME" 처럼 쉼표로 이어 저장한다.
+        if isinstance(value, str):
+            return [t for t in value.split(",") if t]
+        return value
+
+    class Config:
+        from_attributes = True  # SQLAlchemy ORM 객체 -> Pydantic 변환 허용
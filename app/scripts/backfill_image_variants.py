@@ -0,0 +1,54 @@
+# app/scripts/backfill_image_variants.py
+"""
+파생 이미지가 없는 기존 IMAGE 광고에 리사이즈/WebP 파생본을 만들어 채운다.
+
+실행: python -m app.scripts.backfill_image_variants
+"""
+import os
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.ad import Ad
+from app.services.image_pipeline import generate_variants
+
+
+def main():
+    db: Session = SessionLocal()
+
+    try:
+        ads = (
+            db.query(Ad)
+            .filter(Ad.image_url.isnot(None), Ad.image_variants.is_(None))
+            .all()
+        )
+        print(f"대상 광고: {len(ads)}건")
+
+        for ad in ads:
+            file_path = ad.image_url.lstrip("/")
+            if not os.path.exists(file_path):
+                print(f"- ad_id={ad.id} 원본 없음: {file_path}")
+                continue
+
+            result = generate_variants(
+                file_path,
+                os.path.dirname(file_path),
+                ad.image_url.rsplit("/", 1)[0],
+                settings.ad_image_variant_widths,
+                settings.ad_image_variant_formats,
+            )
+            ad.image_width = result["width"]
+            ad.image_height = result["height"]
+            ad.image_variants = result["variants"]
+            db.commit()
+            print(f"- ad_id={ad.id} 파생본 {len(result['variants'])}개")
+
+        print("===== 완료 (실행 중인 서버는 다음 광고 풀 재적재 때 반영) =====")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
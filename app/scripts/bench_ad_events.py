@@ -0,0 +1,95 @@
+# app/scripts/bench_ad_events.py
+"""
+노출/클릭 이벤트 파이프라인 벤치마크 (워커 1개 기준 events/sec).
+
+- record : 요청 경로 비용. 메모리 버퍼에 붙이는 것만 측정
+- codec  : stream 항목 인코딩 + flusher 의 디코딩(INSERT row 변환) 비용
+- e2e    : (--e2e) 설정된 Redis / MariaDB 로 record → XADD → XREADGROUP → INSERT → XACK 전체
+           ad_events 테이블에 실제로 행이 쌓이므로 개발 DB 에서만 실행할 것
+
+실행: python -m app.scripts.bench_ad_events [--e2e] [--events 200000]
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.ad_event_pipeline import (
+    AdEventPipeline,
+    IMPRESSION,
+    decode_events,
+    encode_events,
+)
+
+
+def _pipeline(buffer_size: int) -> AdEventPipeline:
+    return AdEventPipeline(
+        redis=redis_client,
+        buffer_size=buffer_size,
+        ship_batch=settings.ad_event_ship_batch,
+        ship_interval=settings.ad_event_ship_interval_seconds,
+        stream_maxlen=settings.ad_event_stream_maxlen,
+        flush_entries=settings.ad_event_flush_entries,
+        claim_idle_seconds=settings.ad_event_claim_idle_seconds,
+        max_deliveries=settings.ad_event_max_deliveries,
+    )
+
+
+def bench_record(n: int) -> float:
+    pipeline = _pipeline(buffer_size=n)
+    start = time.perf_counter()
+    for i in range(n):
+        pipeline.record(i % 1000, IMPRESSION)
+    return n / (time.perf_counter() - start)
+
+
+def bench_codec(n: int) -> float:
+    batch_size = settings.ad_event_ship_batch
+    events = [(i % 1000, "i", 1_700_000_000_000 + i) for i in range(n)]
+    start = time.perf_counter()
+    for i in range(0, n, batch_size):
+        payload = encode_events(events[i:i + batch_size])
+        decode_events(f"1700000000000-{i}", payload)
+    return n / (time.perf_counter() - start)
+
+
+async def bench_e2e(n: int) -> float:
+    pipeline = _pipeline(buffer_size=n)
+    await pipeline._ensure_group()
+
+    start = time.perf_counter()
+    for i in range(n):
+        pipeline.record(i % 1000, IMPRESSION)
+    await pipeline.ship()
+    while pipeline.flushed < n:
+        response = await redis_client.xreadgroup(
+            "ad_events:flushers",
+            pipeline.consumer,
+            {"ad_events:stream": ">"},
+            count=pipeline.flush_entries,
+        )
+        if not response:
+            break
+        for _, entries in response:
+            await pipeline._store(entries)
+    elapsed = time.perf_counter() - start
+    return pipeline.flushed / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--e2e", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'stage':>8} | {'events/sec':>14}")
+    print("-" * 26)
+    print(f"{'record':>8} | {bench_record(args.events):>14,.0f}")
+    print(f"{'codec':>8} | {bench_codec(args.events):>14,.0f}")
+    if args.e2e:
+        print(f"{'e2e':>8} | {asyncio.run(bench_e2e(args.events)):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# app/scripts/bench_ad_sampler.py
+"""
+광고 선택 방식 벤치마크.
+
+- linear: 기존 방식처럼 요청마다 후보 목록 전체를 훑어서 고르는 방식
+          (random.choices(weights=...) 는 매 호출마다 누적 가중치를 O(n) 으로 계산한다)
+- alias : AliasSampler 로 테이블을 한 번 만들어 두고 O(1) 로 고르는 방식
+
+실행: python -m app.scripts.bench_ad_sampler
+"""
+import random
+import time
+
+from app.services.ad_sampler import AliasSampler
+
+SIZES = (10, 1_000, 100_000)
+PICKS = 20_000
+
+
+def _bench(fn, picks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(picks):
+        fn()
+    elapsed = time.perf_counter() - start
+    return elapsed / picks * 1e6  # μs / pick
+
+
+def main():
+    rng = random.Random(42)
+
+    print(f"{'ads':>8} | {'linear μs/pick':>15} | {'alias μs/pick':>14} | {'alias build ms':>14} | {'speedup':>8}")
+    print("-" * 72)
+
+    for n in SIZES:
+        ids = list(range(n))
+        weights = [rng.randint(1, 10) for _ in ids]
+
+        # linear 는 큰 n 에서 너무 오래 걸리므로 호출 수를 줄여서 측정
+        linear_picks = max(200, PICKS * 10 // n) if n > 1_000 else PICKS
+        linear_us = _bench(lambda: random.choices(ids, weights=weights)[0], linear_picks)
+
+        start = time.perf_counter()
+        sampler = AliasSampler(ids, weights)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        alias_us = _bench(sampler.sample, PICKS)
+
+        print(
+            f"{n:>8} | {linear_us:>15.2f} | {alias_us:>14.2f} | {build_ms:>14.2f} | {linear_us / alias_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
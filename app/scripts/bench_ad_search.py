@@ -0,0 +1,127 @@
+# app/scripts/bench_ad_search.py
+"""
+광고 제목/설명 검색 벤치마크.
+
+- like  : 기존 방식처럼 모든 광고의 title/description 을 훑어서 부분 문자열을 찾는 방식
+          (LIKE '%kw%' 는 인덱스를 못 타므로 DB 에서도 이렇게 전체를 읽는다. 메모리 안이라 DB 보다 유리한 조건)
+- index : AdSearchIndex 2-gram posting 교집합 + 후보 확인 + 관련도 정렬 (결과 캐시를 비우고 측정)
+- cached: 같은 검색어 재조회 (목록 페이지 넘김)
+- --db  : 설정된 DB 의 ads 테이블에 대해 기존 list_ads 와 같은 LIKE count + 첫 페이지 쿼리 시간도 잰다
+
+실행: python -m app.scripts.bench_ad_search [--ads 100000] [--db]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.services.ad_pool import PooledAd
+from app.services.ad_search import AdSearchIndex, normalize_text
+
+COMMON_WORDS = [
+    "광고", "관리", "트래픽", "마케팅", "쇼핑", "할인", "특가", "무료배송", "이벤트", "쿠폰",
+    "노트북", "스마트폰", "이어폰", "캠핑", "여행", "호텔", "항공권", "건강", "영양제", "화장품",
+    "Traffic", "Pro", "Sale", "Deal", "Premium", "Shop", "Best", "New", "Korea", "Seoul",
+]
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히"
+VOCABULARY_SIZE = 5_000
+KEYWORDS = ["트래픽", "무료배송", "노트북 할인", "pro", "캠", "서울", "없는검색어"]
+QUERIES_PER_KEYWORD = 20
+
+
+def _make_ads(n: int, rng: random.Random) -> list[PooledAd]:
+    # 자주 쓰는 단어 + 임의 음절 단어를 Zipf 분포로 섞어 실제 카탈로그처럼 드문 단어가 많게 만든다.
+    words = COMMON_WORDS + [
+        "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(VOCABULARY_SIZE)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+
+    ads = []
+    for i in range(n):
+        title = " ".join(rng.choices(words, weights, k=rng.randint(2, 5)))
+        description = " ".join(rng.choices(words, weights, k=rng.randint(5, 20)))
+        ads.append(PooledAd(
+            id=i + 1, ad_type="IMAGE", title=title, description=description,
+            image_url=None, image_width=None, image_height=None, image_variants=None,
+            short_url=None, target_url=None, embed_src=None, embed_width=None, embed_height=None,
+            weight=1,
+        ))
+    return ads
+
+
+def _like_scan(docs: list[tuple[int, str, str]], keyword: str) -> list[int]:
+    query = normalize_text(keyword)
+    return [ad_id for ad_id, title, description in docs if query in title or query in description]
+
+
+def _bench(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1e3, result
+
+
+async def _bench_db(keywords: list[str]) -> None:
+    from sqlalchemy import func, or_, select
+
+    from app.core.database import AsyncSessionLocal
+    from app.models.ad import Ad
+
+    print(f"\n{'keyword':>12} | {'db LIKE ms':>11} | {'matches':>8}")
+    print("-" * 38)
+    async with AsyncSessionLocal() as db:
+        for keyword in keywords:
+            conditions = [
+                Ad.is_active == True,
+                or_(Ad.title.like(f"%{keyword}%"), Ad.description.like(f"%{keyword}%")),
+            ]
+            start = time.perf_counter()
+            total = await db.scalar(select(func.count()).select_from(Ad).where(*conditions))
+            await db.execute(select(Ad).where(*conditions).order_by(Ad.created_at.desc()).limit(10))
+            elapsed = (time.perf_counter() - start) * 1e3
+            print(f"{keyword:>12} | {elapsed:>11.2f} | {total:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ads", type=int, default=100_000)
+    parser.add_argument("--db", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    ads = _make_ads(args.ads, rng)
+    docs = [(ad.id, normalize_text(ad.title), normalize_text(ad.description)) for ad in ads]
+    keywords = KEYWORDS + [ads[0].title.split()[-1], ads[1].description.split()[-1]]
+
+    index = AdSearchIndex()
+    start = time.perf_counter()
+    index.build(ads)
+    build_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    index.build(ads)
+    resync_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"ads={args.ads:,}  build={build_ms:,.0f} ms  resync(변경 없음)={resync_ms:,.0f} ms  grams={index.stats()['grams']:,}")
+    print(f"{'keyword':>12} | {'like ms':>9} | {'index ms':>9} | {'cached ms':>9} | {'matches':>8} | {'speedup':>8}")
+    print("-" * 70)
+
+    for keyword in keywords:
+        like_ms, like_ids = _bench(lambda: _like_scan(docs, keyword), max(1, QUERIES_PER_KEYWORD // 4))
+
+        def cold_search():
+            index._results.clear()
+            return index.search(keyword)
+
+        index_ms, index_ids = _bench(cold_search, QUERIES_PER_KEYWORD)
+        cached_ms, _ = _bench(lambda: index.search(keyword), QUERIES_PER_KEYWORD)
+        assert set(like_ids) == set(index_ids), keyword
+        print(
+            f"{keyword:>12} | {like_ms:>9.2f} | {index_ms:>9.2f} | {cached_ms:>9.3f} | {len(index_ids):>8} | {like_ms / index_ms:>7.1f}x"
+        )
+
+    if args.db:
+        asyncio.run(_bench_db(keywords))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# app/scripts/bench_placement_index.py
+"""
+광고 자리(placement) 별 광고 선택 벤치마크.
+
+- scan : 요청마다 활성 광고 전체를 훑어 자리에 맞는 광고만 거른 뒤 weight 로 고르는 방식
+- index: placement_index 로 (site, slot) → 후보 묶음을 찾고 alias 테이블에서 고르는 방식
+
+자리 수천 개 + 광고 10만 개 + 자리 지정 광고 일부 구성으로 측정한다.
+(build ms 는 전체 재적재 시 색인을 다시 만드는 시간, 첫 추첨 때 만드는 alias 테이블은 별도)
+
+실행: python -m app.scripts.bench_placement_index
+"""
+import random
+import time
+
+from app.services.ad_pool import PooledAd, PooledPlacement
+from app.services.placement_index import PlacementIndex
+
+PLACEMENTS = 5_000
+ADS = 100_000
+# 자리를 지정한 광고 비율
+TARGETED_RATIO = 0.2
+PICKS = 20_000
+SIZES = ((300, 250), (728, 90), (160, 600), (320, 100), (300, 600))
+
+
+def _make(rng: random.Random) -> tuple[tuple[PooledPlacement, ...], tuple[PooledAd, ...]]:
+    placements = []
+    for i in range(PLACEMENTS):
+        width, height = rng.choice(SIZES)
+        placements.append(PooledPlacement(
+            id=i + 1,
+            site=f"site{i // 10}",
+            slot=f"slot{i % 10}",
+            width=width,
+            height=height,
+            ad_types=frozenset(rng.choice((("IMAGE",), ("IFRAME",), ("IMAGE", "IFRAME")))),
+        ))
+
+    ads = []
+    for i in range(ADS):
+        iframe = rng.random() < 0.5
+        width, height = rng.choice(SIZES) if iframe else (None, None)
+        targeted = rng.random() < TARGETED_RATIO
+        ads.append(PooledAd(
+            id=i + 1,
+            ad_type="IFRAME" if iframe else "IMAGE",
+            title=f"ad {i}",
+            description=None,
+            image_url=None,
+            image_width=None,
+            image_height=None,
+            image_variants=None,
+            short_url=None,
+            target_url=None,
+            embed_src=None,
+            embed_width=width,
+            embed_height=height,
+            weight=rng.randint(1, 10),
+            placement_ids=tuple(rng.sample(range(1, PLACEMENTS + 1), 3)) if targeted else None,
+        ))
+    return tuple(placements), tuple(ads)
+
+
+def _scan(ads: tuple[PooledAd, ...], placement: PooledPlacement) -> PooledAd | None:
+    candidates = [
+        ad for ad in ads
+        if (placement.id in ad.placement_ids if ad.placement_ids else True)
+        and placement.accepts(ad.ad_type, ad.embed_width, ad.embed_height)
+    ]
+    if not candidates:
+        return None
+    return random.choices(candidates, weights=[ad.weight for ad in candidates])[0]
+
+
+def main():
+    rng = random.Random(42)
+    placements, ads = _make(rng)
+    keys = [(p.site, p.slot) for p in placements]
+
+    index = PlacementIndex()
+    start = time.perf_counter()
+    index.build(placements, ads)
+    build_ms = (time.perf_counter() - start) * 1e3
+
+    # 모든 자리에서 한 번씩 뽑아 첫 추첨(alias 테이블 생성) 비용을 따로 잰다.
+    start = time.perf_counter()
+    for p in placements:
+        index.pick(p)
+    warm_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    for _ in range(PICKS):
+        index.pick(index.placement(*rng.choice(keys)))
+    index_us = (time.perf_counter() - start) / PICKS * 1e6
+
+    scan_picks = 50
+    start = time.perf_counter()
+    for _ in range(scan_picks):
+        _scan(ads, rng.choice(placements))
+    scan_us = (time.perf_counter() - start) / scan_picks * 1e6
+
+    print(f"placements={PLACEMENTS} ads={ADS} targeted={TARGETED_RATIO:.0%}")
+    print(f"index build      : {build_ms:10.2f} ms")
+    print(f"first picks (all): {warm_ms:10.2f} ms")
+    print(f"scan  μs/pick    : {scan_us:10.2f}")
+    print(f"index μs/pick    : {index_us:10.2f}")
+    print(f"speedup          : {scan_us / index_us:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
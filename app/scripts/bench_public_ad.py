@@ -0,0 +1,163 @@
+# app/scripts/bench_public_ad.py
+"""
+GET /api/public/ad 처리량 벤치마크 (이전 방식 vs 미리 직렬화한 응답).
+
+- before: 요청마다 PublicAdResponse 를 만들고 ApiResponse 로 감싼 뒤 response_model 로
+          다시 검증/직렬화하던 이전 핸들러를 그대로 옮긴 것
+- after : 실제 라우터 (광고 풀이 광고별로 만들어 둔 JSON bytes 를 Response 로 그대로 반환)
+
+HTTP 서버/클라이언트 비용을 빼고 애플리케이션 비용만 보려고 ASGI 앱을 직접 호출한다.
+같은 난수 시드로 같은 광고를 고르게 해서 두 응답 본문이 바이트 단위로 같은지도 확인한다.
+
+실행: python -m app.scripts.bench_public_ad [--ads 1000] [--requests 20000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import asdict
+
+from fastapi import Depends, FastAPI, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.routers import public_ads
+from app.schemas.ad import PublicAdResponse
+from app.schemas.common import ApiResponse
+from app.services.ad_event_pipeline import IMPRESSION, ad_events
+from app.services.ad_pool import AdSnapshot, PooledAd, ad_pool
+from app.services.ad_service import AdService
+
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/api/public/ad", response_model=ApiResponse[PublicAdResponse])
+async def legacy_random_ad(db: AsyncSession = Depends(get_db)):
+    ad = ad_pool.pick()
+    if ad is None and not ad_pool.is_loaded:
+        ad = await AdService.random_ad(db)
+    if not ad:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="NO_ACTIVE_AD")
+
+    ad_events.record(ad.id, IMPRESSION)
+
+    dto = PublicAdResponse(
+        id=ad.id,
+        ad_type=(ad.ad_type or "IMAGE"),
+        title=ad.title,
+        description=ad.description,
+        image_url=ad.image_url,
+        image_width=getattr(ad, "image_width", None),
+        image_height=getattr(ad, "image_height", None),
+        image_variants=getattr(ad, "image_variants", None),
+        short_url=ad.short_url,
+        target_url=ad.target_url,
+        embed_src=getattr(ad, "embed_src", None),
+        embed_width=getattr(ad, "embed_width", None),
+        embed_height=getattr(ad, "embed_height", None),
+    )
+    return ApiResponse(code=200, message="광고 조회 성공", result=dto)
+
+
+current_app = FastAPI()
+current_app.include_router(public_ads.router, prefix="/api")
+
+
+def _make_ads(n: int, rng: random.Random) -> tuple[PooledAd, ...]:
+    ads = []
+    for i in range(1, n + 1):
+        if i % 5 == 0:
+            ads.append(PooledAd(
+                id=i, ad_type="IFRAME", title=f"미니샵 위젯 {i}", description=None,
+                image_url=None, image_width=None, image_height=None, image_variants=None,
+                short_url=None, target_url=None,
+                embed_src=f"https://minishop.linkprice.com/widget/{i}", embed_width=300, embed_height=250,
+                weight=rng.randint(1, 10),
+            ))
+            continue
+        variants = [
+            {"url": f"/static/ads/{i}-{w}.{fmt}", "width": w, "height": w * 3 // 4, "format": fmt}
+            for w in (320, 640, 960) for fmt in ("webp", "avif")
+        ]
+        ads.append(PooledAd(
+            id=i, ad_type="IMAGE", title=f"트래픽 관리 특가 광고 {i}",
+            description="무료배송 + 쿠폰 할인 이벤트 진행 중. 지금 확인하세요!",
+            image_url=f"/static/ads/{i}.png", image_width=1280, image_height=960, image_variants=variants,
+            short_url=f"https://buly.kr/a{i}", target_url=f"https://shop.example.com/item/{i}?ref=ads",
+            embed_src=None, embed_width=None, embed_height=None,
+            weight=rng.randint(1, 10),
+        ))
+    return tuple(ads)
+
+
+async def _call(app, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def _bench(app, requests: int, seed: int) -> tuple[float, list[bytes]]:
+    random.seed(seed)
+    bodies = [await _call(app, "/api/public/ad") for _ in range(200)]
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _call(app, "/api/public/ad")
+    return requests / (time.perf_counter() - start), bodies
+
+
+async def _main(n_ads: int, requests: int) -> None:
+    ads = _make_ads(n_ads, random.Random(42))
+
+    ad_pool._snapshot = AdSnapshot(ads)
+    start = time.perf_counter()
+    for ad in ads:
+        ad_pool._snapshot.body(ad)
+    render_ms = (time.perf_counter() - start) * 1e3
+    # 광고 하나가 바뀐 부분 반영 / DB 에서 같은 내용을 다시 읽은 전체 재적재
+    start = time.perf_counter()
+    ad_pool.apply_changes([ads[0]])
+    apply_ms = (time.perf_counter() - start) * 1e3
+    reloaded = tuple(PooledAd(**asdict(ad)) for ad in ads)
+    start = time.perf_counter()
+    AdSnapshot(reloaded, ad_pool._snapshot.reusable_bodies(reloaded))
+    reload_ms = (time.perf_counter() - start) * 1e3
+
+    before_rps, before_bodies = await _bench(legacy_app, requests, seed=7)
+    after_rps, after_bodies = await _bench(current_app, requests, seed=7)
+    assert before_bodies == after_bodies, "응답 본문이 이전과 다르다"
+
+    print(
+        f"ads={n_ads:,}  전체 직렬화={render_ms:,.1f} ms  "
+        f"apply_changes(1건)={apply_ms:,.1f} ms  전체 재적재 스냅샷(변경 없음)={reload_ms:,.1f} ms"
+    )
+    print(f"{'handler':>8} | {'req/s':>10} | {'μs/req':>8}")
+    print("-" * 33)
+    print(f"{'before':>8} | {before_rps:>10,.0f} | {1e6 / before_rps:>8.1f}")
+    print(f"{'after':>8} | {after_rps:>10,.0f} | {1e6 / after_rps:>8.1f}")
+    print(f"speedup {after_rps / before_rps:.2f}x, 응답 본문 동일 (200건 비교)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ads", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(_main(args.ads, args.requests))
+
+
+if __name__ == "__main__":
+    main()
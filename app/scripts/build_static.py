@@ -0,0 +1,69 @@
+# app/scripts/build_static.py
+"""
+정적 파일 미리 압축(.gz / .br) 빌드 스크립트.
+
+static/ 아래 텍스트 계열 파일(js, css, html, svg, json ...)마다
+같은 이름 + .gz / .br 파일을 만들어 두면,
+CachedStaticFiles 가 요청의 Accept-Encoding 에 맞춰 그대로 내려준다.
+원본보다 새로운 압축본은 다시 만들지 않는다. (배포 시 한 번 실행)
+
+실행: python -m app.scripts.build_static
+"""
+import gzip
+import os
+
+from app.core.static_files import COMPRESSIBLE_EXTS, STATIC_DIR
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 .gz 만 생성
+    brotli = None
+
+
+def _is_fresh(src: str, dst: str) -> bool:
+    return os.path.exists(dst) and os.path.getmtime(dst) >= os.path.getmtime(src)
+
+
+def _write(dst: str, data: bytes) -> None:
+    tmp = f"{dst}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, dst)
+
+
+def main():
+    built = 0
+    skipped = 0
+
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTS:
+                continue
+
+            src = os.path.join(root, name)
+            with open(src, "rb") as f:
+                raw = f.read()
+
+            targets = [(f"{src}.gz", lambda b: gzip.compress(b, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                targets.append((f"{src}.br", lambda b: brotli.compress(b, quality=11)))
+
+            for dst, compress in targets:
+                if _is_fresh(src, dst):
+                    skipped += 1
+                    continue
+                data = compress(raw)
+                # 압축해도 작아지지 않으면 만들지 않는다.
+                if len(data) >= len(raw):
+                    continue
+                _write(dst, data)
+                built += 1
+                print(f"- {dst} ({len(raw)} → {len(data)} bytes)")
+
+    if brotli is None:
+        print("brotli 미설치: .br 생성 건너뜀 (pip install brotli)")
+    print(f"===== 완료: 생성 {built}개, 최신 상태 {skipped}개 =====")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# app/scripts/check_query_plans.py
+"""
+AdService 주요 조회 쿼리(관리자 목록/건수, 공개 광고 DB 폴백 등)의 실행 계획(EXPLAIN) 회귀 검사.
+
+실제 AdService / 리다이렉트 / 단축링크 캐시 코드를 호출하면서 실행되는 SELECT 를 그대로 잡아
+EXPLAIN 하고, 아래에 해당하면 실패(exit 1)로 끝난다.
+- 테이블 전체 스캔   (MariaDB: type=ALL / SQLite: "SCAN <table>" 인덱스 없이)
+- 정렬용 임시 작업   (MariaDB: Using filesort / SQLite: USE TEMP B-TREE FOR ORDER BY)
+
+행 수가 적으면 옵티마이저가 일부러 전체 스캔을 고르므로 --seed 로 충분히 채운 검사용 DB 에서 돌린다.
+운영 DB 에는 --seed 를 쓰지 말 것.
+
+실행:
+  python -m app.scripts.check_query_plans                                 # .env 의 DB
+  python -m app.scripts.check_query_plans --db-url sqlite+aiosqlite:///plans.db --seed 20000
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.database import ASYNC_DATABASE_URL
+from app.models import Base
+from app.models.ad import Ad
+
+
+def _is_bad_plan(dialect: str, rows: list) -> str | None:
+    """문제가 있으면 이유 문자열, 없으면 None."""
+    if dialect == "sqlite":
+        for row in rows:
+            detail = row[-1]
+            if detail.startswith("SCAN") and "INDEX" not in detail:
+                return detail
+            if "USE TEMP B-TREE FOR ORDER BY" in detail:
+                return detail
+        return None
+
+    for row in rows:
+        plan = dict(row._mapping)
+        if plan.get("type") == "ALL":
+            return f"full scan on {plan.get('table')}"
+        if "Using filesort" in (plan.get("Extra") or ""):
+            return f"filesort on {plan.get('table')}"
+    return None
+
+
+async def _seed(engine: AsyncEngine, count: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        existing = await conn.scalar(select(func.count()).select_from(Ad))
+        rows = [
+            {
+                "title": f"seed ad {i}",
+                "description": "query plan seed",
+                "target_url": f"https://example.com/{i}",
+                "short_url": f"https://example.com/{i}",
+                # 운영처럼 soft delete 된 광고도 섞어 둔다.
+                "is_active": i % 5 != 0,
+                "weight": 1,
+            }
+            for i in range(existing, count)
+        ]
+        for start in range(0, len(rows), 1000):
+            await conn.execute(insert(Ad), rows[start:start + 1000])
+
+
+async def _collect(engine: AsyncEngine) -> list[tuple[str, str, object]]:
+    """AdService 등을 실제로 호출하면서 실행된 SELECT 를 (이름, SQL, 파라미터)로 모은다."""
+    import app.core.database as database
+    from app.routers import redirect
+    from app.services.ad_search import ad_search
+    from app.services.ad_service import AdService, _count_cache
+    from app.services.short_link_cache import ShortLinkCache
+
+    # 서비스 코드가 쓰는 세션 팩토리를 검사 대상 DB 로 돌린다.
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    database.AsyncSessionLocal = session_factory
+    redirect.AsyncSessionLocal = session_factory
+    # 메모리 색인/캐시가 아닌 DB 쿼리 경로를 검사한다.
+    ad_search.ready = False
+    _count_cache.clear()
+
+    captured: list[tuple[str, str, object]] = []
+    current = {"name": None}
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if current["name"] and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((current["name"], statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        async with session_factory() as db:
+            sample_id = await db.scalar(select(Ad.id).where(Ad.is_active == True).limit(1))
+
+            current["name"] = "admin_list_offset"
+            await AdService.list_ads(db, page=5, size=10, keyword=None)
+
+            current["name"] = "admin_list_cursor"
+            _, _, next_cursor, _ = await AdService.list_ads_keyset(db, size=10, keyword=None, cursor=None)
+            await AdService.list_ads_keyset(db, size=10, keyword=None, cursor=next_cursor)
+
+            # 광고 풀 적재 전 /api/public/ad 의 DB 폴백 (ix_ads_active_weight)
+            current["name"] = "public_random_ad"
+            await AdService.random_ad(db)
+
+            current["name"] = "get_ad"
+            await AdService.get_ad(db, sample_id)
+
+            current["name"] = "short_link_lookup"
+            await ShortLinkCache(max_size=1).lookup(db, "https://example.com/plan-check")
+
+        current["name"] = "redirect_lookup"
+        await redirect._lookup_destination(sample_id)
+    finally:
+        current["name"] = None
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+
+    return captured
+
+
+async def _run(db_url: str, seed: int) -> int:
+    engine = create_async_engine(db_url)
+    dialect = engine.dialect.name
+    if seed:
+        await _seed(engine, seed)
+
+    captured = await _collect(engine)
+    explain = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+
+    failures = 0
+    async with engine.connect() as conn:
+        for name, statement, parameters in captured:
+            rows = (await conn.exec_driver_sql(explain + statement, parameters)).all()
+            reason = _is_bad_plan(dialect, rows)
+            status = "FAIL" if reason else "ok"
+            print(f"[{status:>4}] {name:<20} {reason or ''}")
+            if reason:
+                failures += 1
+                print("       " + " ".join(statement.split()))
+
+    await engine.dispose()
+    print(f"===== {len(captured)}개 쿼리 검사, 실패 {failures}개 =====")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--db-url",
+        default=ASYNC_DATABASE_URL,
+        help="비동기 드라이버 URL (예: mysql+aiomysql://..., sqlite+aiosqlite:///plans.db)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="ads 테이블을 이 행 수까지 채운다 (검사용 DB 전용)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_run(args.db_url, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
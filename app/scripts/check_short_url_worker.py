@@ -0,0 +1,183 @@
+# app/scripts/check_short_url_worker.py
+"""
+단축링크 워커(buly 호출 단계) 동작 검사 — 로컬 stub HTTP 서버 상대.
+
+127.0.0.1 의 임시 포트에 buly 흉내를 내는 stub 서버를 띄우고, ShortUrlWorker 의 api_url 을 그쪽으로 돌려
+실제 httpx.AsyncClient 호출 경로 그대로 아래 시나리오를 확인한다. 하나라도 어긋나면 실패(exit 1)로 끝난다.
+- retry    : 503 두 번 뒤 성공 → 백오프 재시도로 단축링크를 받는다
+- reject   : result != "Y" → 재시도 없이 None (거절 표시)
+- open     : 계속 503 → 서킷이 열리고, 열린 동안에는 요청이 stub 까지 가지 않는다
+- half-open: 시험 호출이 이상한 응답(JSON 배열)을 받아도 서킷이 다시 열릴 뿐 시험 호출 표시가 남지 않는다
+- recover  : stub 이 정상으로 돌아오면 다음 시험 호출 성공으로 서킷이 닫힌다
+
+DB 는 쓰지 않는다. 거절 표시는 설정된 Redis 에 남기며, Redis 가 없으면 경고 로그만 남고 검사는 계속된다.
+
+실행: python -m app.scripts.check_short_url_worker
+"""
+import asyncio
+import json
+import sys
+from urllib.parse import parse_qs
+
+import httpx
+
+from app.services.short_url_worker import CircuitBreaker, ShortUrlWorker
+
+RESET_TIMEOUT = 0.3
+
+
+class StubBuly:
+    """
+    buly API 흉내.
+    - fail_next 가 남아 있으면 503
+    - mode: "ok" | "down"(항상 503) | "garbage"(200 + JSON 배열)
+    - org_url 에 "reject" 가 들어 있으면 result "N"
+    """
+
+    def __init__(self):
+        self.mode = "ok"
+        self.fail_next = 0
+        self.requests = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/api/shoturl.siso"
+
+    def _respond(self, org_url: str) -> tuple[int, object]:
+        self.requests += 1
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            return 503, {"result": "N", "message": "busy"}
+        if self.mode == "down":
+            return 503, {"result": "N", "message": "busy"}
+        if self.mode == "garbage":
+            return 200, ["unexpected"]
+        if "reject" in org_url:
+            return 200, {"result": "N", "message": "허용되지 않는 URL 입니다."}
+        return 200, {"result": "Y", "message": "성공적으로 생성하였습니다.", "url": f"https://buly.kr/stub{self.requests}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in head.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        body = (await reader.readexactly(length)).decode() if length else ""
+        org_url = parse_qs(body).get("org_url", [""])[0]
+
+        status, data = self._respond(org_url)
+        payload = json.dumps(data).encode()
+        writer.write(
+            f"HTTP/1.1 {status} STUB\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode()
+            + payload
+        )
+        await writer.drain()
+        writer.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+
+async def run_checks() -> list[tuple[str, bool, str]]:
+    stub = StubBuly()
+    await stub.start()
+    worker = ShortUrlWorker(
+        api_url=stub.url,
+        concurrency=1,
+        max_retries=2,
+        backoff_base=0.01,
+        timeout=2.0,
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=RESET_TIMEOUT),
+        queue_size=10,
+        reject_ttl=60,
+    )
+    # 큐/backfill(DB) 없이 buly 호출 경로만 쓰므로 HTTP 클라이언트만 직접 준비한다.
+    worker._client = httpx.AsyncClient(timeout=worker.timeout)
+    breaker = worker.breaker
+    results = []
+
+    try:
+        stub.fail_next = 2
+        short_url = await worker.shorten_with_retry("https://example.com/retry")
+        results.append((
+            "retry",
+            bool(short_url) and worker.retries == 2 and breaker.state == "closed",
+            f"url={short_url} retries={worker.retries} state={breaker.state}",
+        ))
+
+        before = stub.requests
+        short_url = await worker.shorten_with_retry("https://example.com/reject")
+        results.append((
+            "reject",
+            short_url is None and stub.requests - before == 1 and worker.rejected == 1,
+            f"url={short_url} requests={stub.requests - before}",
+        ))
+
+        stub.mode = "down"
+        short_url = await worker.shorten_with_retry("https://example.com/down")
+        before = stub.requests
+        try:
+            await asyncio.wait_for(worker.shorten_with_retry("https://example.com/blocked"), RESET_TIMEOUT / 3)
+        except asyncio.TimeoutError:
+            pass
+        results.append((
+            "open",
+            short_url is None and breaker.state == "open" and stub.requests == before,
+            f"state={breaker.state} requests_while_open={stub.requests - before} "
+            f"rejections={worker.breaker_rejections}",
+        ))
+
+        stub.mode = "garbage"
+        await asyncio.sleep(RESET_TIMEOUT)
+        short_url = await asyncio.wait_for(
+            worker.shorten_with_retry("https://example.com/garbage"), RESET_TIMEOUT * 10
+        )
+        results.append((
+            "half-open",
+            short_url is None and breaker.state == "open" and not breaker._trial_in_flight,
+            f"state={breaker.state} trial_in_flight={breaker._trial_in_flight}",
+        ))
+
+        stub.mode = "ok"
+        await asyncio.sleep(RESET_TIMEOUT)
+        short_url = await asyncio.wait_for(
+            worker.shorten_with_retry("https://example.com/recover"), RESET_TIMEOUT * 10
+        )
+        results.append((
+            "recover",
+            bool(short_url) and breaker.state == "closed",
+            f"url={short_url} state={breaker.state}",
+        ))
+    finally:
+        await worker._client.aclose()
+        worker._client = None
+        await stub.stop()
+
+    return results
+
+
+def main():
+    results = asyncio.run(run_checks())
+
+    print(f"{'scenario':>10} | {'result':>6} | detail")
+    print("-" * 72)
+    for name, ok, detail in results:
+        print(f"{name:>10} | {'ok' if ok else 'FAIL':>6} | {detail}")
+
+    failures = sum(1 for _, ok, _ in results if not ok)
+    print(f"\n{len(results)} scenarios, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
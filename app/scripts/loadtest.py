@@ -0,0 +1,469 @@
+# app/scripts/loadtest.py
+"""
+광고 서버 부하 테스트 (엔드포인트별 RPS, p50/p95/p99 → JSON).
+
+[구성]
+- 서버: 별도 프로세스에서 app.main:app 을 uvicorn 으로 띄운다. (부하 발생기와 CPU 를 나눠 쓰지 않도록)
+  MariaDB/Redis 대신 임시 SQLite 파일(aiosqlite)과 프로세스 내 fakeredis 를 쓴다.
+  --db-url / --redis-url 을 주면 로컬 MariaDB 컨테이너나 redis-server 에 붙는다. (빈 DB/전용 db 번호를 쓸 것)
+  광고 N 개와 관리자 계정 하나를 넣고 시작한다.
+- 부하: 시나리오마다 동시 연결 concurrency 개가 쉬지 않고 요청을 보낸다. (closed loop)
+  warmup 동안의 요청은 버리고, duration 동안의 응답 시간만 모은다.
+  --repeat 번 반복해서 RPS 가 중간인 회차를 결과로 쓴다.
+- 결과: stdout 에 JSON 으로 출력한다. (--output 으로 파일 저장, 진행 상황은 stderr)
+
+[시나리오]
+- public_ad   : GET  /api/public/ad
+- public_ads  : GET  /api/public/ads?n=3&viewer=... (시청자 1만 명, 빈도 제한 포함)
+- admin_ads   : GET  /api/admin/ads?page=..&size=20 (로그인 세션 쿠키)
+- admin_login : POST /api/admin/login (bcrypt. 동시 연결은 BCRYPT_MAX_PENDING 이하로 제한)
+
+[회귀 판정]
+--baseline 파일과 시나리오별로 비교해서 아래 중 하나라도 걸리면 JSON 의 regressions 에 적고 종료 코드 1 로 끝난다.
+- RPS 가 --rps-tolerance(기본 20%) 넘게 감소
+- p50/p95 가 --latency-tolerance(기본 30%), p99 가 --p99-tolerance(기본 50%) 넘게 증가
+  (증가폭이 --min-delta-ms 미만이면 무시. 1ms 미만 응답의 흔들림을 회귀로 보지 않도록)
+- 오류율이 기준보다 1%p 넘게 증가
+기준 수치는 머신에 따라 다르므로, 비교할 머신에서 --save-baseline 으로 다시 만들어 둔다.
+(app/scripts/loadtest_baseline.json 은 기본 옵션으로 만든 기준이다)
+
+실행: python -m app.scripts.loadtest [--ads 1000] [--duration 5] [--repeat 3] [--concurrency 16]
+                                     [--scenarios public_ad,public_ads,admin_ads,admin_login]
+                                     [--baseline app/scripts/loadtest_baseline.json] [--save-baseline]
+                                     [--output result.json] [--db-url ...] [--redis-url ...]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+import httpx
+
+from app.core.config import settings
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "loadtest_baseline.json")
+
+ADMIN_LOGIN_ID = "loadtest"
+ADMIN_PASSWORD = "loadtest-password"
+
+
+# -------------------------
+# 서버 프로세스 (--serve)
+# -------------------------
+def _sync_url(async_url: str) -> str:
+    """비동기 드라이버 URL → 스키마 생성/시드용 동기 드라이버 URL"""
+    return async_url.replace("+aiosqlite", "").replace("+aiomysql", "+pymysql")
+
+
+def _use_stand_ins(db_url: str, redis_url: str | None) -> None:
+    """
+    app.core.database / app.core.redis_client 의 전역 엔진/클라이언트를 바꿔 끼운다.
+    서비스 모듈들이 import 시점에 이 값들을 가져가므로, app.main 을 import 하기 전에 불러야 한다.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import app.core.database as database
+    import app.core.redis_client as redis_module
+    from app.core.metrics import CheckoutTimedPool
+
+    sqlite = db_url.startswith("sqlite")
+    # SQLite 는 파일 잠금이라, 이벤트 적재와 조회가 겹칠 때 바로 실패하지 않고 기다리게 한다.
+    connect_args = {"timeout": 30} if sqlite else {}
+    database.engine = create_engine(_sync_url(db_url), connect_args=connect_args)
+    database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=database.engine)
+    pool_args = {} if sqlite else {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": 3600,
+    }
+    database.async_engine = create_async_engine(
+        db_url, connect_args=connect_args, poolclass=CheckoutTimedPool, **pool_args,
+    )
+    database.AsyncSessionLocal = async_sessionmaker(
+        bind=database.async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    if redis_url:
+        from redis.asyncio import Redis
+        redis_module.redis_client = Redis.from_url(redis_url, decode_responses=True)
+    else:
+        try:
+            import fakeredis.aioredis
+        except ImportError:
+            raise SystemExit("fakeredis 가 없다: pip install fakeredis 또는 --redis-url 로 redis-server 지정")
+        redis_module.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+def _seed(n_ads: int, seed: int) -> None:
+    """광고 n_ads 개(IMAGE 4 : IFRAME 1)와 부하 테스트용 관리자 계정을 넣는다."""
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Ad, AdminUser
+    from app.services.password_hasher import hash_password_sync
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    rows = []
+    for i in range(1, n_ads + 1):
+        common = {
+            "title": f"부하 테스트 광고 {i}",
+            "target_url": f"https://shop.example.com/item/{i}?ref=ads",
+            # 단축 URL 을 채워 둬서 서버가 buly 를 호출하지 않게 한다.
+            "short_url": f"https://buly.kr/lt{i}",
+            "weight": rng.randint(1, 10),
+            "is_active": True,
+        }
+        if i % 5 == 0:
+            rows.append(Ad(
+                ad_type="IFRAME",
+                embed_src=f"https://minishop.linkprice.com/widget/{i}",
+                embed_width=300,
+                embed_height=250,
+                **common,
+            ))
+            continue
+        rows.append(Ad(
+            ad_type="IMAGE",
+            description="무료배송 + 쿠폰 할인 이벤트 진행 중. 지금 확인하세요!",
+            image_url=f"/static/ads/{i}.png",
+            image_width=1280,
+            image_height=960,
+            image_variants=[
+                {"url": f"/static/ads/{i}-{w}.{fmt}", "width": w, "height": w * 3 // 4, "format": fmt}
+                for w in (320, 640, 960) for fmt in ("webp", "avif")
+            ],
+            **common,
+        ))
+
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.add(AdminUser(
+            login_id=ADMIN_LOGIN_ID,
+            password_hash=hash_password_sync(ADMIN_PASSWORD, settings.bcrypt_rounds),
+        ))
+        db.commit()
+
+
+def serve(port: int, db_url: str, redis_url: str | None, n_ads: int, seed: int) -> None:
+    _use_stand_ins(db_url, redis_url)
+    _seed(n_ads, seed)
+
+    import uvicorn
+    from app.main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    uvicorn.Server(config).run()
+
+
+# -------------------------
+# 부하 발생기
+# -------------------------
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # 요청마다 경로(쿼리 포함)를 만든다. (시청자/페이지를 섞기 위해)
+    path: Callable[[random.Random], str]
+    json: dict | None = None
+    login: bool = False
+    # 동시 연결 상한 (None 이면 --concurrency 그대로)
+    max_concurrency: int | None = None
+
+
+SCENARIOS = {
+    s.name: s for s in (
+        Scenario("public_ad", "GET", lambda rng: "/api/public/ad"),
+        Scenario(
+            "public_ads", "GET",
+            lambda rng: f"/api/public/ads?n=3&viewer=lt-{rng.randrange(10_000)}",
+        ),
+        Scenario(
+            "admin_ads", "GET",
+            lambda rng: f"/api/admin/ads?page={rng.randrange(10)}&size=20",
+            login=True,
+        ),
+        Scenario(
+            "admin_login", "POST", lambda rng: "/api/admin/login",
+            json={"loginId": ADMIN_LOGIN_ID, "password": ADMIN_PASSWORD},
+            # 넘으면 503 LOGIN_BUSY 로 바로 거절되므로, 대기열 한도 안에서 처리량을 잰다.
+            max_concurrency=settings.bcrypt_max_pending,
+        ),
+    )
+}
+
+
+@dataclass
+class _Samples:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def add(self, latency: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(samples: _Samples, elapsed: float, concurrency: int) -> dict:
+    latencies = sorted(samples.latencies)
+    count = len(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": count,
+        "errors": samples.errors,
+        "error_rate": round(samples.errors / count, 4) if count else 0.0,
+        "rps": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1e3, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1e3, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1e3, 3),
+        "max_ms": round(latencies[-1] * 1e3, 3) if latencies else 0.0,
+        "status": dict(sorted(samples.statuses.items())),
+    }
+
+
+async def _run_scenario(
+    base_url: str,
+    scenario: Scenario,
+    concurrency: int,
+    warmup: float,
+    duration: float,
+    seed: int,
+) -> dict:
+    if scenario.max_concurrency is not None:
+        concurrency = min(concurrency, scenario.max_concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        if scenario.login:
+            r = await client.post(
+                "/api/admin/login",
+                json={"loginId": ADMIN_LOGIN_ID, "password": ADMIN_PASSWORD},
+            )
+            r.raise_for_status()
+
+        loop = asyncio.get_running_loop()
+        measure_from = loop.time() + warmup
+        deadline = measure_from + duration
+        samples = _Samples()
+
+        async def worker(worker_seed: int) -> None:
+            rng = random.Random(worker_seed)
+            while True:
+                now = loop.time()
+                if now >= deadline:
+                    return
+                measured = now >= measure_from
+                start = time.perf_counter()
+                try:
+                    response = await client.request(scenario.method, scenario.path(rng), json=scenario.json)
+                    status, ok = str(response.status_code), response.status_code == 200
+                except httpx.HTTPError as e:
+                    status, ok = type(e).__name__, False
+                if measured:
+                    samples.add(time.perf_counter() - start, status, ok)
+
+        await asyncio.gather(*(worker(seed * 1000 + i) for i in range(concurrency)))
+    return _summarize(samples, duration, concurrency)
+
+
+async def _wait_ready(base_url: str, server: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"서버 프로세스가 종료됨 (exit={server.returncode})")
+            try:
+                if (await client.get("/api/public/ad")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"서버가 {timeout:.0f}초 안에 준비되지 않음")
+
+
+# -------------------------
+# 기준 비교
+# -------------------------
+def compare(results: dict, baseline: dict, args: argparse.Namespace) -> list[str]:
+    """기준(baseline) 대비 회귀 목록. 기준에 없는 시나리오는 비교하지 않는다."""
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, current in results.items():
+        base = base_results.get(name)
+        if base is None:
+            continue
+        if base["rps"] > 0 and current["rps"] < base["rps"] * (1 - args.rps_tolerance):
+            regressions.append(
+                f"{name}: rps {current['rps']:,.1f} < 기준 {base['rps']:,.1f} "
+                f"(-{1 - current['rps'] / base['rps']:.0%})"
+            )
+        for key, tolerance in (
+            ("p50_ms", args.latency_tolerance),
+            ("p95_ms", args.latency_tolerance),
+            ("p99_ms", args.p99_tolerance),
+        ):
+            limit = max(base[key] * (1 + tolerance), base[key] + args.min_delta_ms)
+            if current[key] > limit:
+                regressions.append(f"{name}: {key} {current[key]:,.3f} > 기준 {base[key]:,.3f} (한도 {limit:,.3f})")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: error_rate {current['error_rate']:.2%} > 기준 {base['error_rate']:.2%}")
+    return regressions
+
+
+# -------------------------
+# 실행
+# -------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _log(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"알 수 없는 시나리오: {', '.join(unknown)} (가능: {', '.join(SCENARIOS)})")
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmp:
+        db_url = args.db_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'loadtest.db')}"
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server_log = os.path.join(tmp, "server.log")
+        command = [
+            sys.executable, "-m", "app.scripts.loadtest", "--serve",
+            "--port", str(port), "--db-url", db_url, "--ads", str(args.ads), "--seed", str(args.seed),
+        ]
+        if args.redis_url:
+            command += ["--redis-url", args.redis_url]
+
+        _log(f"서버 시작: {base_url} (ads={args.ads:,}, db={db_url.split(':', 1)[0]}, "
+             f"redis={'redis' if args.redis_url else 'fakeredis'})")
+        with open(server_log, "wb") as log_file:
+            server = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+        try:
+            await _wait_ready(base_url, server, timeout=60.0)
+            results = {}
+            for name in names:
+                runs = [
+                    await _run_scenario(
+                        base_url, SCENARIOS[name], args.concurrency, args.warmup, args.duration, args.seed + i,
+                    )
+                    for i in range(args.repeat)
+                ]
+                # 반복 측정 중 RPS 가 중간인 회차를 결과로 쓴다. (한 번 튄 회차로 기준/판정이 흔들리지 않게)
+                runs.sort(key=lambda run: run["rps"])
+                r = results[name] = runs[len(runs) // 2]
+                r["runs_rps"] = [run["rps"] for run in runs]
+                _log(f"{name:>12} | {r['rps']:>9,.1f} req/s | p50 {r['p50_ms']:>8.2f} ms | "
+                     f"p95 {r['p95_ms']:>8.2f} ms | p99 {r['p99_ms']:>8.2f} ms | errors {r['errors']}")
+        except BaseException:
+            with open(server_log, encoding="utf-8", errors="replace") as f:
+                _log(f.read()[-4000:])
+            raise
+        finally:
+            # SIGINT: uvicorn 이 lifespan 종료(이벤트/노출 예산 정리)까지 마치고 끝나게 한다.
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ads": args.ads,
+            "concurrency": args.concurrency,
+            "warmup_seconds": args.warmup,
+            "duration_seconds": args.duration,
+            "repeat": args.repeat,
+            "db": db_url.split(":", 1)[0],
+            "redis": "redis" if args.redis_url else "fakeredis",
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ads", type=int, default=1_000)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-url", default=None, help="비동기 드라이버 URL (기본: 임시 SQLite 파일)")
+    parser.add_argument("--redis-url", default=None, help="기본: 서버 프로세스 안의 fakeredis")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로 (기본: stdout 만)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="비교하지 않고 결과를 --baseline 에 저장")
+    parser.add_argument("--rps-tolerance", type=float, default=0.20)
+    parser.add_argument("--latency-tolerance", type=float, default=0.30)
+    parser.add_argument("--p99-tolerance", type=float, default=0.50)
+    parser.add_argument("--min-delta-ms", type=float, default=1.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.db_url, args.redis_url, args.ads, args.seed)
+        return
+
+    report = asyncio.run(_main(args))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        _log(f"기준 저장: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline"] = args.baseline
+        report["regressions"] = compare(report["results"], baseline, args)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    for regression in report.get("regressions", []):
+        _log(f"회귀: {regression}")
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
 # app/scripts/seed_admin.py
 
 from sqlalchemy.orm import Session
-import bcrypt
 
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.admin import AdminUser
+from app.services.password_hasher import hash_password_sync
 
 
 def hash_password(plain: str) -> str:
-    hashed = bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt())
-    return hashed.decode("utf-8")
+    return hash_password_sync(plain, settings.bcrypt_rounds)
 
 
 def main():
@@ -0,0 +1,413 @@
+# app/services/ad_bulk.py
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+from typing import AsyncIterable, AsyncIterator, Literal
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.ad import Ad
+from app.schemas.ad import AdCreate
+from app.services.ad_catalog_sync import ad_catalog
+from app.services.ad_service import AdService
+from app.services.image_pipeline import image_pipeline
+from app.services.short_link_cache import short_link_cache
+from app.services.short_url_worker import ShortUrlRetryableError, short_url_worker
+
+log = logging.getLogger("ad_bulk")
+
+BulkFormat = Literal["csv", "jsonl"]
+
+# 내보내기 컬럼 순서. 가져오기는 이 중 AdCreate 필드 + image_url + is_active 만 읽고 나머지는 무시한다.
+EXPORT_COLUMNS = (
+    "id", "ad_type", "title", "description", "image_url", "target_url", "short_url",
+    "embed_src", "embed_width", "embed_height", "weight", "start_at", "end_at",
+    "daily_impression_cap", "total_impression_cap", "pacing", "is_active", "created_at",
+)
+# DB 컬럼 길이를 넘는 값은 배치 INSERT 전체를 실패시키므로 행 단위로 미리 거른다.
+_LENGTH_CHECKED = ("title", "image_url", "target_url", "embed_src")
+
+# "true"/"false", "1"/"0", JSON true/false 등을 bool 로 (pydantic 과 같은 규칙)
+_BOOL = TypeAdapter(bool)
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/x-jsonlines": "jsonl",
+}
+
+
+def detect_format(content_type: str | None) -> BulkFormat | None:
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(";", 1)[0].strip().lower())
+
+
+async def _iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """바이트 청크를 UTF-8(BOM 허용)로 풀어 줄 단위로 내보낸다. 줄 끝 "\\n" 은 유지한다."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            if "\n" not in buffer:
+                continue
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line + "\n"
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="UTF-8 로 인코딩된 파일만 가져올 수 있습니다.")
+    if buffer:
+        yield buffer
+
+
+async def iter_csv_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    CSV 를 한 행씩 (행 번호, 값 dict, 오류) 로 내보낸다. 첫 행은 헤더.
+    따옴표 안에 줄바꿈이 있는 필드는 따옴표 짝이 맞을 때까지 줄을 모아 한 레코드로 읽는다.
+    """
+    header: list[str] | None = None
+    pending: list[str] = []
+    quotes = 0
+    row_no = 0
+
+    async for line in _iter_lines(chunks):
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        record = "".join(pending)
+        pending.clear()
+        quotes = 0
+        if not record.strip():
+            continue
+
+        fields = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+
+        row_no += 1
+        if len(fields) != len(header):
+            yield row_no, None, f"컬럼 수가 헤더와 다릅니다. ({len(fields)} != {len(header)})"
+            continue
+        yield row_no, dict(zip(header, fields)), None
+
+    if pending:
+        yield row_no + 1, None, "따옴표가 닫히지 않았습니다."
+
+
+async def iter_jsonl_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """JSON Lines 를 한 줄씩 (행 번호, 값 dict, 오류) 로 내보낸다. 빈 줄은 건너뛴다."""
+    row_no = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_no += 1
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_no, None, f"JSON 형식 오류: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield row_no, None, "각 줄은 JSON 객체여야 합니다."
+            continue
+        yield row_no, data, None
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+
+def _to_values(data: dict) -> dict:
+    """
+    한 행을 AdCreate 로 검증하고 ads INSERT 값으로 바꾼다. 잘못된 행은 ValueError.
+    CSV 의 빈 칸은 값이 없는 것으로 보고 AdCreate 기본값을 쓴다.
+    """
+    data = {key: value for key, value in data.items() if value not in ("", None)}
+    body = AdCreate.model_validate(data)
+
+    image_url = data.get("image_url")
+    if image_url is not None and not isinstance(image_url, str):
+        raise ValueError("image_url: 문자열이어야 합니다.")
+    # 내보내기(include_inactive)한 파일을 다시 가져와도 꺼 둔 광고가 켜지지 않도록 is_active 를 따른다. (없으면 활성)
+    try:
+        is_active = _BOOL.validate_python(data.get("is_active", True))
+    except ValidationError:
+        raise ValueError("is_active: true/false 여야 합니다.")
+
+    if body.ad_type == "IFRAME":
+        if not body.embed_src:
+            raise ValueError("embed_src는 필수다.")
+        values = {
+            "ad_type": "IFRAME",
+            "title": body.title,
+            "description": body.description,
+            "image_url": None,
+            "target_url": None,
+            "short_url": None,
+            "embed_src": AdService._validate_iframe_src(body.embed_src),
+            "embed_width": body.embed_width,
+            "embed_height": body.embed_height,
+            "weight": body.weight,
+            "start_at": body.start_at,
+            "end_at": body.end_at,
+            "daily_impression_cap": body.daily_impression_cap,
+            "total_impression_cap": body.total_impression_cap,
+            "pacing": body.pacing,
+            "is_active": is_active,
+        }
+    else:
+        values = {
+            "ad_type": "IMAGE",
+            "title": body.title,
+            "description": body.description,
+            "image_url": image_url,
+            "target_url": body.target_url,
+            # 단축링크는 INSERT 직전에 채운다. 실패하면 target_url 그대로 (short_url_worker 가 나중에 채움)
+            "short_url": body.target_url,
+            "embed_src": None,
+            "embed_width": None,
+            "embed_height": None,
+            "weight": body.weight,
+            "start_at": body.start_at,
+            "end_at": body.end_at,
+            "daily_impression_cap": body.daily_impression_cap,
+            "total_impression_cap": body.total_impression_cap,
+            "pacing": body.pacing,
+            "is_active": is_active,
+        }
+
+    for name in _LENGTH_CHECKED:
+        value = values[name]
+        limit = Ad.__table__.c[name].type.length
+        if value is not None and len(value) > limit:
+            raise ValueError(f"{name}: {limit}자를 넘을 수 없습니다.")
+    return values
+
+
+class AdBulkService:
+    """
+    광고 일괄 가져오기/내보내기.
+
+    [가져오기]
+    - 요청 본문을 청크 단위로 읽으면서 CSV / JSON Lines 를 한 행씩 파싱하고 AdCreate 로 검증한다.
+      (파일 전체를 메모리에 올리지 않는다)
+    - 검증된 행을 ad_import_batch_size 개씩 모아 executemany 한 번으로 넣고 커밋한다.
+      (MySQL 드라이버는 executemany 를 multi-row INSERT ... VALUES (...), (...) 로 바꿔 보낸다)
+    - 넣기 전에 배치의 target_url 을 단축한다. 같은 URL 은 한 번만,
+      buly 동시 호출은 ad_import_shorten_concurrency 개로 제한한다.
+      단축하지 못한 광고는 target_url 로 넣고, 배치마다 그 광고들만 short_url_worker 큐에 넣는다.
+    - is_active 컬럼이 있으면 따르고(내보내기 파일 재가져오기), 없으면 활성으로 넣는다.
+    - /static 이미지를 쓰는 광고는 배치마다 image_pipeline 에 파생본 생성을 예약한다.
+    - 광고 풀 갱신은 광고마다 이벤트를 보내지 않고, 끝난 뒤 전체 재적재 이벤트 한 번으로 한다.
+
+    [내보내기]
+    - 서버 측 커서(yield_per)로 ad_export_yield_per 행씩 읽어 바로 응답으로 흘려보낸다.
+    """
+
+    @staticmethod
+    async def _shorten_once(url: str) -> str | None:
+        """
+        재시도/백오프 없이 한 번만 buly 를 부른다. 서킷이 닫혀 있지 않으면 부르지 않는다.
+        실패한 URL 이나 워커가 이미 단축 중인 URL 은 가져오기를 붙잡아 두지 않고
+        short_url_worker 큐의 재시도에 맡긴다.
+        """
+        breaker = short_url_worker.breaker
+        if breaker.state != "closed":
+            return None
+        try:
+            short_url = await short_url_worker.shorten(url)
+        except ShortUrlRetryableError:
+            breaker.record_failure()
+            return None
+        breaker.record_success()
+        return short_url
+
+    @staticmethod
+    async def _shorten(urls: set[str], semaphore: asyncio.Semaphore) -> dict[str, str | None]:
+        async def one(url: str) -> tuple[str, str | None]:
+            async with semaphore:
+                try:
+                    return url, await short_link_cache.get_or_create(
+                        url, AdBulkService._shorten_once, wait_inflight=False
+                    )
+                except Exception:
+                    log.exception(f"Bulk import shorten failed: {url}")
+                    return url, None
+
+        return dict(await asyncio.gather(*(one(url) for url in urls)))
+
+    @staticmethod
+    async def _insert_batch(
+        db: AsyncSession,
+        rows: list[dict],
+        semaphore: asyncio.Semaphore | None,
+        result: dict,
+    ) -> None:
+        if semaphore is not None:
+            urls = {row["target_url"] for row in rows if row["ad_type"] == "IMAGE" and row["target_url"]}
+            short_urls = await AdBulkService._shorten(urls, semaphore)
+            for row in rows:
+                short_url = short_urls.get(row["target_url"])
+                if short_url:
+                    row["short_url"] = short_url
+
+        # executemany 는 넣은 행의 id 를 돌려주지 않으므로, 이 배치의 행은 넣기 전 최대 id 보다 큰 id 로 가려낸다.
+        # (AUTO_INCREMENT 는 이미 보이는 id 보다 작은 값을 다시 주지 않는다)
+        last_id = await db.scalar(select(func.max(Ad.id))) or 0
+        await db.execute(insert(Ad), rows)
+        await db.commit()
+        result["inserted"] += len(rows)
+        result["short_url_pending"] += sum(
+            1 for row in rows if row["target_url"] and row["short_url"] == row["target_url"]
+        )
+        await AdBulkService._enqueue_unshortened(db, rows, last_id)
+        await AdBulkService._attach_images(db, rows, last_id, result)
+
+    @staticmethod
+    async def _enqueue_unshortened(db: AsyncSession, rows: list[dict], last_id: int) -> None:
+        """
+        이 배치에서 단축하지 못한 활성 광고만 short_url_worker 큐에 넣는다.
+        (title, target_url) 로 id 를 다시 찾되 last_id 이후에 들어온 행으로 좁힌다.
+        """
+        if not short_url_worker.is_running:
+            return
+        pending = {
+            (row["title"], row["target_url"]) for row in rows
+            if row["is_active"] and row["target_url"] and row["short_url"] == row["target_url"]
+        }
+        if not pending:
+            return
+        found = await db.execute(
+            select(Ad.id, Ad.title, Ad.target_url).where(
+                Ad.id > last_id,
+                Ad.target_url.in_({target_url for _, target_url in pending}),
+                Ad.short_url == Ad.target_url,
+            )
+        )
+        for ad_id, title, target_url in found:
+            if (title, target_url) in pending:
+                short_url_worker.enqueue(ad_id, target_url)
+
+    @staticmethod
+    async def _attach_images(db: AsyncSession, rows: list[dict], last_id: int, result: dict) -> None:
+        """
+        이 서버의 /static 이미지를 쓰는 광고에 파생 이미지 생성을 예약한다. (광고를 하나씩 만들 때와 같음)
+        executemany 로 넣은 행의 id 를 모르므로 last_id 이후에 들어온 광고 중 image_url 로 다시 찾는다.
+        외부 URL 이미지는 파생본을 만들지 않는다.
+        """
+        urls = {
+            row["image_url"] for row in rows
+            if row["image_url"] and row["image_url"].startswith("/static/")
+            and os.path.isfile(row["image_url"].lstrip("/"))
+        }
+        if not urls:
+            return
+        targets = await db.execute(
+            select(Ad.id, Ad.image_url).where(
+                Ad.id > last_id, Ad.image_url.in_(urls), Ad.image_variants.is_(None)
+            )
+        )
+        for ad_id, image_url in targets:
+            image_pipeline.attach(ad_id, image_url)
+            result["image_variants_pending"] += 1
+
+    @staticmethod
+    async def import_ads(
+        db: AsyncSession,
+        chunks: AsyncIterable[bytes],
+        fmt: BulkFormat,
+        shorten: bool = True,
+    ) -> dict:
+        """
+        광고를 일괄 등록하고 결과 요약을 반환한다.
+        잘못된 행은 건너뛰고 errors 에 행 번호와 이유를 담는다. (앞선 배치는 이미 커밋된 상태)
+        """
+        rows_iter = iter_csv_rows(chunks) if fmt == "csv" else iter_jsonl_rows(chunks)
+        # buly 를 부를 수 없으면(워커 미기동) 단축은 short_url_worker 에 맡긴다.
+        semaphore = (
+            asyncio.Semaphore(settings.ad_import_shorten_concurrency)
+            if shorten and short_url_worker.is_running
+            else None
+        )
+        result = {
+            "rows": 0, "inserted": 0, "failed": 0, "short_url_pending": 0, "image_variants_pending": 0, "errors": [],
+        }
+        batch: list[dict] = []
+
+        async for row_no, data, error in rows_iter:
+            result["rows"] += 1
+            if error is None:
+                try:
+                    batch.append(_to_values(data))
+                except ValidationError as e:
+                    error = _validation_message(e)
+                except ValueError as e:
+                    error = str(e)
+
+            if error is not None:
+                result["failed"] += 1
+                if len(result["errors"]) < settings.ad_import_max_errors:
+                    result["errors"].append({"row": row_no, "message": error})
+                continue
+
+            if len(batch) >= settings.ad_import_batch_size:
+                await AdBulkService._insert_batch(db, batch, semaphore, result)
+                batch = []
+
+        if batch:
+            await AdBulkService._insert_batch(db, batch, semaphore, result)
+
+        if result["inserted"]:
+            await ad_catalog.publish_reload()
+        return result
+
+    @staticmethod
+    async def export_ads(fmt: BulkFormat, include_inactive: bool = False) -> AsyncIterator[str]:
+        """
+        광고를 id 순으로 CSV / JSON Lines 텍스트 조각으로 내보낸다. (StreamingResponse 용)
+        응답이 끝날 때까지 살아 있어야 하므로 요청 의존성 세션이 아니라 자체 세션을 연다.
+        """
+        columns = [Ad.__table__.c[name] for name in EXPORT_COLUMNS]
+        stmt = (
+            select(*columns)
+            .order_by(Ad.id)
+            .execution_options(yield_per=settings.ad_export_yield_per)
+        )
+        if not include_inactive:
+            stmt = stmt.where(Ad.is_active == True)
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            # 엑셀에서 한글이 깨지지 않도록 BOM 을 붙인다. (가져오기는 BOM 을 무시한다)
+            yield "\ufeff" + ",".join(EXPORT_COLUMNS) + "\r\n"
+
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(stmt)
+            async for rows in result.partitions():
+                if fmt == "csv":
+                    writer.writerows(rows)
+                    chunk = buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    chunk = "".join(
+                        json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, default=str) + "\n"
+                        for row in rows
+                    )
+                yield chunk
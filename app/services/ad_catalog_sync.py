@@ -0,0 +1,205 @@
+# app/services/ad_catalog_sync.py
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict
+from typing import Iterable
+
+from redis.asyncio import Redis
+
+from app.core.redis_client import redis_client
+from app.models.ad import Ad
+from app.services.ad_pool import AdPool, PooledAd, ad_pool
+
+log = logging.getLogger("ad_catalog_sync")
+
+# 모든 워커가 구독하는 광고 변경 이벤트 채널
+CATALOG_CHANNEL = "ad_catalog:events"
+# 변경 이벤트마다 INCR 되는 전역 버전 카운터
+CATALOG_VERSION_KEY = "ad_catalog:version"
+
+
+class AdCatalogSync:
+    """
+    여러 워커/호스트의 메모리 광고 풀(AdPool)을 Redis pub/sub 으로 맞춰주는 클래스.
+
+    [발행]
+    - AdService 가 광고를 커밋하면 notify() 를 호출한다.
+    - 자기 워커의 풀에는 즉시 반영하고,
+      Redis 에서 버전을 INCR 한 뒤 {"v", "ads", "removed"} 이벤트를 PUBLISH 한다.
+      이벤트에 광고 필드를 그대로 싣기 때문에 구독 측은 DB 를 다시 읽지 않는다.
+
+    [구독]
+    - 구독을 시작(또는 재연결)할 때마다 현재 버전을 읽고 전체 재적재한다.
+    - 이벤트 버전이 로컬 버전 + 1 이면 바뀐 광고만 apply_changes() 로 반영한다.
+    - 로컬 버전 이하이면 이미 반영한 것이므로 무시한다.
+    - 중간 버전이 빠졌으면(메시지 유실, 발행 순서 역전) 전체 재적재로 복구한다.
+    - {"reload": true} 이벤트(publish_reload)도 전체 재적재한다.
+    """
+
+    def __init__(self, pool: AdPool, redis: Redis):
+        self.pool = pool
+        self.redis = redis
+        self._task: asyncio.Task | None = None
+
+        self.published = 0
+        self.publish_failures = 0
+        self.applied = 0
+        self.ignored = 0
+        self.full_reloads = 0
+        self.last_lag_ms: float | None = None
+
+    # -------------------------
+    # 발행
+    # -------------------------
+    async def publish(
+        self,
+        upserts: Iterable[PooledAd] = (),
+        removed_ids: Iterable[int] = (),
+    ) -> int | None:
+        """변경 이벤트를 버전과 함께 발행한다. 실패하면 None (주기적 재적재가 보정)."""
+        try:
+            version = await self.redis.incr(CATALOG_VERSION_KEY)
+            message = json.dumps(
+                {
+                    "v": version,
+                    "ts": time.time(),
+                    "ads": [asdict(ad) for ad in upserts],
+                    "removed": list(removed_ids),
+                },
+                ensure_ascii=False,
+            )
+            await self.redis.publish(CATALOG_CHANNEL, message)
+            self.published += 1
+            return version
+        except Exception:
+            self.publish_failures += 1
+            log.exception("Ad catalog publish failed")
+            return None
+
+    async def publish_reload(self) -> int | None:
+        """
+        광고가 한꺼번에 많이 바뀌었을 때(일괄 가져오기 등) 광고 필드 대신
+        "전체 재적재" 이벤트 하나만 발행한다. 자기 워커도 구독으로 받아서 재적재한다.
+        """
+        try:
+            version = await self.redis.incr(CATALOG_VERSION_KEY)
+            await self.redis.publish(
+                CATALOG_CHANNEL, json.dumps({"v": version, "ts": time.time(), "reload": True})
+            )
+            self.published += 1
+            return version
+        except Exception:
+            self.publish_failures += 1
+            log.exception("Ad catalog reload publish failed")
+            return None
+
+    async def notify(self, *ads: Ad) -> None:
+        """
+        AdService 커밋 직후 호출한다.
+        - 활성 광고는 upsert, 비활성(soft delete) 광고는 제거로 처리한다.
+        - 로컬 풀에는 바로 반영하고, 다른 워커를 위해 Redis 로 이벤트를 발행한다.
+        """
+        upserts = [PooledAd.from_orm(ad) for ad in ads if ad.is_active]
+        removed_ids = [ad.id for ad in ads if not ad.is_active]
+
+        self.pool.apply_changes(upserts, removed_ids)
+        await self.publish(upserts, removed_ids)
+
+    # -------------------------
+    # 구독
+    # -------------------------
+    async def _full_reload(self) -> None:
+        # 버전을 먼저 읽고 DB 를 읽어야, 그 사이의 변경이 "이미 반영됨"으로 잘못 처리되지 않는다.
+        raw = await self.redis.get(CATALOG_VERSION_KEY)
+        version = int(raw) if raw else 0
+        await self.pool.reload(version)
+        self.full_reloads += 1
+
+    async def _handle(self, data: str) -> None:
+        event = json.loads(data)
+        version = int(event["v"])
+
+        if version <= self.pool.version:
+            self.ignored += 1
+            return
+
+        if version != self.pool.version + 1 or not self.pool.is_loaded:
+            log.info(
+                "Ad catalog version gap (local=%s, event=%s), full reload",
+                self.pool.version,
+                version,
+            )
+            await self._full_reload()
+            return
+
+        if event.get("reload"):
+            await self._full_reload()
+            return
+
+        self.pool.apply_changes(
+            upserts=[PooledAd(**ad) for ad in event.get("ads", [])],
+            removed_ids=event.get("removed", []),
+        )
+        self.pool.version = version
+        self.applied += 1
+        if event.get("ts"):
+            self.last_lag_ms = (time.time() - event["ts"]) * 1000
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(CATALOG_CHANNEL)
+                # 구독이 잡힌 뒤에 전체 재적재해야 그 사이 이벤트를 놓치지 않는다.
+                await self._full_reload()
+
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        await self._handle(message["data"])
+                    except Exception:
+                        log.exception("Ad catalog event handling failed")
+                        await self._full_reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Ad catalog subscriber disconnected, retrying")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "version": self.pool.version,
+            "published": self.published,
+            "publish_failures": self.publish_failures,
+            "applied": self.applied,
+            "ignored": self.ignored,
+            "full_reloads": self.full_reloads,
+            "last_lag_ms": self.last_lag_ms,
+        }
+
+
+# 워커 단위 전역 인스턴스
+ad_catalog = AdCatalogSync(ad_pool, redis_client)
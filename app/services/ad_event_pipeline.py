@@ -0,0 +1,374 @@
+# app/services/ad_event_pipeline.py
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import deque
+from datetime import datetime
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_client
+from app.models.ad_event import AdEvent
+
+log = logging.getLogger("ad_event_pipeline")
+
+# 모든 워커가 이벤트를 넣는 Redis stream / 적재 담당 consumer group
+EVENT_STREAM = "ad_events:stream"
+EVENT_GROUP = "ad_events:flushers"
+# 끝내 적재하지 못한 항목을 옮겨두는 stream (원래 항목 ID/내용 + 사유를 그대로 남긴다)
+EVENT_DEAD_STREAM = "ad_events:dead"
+
+IMPRESSION = "IMPRESSION"
+CLICK = "CLICK"
+
+# stream 에 싣는 한 글자 코드
+_TYPE_CODES = {IMPRESSION: "i", CLICK: "c"}
+_CODE_TYPES = {v: k for k, v in _TYPE_CODES.items()}
+
+
+def encode_events(events) -> str:
+    """[(ad_id, code, ts_ms), ...] → "12,i,1700000000000;13,c,1700000000123" """
+    return ";".join(f"{ad_id},{code},{ts_ms}" for ad_id, code, ts_ms in events)
+
+
+def decode_events(stream_id: str, payload: str) -> list[dict]:
+    """stream 항목 하나를 ad_events INSERT 용 row 목록으로 되돌린다."""
+    rows = []
+    for seq, item in enumerate(payload.split(";")):
+        if not item:
+            continue
+        ad_id, code, ts_ms = item.split(",")
+        rows.append({
+            "stream_id": stream_id,
+            "seq": seq,
+            "ad_id": int(ad_id),
+            "event_type": _CODE_TYPES[code],
+            "occurred_at": datetime.fromtimestamp(int(ts_ms) / 1000),
+        })
+    return rows
+
+
+class AdEventPipeline:
+    """
+    광고 노출/클릭 이벤트 수집 파이프라인.
+
+    [동작 개요]
+    1. record(): 요청 경로에서 (ad_id, 종류, 시각)을 메모리 버퍼(deque)에 붙이기만 한다.
+       await 도 I/O 도 없다. 버퍼가 가득 차면 새 이벤트를 버리고 dropped 로 집계한다.
+    2. shipper: ship_interval 마다 버퍼를 ship_batch 개씩 묶어
+       Redis stream 에 XADD 한다. (묶음 여러 개를 파이프라인 한 번으로 전송)
+       Redis 장애 시 이벤트를 버퍼 앞쪽으로 되돌리고 다음 주기에 다시 보낸다.
+    3. flusher: consumer group 으로 stream 을 읽어 ad_events 에 여러 행 INSERT 1번으로 적재하고,
+       커밋이 끝난 뒤에야 XACK + XDEL 한다.
+       도중에 워커가 죽으면 ACK 되지 않은 항목을 다른 워커가 XAUTOCLAIM 으로 가져가 다시 적재한다.
+       (at-least-once. 다시 들어온 이벤트는 (stream_id, seq) unique 키 + INSERT IGNORE 로 걸러진다)
+    4. dead-letter: 해석할 수 없는 항목은 바로, max_deliveries 번 전달되고도 적재하지 못한 항목은
+       XAUTOCLAIM 때 ACK 하고 EVENT_DEAD_STREAM 으로 옮긴다. (같은 항목을 영원히 다시 가져오지 않도록)
+
+    메모리 상한: 워커 버퍼는 buffer_size, Redis stream 은 stream_maxlen 항목(MAXLEN ~).
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        buffer_size: int,
+        ship_batch: int,
+        ship_interval: float,
+        stream_maxlen: int,
+        flush_entries: int,
+        claim_idle_seconds: float,
+        max_deliveries: int,
+    ):
+        self.redis = redis
+        self.buffer_size = buffer_size
+        self.ship_batch = ship_batch
+        self.ship_interval = ship_interval
+        self.stream_maxlen = stream_maxlen
+        self.flush_entries = flush_entries
+        self.claim_idle_ms = int(claim_idle_seconds * 1000)
+        self.max_deliveries = max_deliveries
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._buffer: deque = deque()
+        self._tasks: list[asyncio.Task] = []
+
+        self.recorded = 0
+        self.dropped = 0
+        self.shipped = 0
+        self.ship_failures = 0
+        self.flushed = 0
+        self.flush_batches = 0
+        self.flush_failures = 0
+        self.claimed = 0
+        self.dead_lettered = 0
+        self.last_flush_ms: float | None = None
+
+    # -------------------------
+    # 요청 경로
+    # -------------------------
+    def record(self, ad_id: int, event_type: str) -> bool:
+        """이벤트 1건을 버퍼에 넣는다. 버퍼가 가득 찼으면 버리고 False."""
+        if len(self._buffer) >= self.buffer_size:
+            self.dropped += 1
+            return False
+        self._buffer.append((ad_id, _TYPE_CODES[event_type], int(time.time() * 1000)))
+        self.recorded += 1
+        return True
+
+    # -------------------------
+    # 버퍼 → Redis stream
+    # -------------------------
+    async def ship(self) -> int:
+        """버퍼에 쌓인 이벤트를 stream 으로 보낸다. 보낸 이벤트 수를 반환."""
+        if not self._buffer:
+            return 0
+
+        batches = []
+        while self._buffer:
+            n = min(self.ship_batch, len(self._buffer))
+            batches.append([self._buffer.popleft() for _ in range(n)])
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for batch in batches:
+                pipe.xadd(
+                    EVENT_STREAM,
+                    {"e": encode_events(batch)},
+                    maxlen=self.stream_maxlen,
+                    approximate=True,
+                )
+            await pipe.execute()
+        except Exception:
+            self.ship_failures += 1
+            log.exception("Ad event ship failed, keeping events in buffer")
+            # 순서를 유지한 채 앞쪽으로 되돌린다. 그 사이 들어온 이벤트 때문에 넘치는 만큼은 버린다.
+            for batch in reversed(batches):
+                for event in reversed(batch):
+                    if len(self._buffer) >= self.buffer_size:
+                        self.dropped += 1
+                        continue
+                    self._buffer.appendleft(event)
+            return 0
+
+        shipped = sum(len(batch) for batch in batches)
+        self.shipped += shipped
+        return shipped
+
+    async def _ship_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ship_interval)
+            await self.ship()
+
+    # -------------------------
+    # Redis stream → MariaDB
+    # -------------------------
+    async def _ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(EVENT_STREAM, EVENT_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _dead_letter(self, pipe, stream_id: str, payload, reason: str, deliveries: int = 0) -> None:
+        """항목 하나를 dead-letter stream 에 옮기는 명령을 pipe 에 싣는다. (ACK/XDEL 은 호출한 쪽에서)"""
+        pipe.xadd(
+            EVENT_DEAD_STREAM,
+            {"id": stream_id, "e": payload or "", "reason": reason, "deliveries": deliveries},
+            maxlen=self.stream_maxlen,
+            approximate=True,
+        )
+        self.dead_lettered += 1
+        log.warning(
+            "Ad event entry %s moved to %s (reason=%s, deliveries=%s)",
+            stream_id, EVENT_DEAD_STREAM, reason, deliveries,
+        )
+
+    async def _store(self, entries) -> int:
+        """stream 항목들을 적재하고 ACK 한다. 적재한 이벤트 수를 반환."""
+        if not entries:
+            return 0
+
+        rows = []
+        broken = []
+        for stream_id, fields in entries:
+            payload = fields.get("e") if fields else None
+            if not payload:
+                continue
+            try:
+                rows.extend(decode_events(stream_id, payload))
+            except (ValueError, KeyError, OverflowError, OSError):
+                # 몇 번을 다시 읽어도 해석되지 않으므로 재시도하지 않고 바로 옮긴다.
+                broken.append((stream_id, payload))
+
+        start = time.perf_counter()
+        if rows:
+            async with AsyncSessionLocal() as db:
+                stmt = (
+                    insert(AdEvent)
+                    .prefix_with("IGNORE", dialect="mysql")
+                    .prefix_with("OR IGNORE", dialect="sqlite")
+                )
+                await db.execute(stmt, rows)
+                await db.commit()
+
+        # 커밋이 끝난 뒤에만 ACK 한다. (여기서 죽으면 재처리되고 unique 키가 중복을 막는다)
+        ids = [stream_id for stream_id, _ in entries]
+        pipe = self.redis.pipeline(transaction=False)
+        for stream_id, payload in broken:
+            self._dead_letter(pipe, stream_id, payload, "decode")
+        pipe.xack(EVENT_STREAM, EVENT_GROUP, *ids)
+        pipe.xdel(EVENT_STREAM, *ids)
+        await pipe.execute()
+
+        self.flushed += len(rows)
+        self.flush_batches += 1
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        return len(rows)
+
+    async def _delivery_counts(self, ids) -> dict:
+        """XPENDING 으로 항목별 전달 횟수를 조회한다. (XAUTOCLAIM 으로 가져온 직후라 이번 전달까지 포함)"""
+        pipe = self.redis.pipeline(transaction=False)
+        for stream_id in ids:
+            pipe.xpending_range(EVENT_STREAM, EVENT_GROUP, min=stream_id, max=stream_id, count=1)
+        counts = {}
+        for stream_id, pending in zip(ids, await pipe.execute()):
+            counts[stream_id] = pending[0]["times_delivered"] if pending else 0
+        return counts
+
+    async def _bury(self, entries, counts: dict) -> None:
+        """전달 횟수를 다 쓴 항목을 dead-letter stream 으로 옮기고 원래 stream 에서는 ACK + XDEL 한다."""
+        ids = [stream_id for stream_id, _ in entries]
+        pipe = self.redis.pipeline(transaction=False)
+        for stream_id, fields in entries:
+            self._dead_letter(pipe, stream_id, fields.get("e"), "max_deliveries", counts[stream_id])
+        pipe.xack(EVENT_STREAM, EVENT_GROUP, *ids)
+        pipe.xdel(EVENT_STREAM, *ids)
+        await pipe.execute()
+
+    async def _claim_stale(self) -> int:
+        """
+        죽은 워커가 ACK 하지 못한 항목(또는 이 워커가 적재에 실패한 항목)을 가져와 적재한다.
+        이미 max_deliveries 번 시도하고도 남아 있는 항목은 적재하지 않고 dead-letter stream 으로 옮긴다.
+        """
+        total = 0
+        start_id = "0-0"
+        while True:
+            result = await self.redis.xautoclaim(
+                EVENT_STREAM,
+                EVENT_GROUP,
+                self.consumer,
+                min_idle_time=self.claim_idle_ms,
+                start_id=start_id,
+                count=self.flush_entries,
+            )
+            start_id, entries = result[0], result[1]
+            entries = [(stream_id, fields) for stream_id, fields in entries if fields]
+            if entries:
+                self.claimed += len(entries)
+                counts = await self._delivery_counts([stream_id for stream_id, _ in entries])
+                exhausted = [e for e in entries if counts[e[0]] > self.max_deliveries]
+                if exhausted:
+                    await self._bury(exhausted, counts)
+                    entries = [e for e in entries if counts[e[0]] <= self.max_deliveries]
+                total += await self._store(entries)
+            if start_id in ("0-0", b"0-0"):
+                return total
+
+    async def _flush_loop(self) -> None:
+        last_claim = 0.0
+        recovered = False
+        while True:
+            try:
+                await self._ensure_group()
+                # 재시작 전에 이 consumer 이름으로 받아두고 ACK 못 한 항목부터 처리.
+                # 다시 읽을 때마다 전달 횟수가 오르므로 한 번만 시도하고, 실패한 항목은 claim 주기에 맡긴다.
+                if not recovered:
+                    recovered = True
+                    pending = await self.redis.xreadgroup(
+                        EVENT_GROUP, self.consumer, {EVENT_STREAM: "0"}, count=self.flush_entries
+                    )
+                    for _, entries in pending or []:
+                        await self._store(entries)
+
+                while True:
+                    if time.monotonic() - last_claim >= self.claim_idle_ms / 1000:
+                        last_claim = time.monotonic()
+                        await self._claim_stale()
+
+                    # BLOCK 으로 커넥션을 붙잡지 않고, 비어 있으면 잠깐 쉬었다가 다시 읽는다.
+                    response = await self.redis.xreadgroup(
+                        EVENT_GROUP,
+                        self.consumer,
+                        {EVENT_STREAM: ">"},
+                        count=self.flush_entries,
+                    )
+                    stored = 0
+                    for _, entries in response or []:
+                        stored += len(entries)
+                        await self._store(entries)
+                    if not stored:
+                        await asyncio.sleep(self.ship_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.flush_failures += 1
+                log.exception("Ad event flush failed, retrying")
+                await asyncio.sleep(1.0)
+
+    # -------------------------
+    # 수명 주기
+    # -------------------------
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._ship_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        # 남은 버퍼는 stream 으로 넘겨두면 다른(또는 다음) 워커가 적재한다.
+        await self.ship()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "shipped": self.shipped,
+            "ship_failures": self.ship_failures,
+            "flushed": self.flushed,
+            "flush_batches": self.flush_batches,
+            "flush_failures": self.flush_failures,
+            "claimed": self.claimed,
+            "dead_lettered": self.dead_lettered,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+# 워커 단위 전역 인스턴스
+ad_events = AdEventPipeline(
+    redis=redis_client,
+    buffer_size=settings.ad_event_buffer_size,
+    ship_batch=settings.ad_event_ship_batch,
+    ship_interval=settings.ad_event_ship_interval_seconds,
+    stream_maxlen=settings.ad_event_stream_maxlen,
+    flush_entries=settings.ad_event_flush_entries,
+    claim_idle_seconds=settings.ad_event_claim_idle_seconds,
+    max_deliveries=settings.ad_event_max_deliveries,
+)
@@ -0,0 +1,560 @@
+# app/services/ad_pool.py
+import asyncio
+import heapq
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.ad import Ad
+from app.models.placement import Placement
+from app.schemas.ad import PublicAdResponse
+from app.schemas.common import ApiResponse
+from app.services.ad_sampler import AliasSampler
+
+log = logging.getLogger("ad_pool")
+
+
+@dataclass(frozen=True, slots=True)
+class PooledAd:
+    """
+    공개 광고 API 에서 내려줄 필드만 담은 불변 광고 스냅샷.
+    ORM 객체와 달리 세션에 묶여 있지 않으므로 여러 요청에서 공유해도 안전하다.
+    """
+    id: int
+    ad_type: str
+    title: str
+    description: str | None
+    image_url: str | None
+    image_width: int | None
+    image_height: int | None
+    image_variants: list[dict] | None
+    short_url: str | None
+    target_url: str | None
+    embed_src: str | None
+    embed_width: int | None
+    embed_height: int | None
+    weight: int
+    # 지정한 광고 자리 id. None 이면 종류/크기가 맞는 모든 자리 (placement_index 참고)
+    placement_ids: tuple[int, ...] | None = None
+    # 노출 기간 (epoch 초). None 이면 그쪽으로 제한 없음
+    start_ts: float | None = None
+    end_ts: float | None = None
+    # 노출 예산 (None 이면 제한 없음, impression_budget 참고)
+    daily_impression_cap: int | None = None
+    total_impression_cap: int | None = None
+    pacing: bool = False
+
+    def __post_init__(self):
+        # 변경 이벤트(JSON)로 받으면 list 로 들어오므로 튜플로 맞춘다. (스냅샷 간 비교용)
+        if self.placement_ids is not None and not isinstance(self.placement_ids, tuple):
+            object.__setattr__(self, "placement_ids", tuple(self.placement_ids))
+
+    @classmethod
+    def from_orm(cls, ad: Ad) -> "PooledAd":
+        return cls(
+            id=ad.id,
+            ad_type=ad.ad_type or "IMAGE",
+            title=ad.title,
+            description=ad.description,
+            image_url=ad.image_url,
+            image_width=ad.image_width,
+            image_height=ad.image_height,
+            image_variants=ad.image_variants,
+            short_url=ad.short_url,
+            target_url=ad.target_url,
+            embed_src=ad.embed_src,
+            embed_width=ad.embed_width,
+            embed_height=ad.embed_height,
+            weight=ad.weight if ad.weight is not None else 1,
+            placement_ids=tuple(ad.placement_ids) if ad.placement_ids else None,
+            start_ts=ad.start_at.timestamp() if ad.start_at else None,
+            end_ts=ad.end_at.timestamp() if ad.end_at else None,
+            daily_impression_cap=ad.daily_impression_cap,
+            total_impression_cap=ad.total_impression_cap,
+            pacing=bool(ad.pacing),
+        )
+
+    @property
+    def is_budgeted(self) -> bool:
+        return self.daily_impression_cap is not None or self.total_impression_cap is not None
+
+    def is_live(self, now: float) -> bool:
+        """노출 기간 안인지 (start_at <= now < end_at). 스냅샷을 만들 때만 쓰고 요청마다 부르지 않는다."""
+        if self.start_ts is not None and now < self.start_ts:
+            return False
+        if self.end_ts is not None and now >= self.end_ts:
+            return False
+        return True
+
+
+@dataclass(frozen=True, slots=True)
+class PooledPlacement:
+    """활성 광고 자리 스냅샷. (site, slot) 으로 찾고, accepts() 로 광고 종류/크기가 맞는지 본다."""
+    id: int
+    site: str
+    slot: str
+    width: int | None
+    height: int | None
+    ad_types: frozenset[str]
+
+    @classmethod
+    def from_orm(cls, placement: Placement) -> "PooledPlacement":
+        return cls(
+            id=placement.id,
+            site=placement.site,
+            slot=placement.slot,
+            width=placement.width,
+            height=placement.height,
+            ad_types=frozenset(t.strip() for t in (placement.ad_types or "").split(",") if t.strip()),
+        )
+
+    def accepts(self, ad_type: str, embed_width: int | None, embed_height: int | None) -> bool:
+        """
+        이 자리에 해당 종류/크기의 광고를 내보낼 수 있는지.
+        IFRAME 은 고정 크기라 embed_width/embed_height 가 자리 크기 안에 들어가야 하고,
+        IMAGE 는 파생본(image_variants) 중 맞는 크기를 골라 쓰므로 크기를 보지 않는다.
+        """
+        if ad_type not in self.ad_types:
+            return False
+        if ad_type == "IFRAME":
+            if self.width is not None and (embed_width or 0) > self.width:
+                return False
+            if self.height is not None and (embed_height or 0) > self.height:
+                return False
+        return True
+
+
+def render_public_ad(ad: PooledAd) -> bytes:
+    """
+    공개 광고 API 의 광고 하나(PublicAdResponse) JSON bytes.
+    response_model 로 내보내던 것과 같은 모델로 직렬화하므로 필드 순서/형식이 그대로다.
+    (pydantic-core 의 Rust JSON 직렬화기 사용, ApiResponse 로 감싸는 것은 api_response_bytes)
+    """
+    return PublicAdResponse(
+        id=ad.id,
+        ad_type=ad.ad_type,
+        title=ad.title,
+        description=ad.description,
+        image_url=ad.image_url,
+        image_width=ad.image_width,
+        image_height=ad.image_height,
+        image_variants=ad.image_variants,
+        short_url=ad.short_url,
+        target_url=ad.target_url,
+        embed_src=ad.embed_src,
+        embed_width=ad.embed_width,
+        embed_height=ad.embed_height,
+    ).model_dump_json().encode()
+
+
+@lru_cache(maxsize=32)
+def _api_response_head(message: str) -> bytes:
+    # {"code":200,"message":"...","result":null} 에서 null} 앞부분
+    head = ApiResponse[None](code=200, message=message).model_dump_json()
+    return head[:-len("null}")].encode()
+
+
+def api_response_bytes(message: str, result: bytes) -> bytes:
+    """ApiResponse(code=200, message=message, result=...) 와 같은 JSON. result 는 이미 직렬화된 bytes."""
+    return _api_response_head(message) + result + b"}"
+
+
+class AdSnapshot:
+    """
+    특정 시점의 활성 광고 전체를 담는 불변 스냅샷.
+    - ads: 활성 광고 튜플 (노출 기간 전/후 광고 포함)
+    - by_id: id → 광고 조회용 읽기 전용 매핑
+    - live: 스냅샷을 만든 시각(now) 기준 노출 기간 안이고 멈춤(suspended) 상태가 아닌 광고 (id → 광고)
+    - sampler: live 광고의 weight 기반 alias 테이블 (스냅샷을 만들 때 한 번만 계산)
+    - bodies: id → 직렬화해 둔 공개 API 광고 JSON (render_public_ad)
+      광고마다 처음 내려줄 때 한 번 만들고, 다음 스냅샷에도 내용이 같은 광고의 본문은 그대로 넘긴다.
+      (광고 10만 개를 적재 시점에 한꺼번에 직렬화하면 그동안 이벤트 루프가 멈추므로)
+    - placements: 활성 광고 자리 튜플 (전체 재적재 때만 다시 읽고, 부분 반영은 그대로 넘긴다)
+    교체는 AdPool 이 참조 하나를 바꿔 끼우는 방식으로만 이루어진다.
+    """
+    __slots__ = ("ads", "by_id", "live", "bodies", "sampler", "placements", "loaded_at")
+
+    def __init__(
+        self,
+        ads: tuple[PooledAd, ...],
+        bodies: dict[int, bytes] | None = None,
+        placements: tuple[PooledPlacement, ...] = (),
+        now: float | None = None,
+        suspended: Mapping[int, float] | None = None,
+    ):
+        now = time.time() if now is None else now
+        self.ads = ads
+        self.by_id: Mapping[int, PooledAd] = MappingProxyType({ad.id: ad for ad in ads})
+        if suspended:
+            live = tuple(ad for ad in ads if ad.is_live(now) and suspended.get(ad.id, 0.0) <= now)
+        else:
+            live = tuple(ad for ad in ads if ad.is_live(now))
+        self.live: Mapping[int, PooledAd] = MappingProxyType({ad.id: ad for ad in live})
+        self.sampler: AliasSampler[PooledAd] = AliasSampler(live, [ad.weight for ad in live])
+        self.bodies: dict[int, bytes] = bodies if bodies is not None else {}
+        self.placements = placements
+        self.loaded_at = time.monotonic()
+
+    def reusable_bodies(self, ads: Iterable[PooledAd]) -> dict[int, bytes]:
+        """전체 재적재용. ads 중 이 스냅샷과 내용이 같은 광고의 직렬화 본문만 골라 돌려준다."""
+        bodies, by_id = self.bodies, self.by_id
+        reused = {}
+        for ad in ads:
+            body = bodies.get(ad.id)
+            if body is not None and by_id[ad.id] == ad:
+                reused[ad.id] = body
+        return reused
+
+    def body(self, ad: PooledAd) -> bytes:
+        body = self.bodies.get(ad.id)
+        if body is None:
+            body = self.bodies[ad.id] = render_public_ad(ad)
+        return body
+
+
+PoolListener = Callable[[AdSnapshot | None, tuple[PooledAd, ...] | None, tuple[int, ...]], None]
+
+
+class AdPool:
+    """
+    GET /api/public/ad 가 요청마다 DB 를 읽지 않도록 활성 광고를 메모리에 들고 있는 풀.
+
+    [동작 개요]
+    1. 백그라운드 태스크가 refresh_interval 초마다 DB 에서 활성 광고를 다시 읽는다 (안전망).
+    2. 광고 변경은 apply_changes() 로 바뀐 광고만 반영한다.
+       (같은 워커의 AdService 커밋 직후 + 다른 워커가 Redis 로 보낸 변경 이벤트, ad_catalog_sync 참고)
+    3. pick() 은 현재 스냅샷의 alias 테이블에서 weight 비율대로 광고 하나를 O(1) 로 고른다.
+       스냅샷이 아직 없으면 miss 로 집계하고 None 을 반환한다 (호출부가 DB 로 폴백).
+       pick_rendered() 는 직렬화해 둔 광고 JSON 까지 함께 돌려준다.
+       pick_many() 는 서로 다른 광고 여러 개를 고른다. (한 페이지의 여러 광고 자리)
+    4. 스냅샷이 바뀔 때마다 add_listener() 로 등록한 함수에 알린다.
+       (목록 건수 캐시 무효화 등, 광고 변경에 맞춰 같이 갱신해야 하는 워커 메모리 상태용)
+    5. 노출 기간(start_at/end_at)은 요청마다 비교하지 않는다.
+       스냅샷은 만든 시각 기준으로 기간 안인 광고만 추첨 대상(live)에 넣고,
+       아직 지나지 않은 경계 시각은 (시각, 광고 id) 힙에 넣어 가장 이른 경계에 타이머(loop.call_at) 하나를 건다.
+       타이머가 울리면 그 시각이 된 광고만 다시 판단한 새 스냅샷으로 바꾸고,
+       들어오거나 나간 광고를 upserts 로 리스너에 알린다. (DB 조회/전체 재적재 없음)
+       기간 변경은 다른 변경과 똑같이 apply_changes 로 들어오고, 새 경계가 힙에 추가된다.
+    6. suspend() 로 광고를 정해진 시각까지 추첨 대상에서 뺄 수 있다. (노출 예산 소진 등, impression_budget 참고)
+       같은 경계 힙/타이머로 처리하므로 한 번에 여러 광고가 멈춰도 스냅샷은 한 번만 다시 만든다.
+       광고가 바뀌면(apply_changes) 멈춤을 풀고 다시 판단하게 한다.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._snapshot: AdSnapshot | None = None
+        self._task: asyncio.Task | None = None
+
+        # 마지막으로 반영한 카탈로그 변경 이벤트 버전 (ad_catalog_sync 가 관리)
+        self.version = 0
+        # apply_changes 가 호출될 때마다 증가. 주기적 재적재가 그 사이의 변경을 덮어쓰지 않게 한다.
+        self._generation = 0
+        # (리스너, 기간 경계/멈춤 전환도 받을지)
+        self._listeners: list[tuple[PoolListener, bool]] = []
+        # 노출 기간 경계 (epoch 초, 광고 id) 최소 힙과 가장 이른 경계에 걸어 둔 타이머
+        self._boundaries: list[tuple[float, int]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_at: float | None = None
+        # 광고 id → 이 시각(epoch 초)까지 추첨 대상에서 뺀다. (math.inf 면 광고가 바뀔 때까지)
+        self._suspended: dict[int, float] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.transitions = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> AdSnapshot | None:
+        return self._snapshot
+
+    def pick(self) -> PooledAd | None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return snapshot.sampler.sample()
+
+    def pick_rendered(self) -> tuple[PooledAd, bytes] | None:
+        """pick() 과 같지만 같은 스냅샷에서 직렬화해 둔 광고 JSON 도 함께 반환한다."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        ad = snapshot.sampler.sample()
+        if ad is None:
+            return None
+        return ad, snapshot.body(ad)
+
+    def pick_many(self, count: int) -> list[tuple[PooledAd, bytes]] | None:
+        """
+        weight 비율대로 서로 다른 광고를 최대 count 개 고른다. (광고 JSON 포함)
+        중복이 나오면 다시 뽑되, 시도 횟수를 제한해서 노출 가능한 광고가 적으면 count 개보다 적게 돌려준다.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        sampler = snapshot.sampler
+        count = min(count, len(sampler))
+        picked: dict[int, PooledAd] = {}
+        for _ in range(count * 8):
+            if len(picked) >= count:
+                break
+            ad = sampler.sample()
+            picked.setdefault(ad.id, ad)
+        return [(ad, snapshot.body(ad)) for ad in picked.values()]
+
+    def add_listener(self, listener: PoolListener, transitions: bool = True) -> None:
+        """
+        스냅샷 교체 알림을 받을 함수를 등록한다.
+        listener(snapshot, upserts, removed_ids)
+        - 전체 재적재: upserts 가 None
+        - 부분 반영  : 바뀐 광고 / 제거된 id 튜플 (스냅샷 적재 전이면 snapshot 이 None)
+        transitions=False 면 광고 자체는 그대로이고 추첨 대상 여부만 바뀐 알림
+        (노출 기간 경계, 노출 예산 멈춤/재개)은 받지 않는다. (DB 내용에 맞춰 둔 캐시용)
+        """
+        self._listeners.append((listener, transitions))
+
+    def _notify(self, snapshot, upserts, removed_ids, transition: bool = False) -> None:
+        for listener, wants_transitions in self._listeners:
+            if transition and not wants_transitions:
+                continue
+            try:
+                listener(snapshot, upserts, removed_ids)
+            except Exception:
+                log.exception("Ad pool listener failed")
+
+    # -------------------------
+    # 노출 기간 스케줄러
+    # -------------------------
+    def _schedule(self, ads: Iterable[PooledAd], now: float) -> None:
+        """ads 의 아직 지나지 않은 경계 시각을 힙에 넣고 타이머를 다시 건다."""
+        for ad in ads:
+            for ts in (ad.start_ts, ad.end_ts):
+                if ts is not None and ts > now:
+                    heapq.heappush(self._boundaries, (ts, ad.id))
+        self._arm()
+
+    def _arm(self) -> None:
+        if not self._boundaries:
+            self._cancel_timer()
+            return
+        at = self._boundaries[0][0]
+        if self._timer is not None and self._timer_at == at:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖(스크립트 등)에서는 타이머 없이 둔다. 다음 적재 때 다시 건다.
+            return
+        self._cancel_timer()
+        self._timer_at = at
+        self._timer = loop.call_at(loop.time() + max(0.0, at - time.time()), self._on_boundary)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_at = None
+
+    def suspend(self, ad_id: int, until: float) -> None:
+        """광고를 until(epoch 초)까지 이 워커의 추첨 대상에서 뺀다. 바로 다음 루프 차례에 스냅샷에 반영된다."""
+        now = time.time()
+        self._suspended[ad_id] = until
+        heapq.heappush(self._boundaries, (now, ad_id))
+        if until != math.inf:
+            heapq.heappush(self._boundaries, (until, ad_id))
+        self._arm()
+
+    def _on_boundary(self) -> None:
+        self._timer = None
+        self._timer_at = None
+        now = time.time()
+        due = set()
+        while self._boundaries and self._boundaries[0][0] <= now:
+            due.add(heapq.heappop(self._boundaries)[1])
+        for ad_id in due:
+            if self._suspended.get(ad_id, math.inf) <= now:
+                del self._suspended[ad_id]
+
+        snapshot = self._snapshot
+        if due and snapshot is not None:
+            fresh = AdSnapshot(snapshot.ads, snapshot.bodies, snapshot.placements, now=now, suspended=self._suspended)
+            # 이미 바뀐/삭제된 광고의 예전 경계도 힙에 남아 있을 수 있으므로 실제로 바뀐 광고만 알린다.
+            changed = tuple(
+                snapshot.by_id[ad_id] for ad_id in due
+                if ad_id in snapshot.by_id and (ad_id in snapshot.live) != (ad_id in fresh.live)
+            )
+            if changed:
+                self._snapshot = fresh
+                self.transitions += len(changed)
+                self._notify(fresh, changed, (), transition=True)
+        self._arm()
+
+    # -------------------------
+    # 적재
+    # -------------------------
+    async def load(self, db: AsyncSession, version: int | None = None) -> AdSnapshot:
+        """
+        DB 에서 활성 광고와 활성 광고 자리를 읽어 새 스냅샷으로 교체한다.
+        version 을 넘기면 이 스냅샷이 해당 카탈로그 버전까지 반영한 것으로 기록한다.
+
+        버전 없이 호출된 주기적 재적재 도중에 apply_changes 가 끼어들었다면,
+        방금 읽은 결과가 더 오래된 상태일 수 있으므로 교체하지 않는다 (다음 주기에 다시 시도).
+        """
+        generation = self._generation
+        result = await db.execute(select(Ad).where(Ad.is_active == True))
+        rows = result.scalars().all()
+        ads = tuple(PooledAd.from_orm(ad) for ad in rows)
+        result = await db.execute(select(Placement).where(Placement.is_active == True))
+        placements = tuple(PooledPlacement.from_orm(p) for p in result.scalars().all())
+        previous = self._snapshot
+        snapshot = AdSnapshot(
+            ads,
+            previous.reusable_bodies(ads) if previous is not None else None,
+            placements,
+            suspended=self._suspended,
+        )
+        if version is None and generation != self._generation:
+            return self._snapshot
+        self._snapshot = snapshot
+        if version is not None:
+            self.version = version
+        self.refreshes += 1
+        self._boundaries = []
+        now = time.time()
+        self._suspended = {
+            ad_id: until for ad_id, until in self._suspended.items()
+            if until > now and ad_id in snapshot.by_id
+        }
+        for ad_id, until in self._suspended.items():
+            if until != math.inf:
+                heapq.heappush(self._boundaries, (until, ad_id))
+        self._schedule(ads, now)
+        self._notify(snapshot, None, ())
+        return snapshot
+
+    async def reload(self, version: int | None = None) -> AdSnapshot:
+        """새 세션을 열어 load() 를 수행한다."""
+        async with AsyncSessionLocal() as db:
+            return await self.load(db, version=version)
+
+    def apply_changes(
+        self,
+        upserts: Iterable[PooledAd] = (),
+        removed_ids: Iterable[int] = (),
+    ) -> None:
+        """
+        바뀐 광고만 반영한 새 스냅샷으로 교체한다. DB 는 조회하지 않는다.
+        - upserts: 새로 생겼거나 수정된 활성 광고
+        - removed_ids: 비활성화(soft delete)된 광고 id
+        같은 변경을 여러 번 적용해도 결과가 같다(멱등).
+        """
+        upserts = tuple(upserts)
+        removed_ids = tuple(removed_ids)
+        snapshot = self._snapshot
+        if snapshot is None:
+            # 아직 적재 전이면 곧 전체 적재가 이루어지므로 스냅샷은 그대로 둔다.
+            self._notify(None, upserts, removed_ids)
+            return
+
+        by_id = dict(snapshot.by_id)
+        for ad_id in removed_ids:
+            by_id.pop(ad_id, None)
+        for ad in upserts:
+            by_id[ad.id] = ad
+
+        bodies = dict(snapshot.bodies)
+        for ad_id in removed_ids:
+            bodies.pop(ad_id, None)
+            self._suspended.pop(ad_id, None)
+        for ad in upserts:
+            bodies.pop(ad.id, None)
+            # 한도 등이 바뀌었을 수 있으므로 멈춤을 풀고 다시 판단하게 한다.
+            self._suspended.pop(ad.id, None)
+
+        now = time.time()
+        self._snapshot = AdSnapshot(
+            tuple(by_id.values()), bodies, snapshot.placements, now=now, suspended=self._suspended
+        )
+        self._generation += 1
+        self._schedule(upserts, now)
+        self._notify(self._snapshot, upserts, removed_ids)
+
+    # -------------------------
+    # 백그라운드 태스크
+    # -------------------------
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reload()
+            except Exception:
+                self.refresh_failures += 1
+                log.exception("Ad pool refresh failed")
+
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._cancel_timer()
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        total = self.hits + self.misses
+        return {
+            "loaded": snapshot is not None,
+            "active_ads": len(snapshot.ads) if snapshot else 0,
+            "live_ads": len(snapshot.live) if snapshot else 0,
+            "scheduled_boundaries": len(self._boundaries),
+            "next_boundary_in_seconds": (
+                max(0.0, self._boundaries[0][0] - time.time()) if self._boundaries else None
+            ),
+            "schedule_transitions": self.transitions,
+            "suspended_ads": len(self._suspended),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else None,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refresh_age_seconds": (
+                time.monotonic() - snapshot.loaded_at if snapshot else None
+            ),
+            "refresh_interval_seconds": self.refresh_interval,
+            "version": self.version,
+        }
+
+
+# 워커(프로세스) 단위로 하나만 사용하는 전역 풀
+ad_pool = AdPool(refresh_interval=settings.ad_pool_refresh_seconds)
@@ -0,0 +1,75 @@
+# app/services/ad_sampler.py
+import random
+from typing import Generic, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasSampler(Generic[T]):
+    """
+    Walker/Vose alias method 기반 가중치 샘플러.
+
+    [동작 개요]
+    - 생성 시 O(n) 으로 prob/alias 테이블을 미리 계산한다.
+    - sample() 은 난수 하나만 뽑아 정수부로 칸을 고르고 소수부로 동전 던지기를 하므로
+      항목 수와 상관없이 O(1) 이다.
+    - weight <= 0 인 항목은 테이블에서 제외된다 (노출되지 않음).
+
+    광고 구성이 바뀔 때만 다시 만들고, 요청 처리 중에는 읽기만 하므로
+    여러 요청이 동시에 공유해도 안전하다.
+    """
+    __slots__ = ("_items", "_prob", "_alias")
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        pairs = [(item, float(w)) for item, w in zip(items, weights) if w and w > 0]
+        n = len(pairs)
+        self._items: tuple[T, ...] = tuple(item for item, _ in pairs)
+        self._prob: list[float] = [0.0] * n
+        self._alias: list[int] = [0] * n
+        if n == 0:
+            return
+
+        total = sum(w for _, w in pairs)
+        # 평균이 1 이 되도록 스케일링
+        scaled = [w * n / total for _, w in pairs]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            # 큰 칸에서 작은 칸을 채워준 만큼 빼준다
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # 부동소수 오차로 남은 칸은 확률 1 로 고정
+        for i in large:
+            self._prob[i] = 1.0
+        for i in small:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def items(self) -> tuple[T, ...]:
+        return self._items
+
+    def sample(self, rng: random.Random | None = None) -> T | None:
+        if not self._items:
+            return None
+        n = len(self._items)
+        r = (rng or random).random() * n
+        i = int(r)
+        if i >= n:
+            # random() * n 가 반올림으로 n 이 되는 극단적인 경우 방어
+            i = n - 1
+        # r 의 소수부를 동전 던지기로 재사용해서 난수 호출을 한 번으로 줄인다
+        if r - i < self._prob[i]:
+            return self._items[i]
+        return self._items[self._alias[i]]
@@ -0,0 +1,240 @@
+# app/services/ad_search.py
+import asyncio
+import logging
+import time
+import unicodedata
+from typing import Iterable
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.services.ad_pool import AdSnapshot, PooledAd, ad_pool
+
+log = logging.getLogger("ad_search")
+
+def normalize_text(text: str | None) -> str:
+    """검색용 정규화: NFKC(전각/반각, 호환 자모 통일) + 소문자 + 연속 공백 하나로."""
+    if not text:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+def bigrams(text: str) -> set[str]:
+    """
+    글자 단위 2-gram.
+    한국어는 형태소 분석 없이도 음절 2-gram 으로 부분 문자열 검색이 된다.
+    (예: "광고관리" → {"광고", "고관", "관리"})
+    한 글자짜리 문자열은 그 글자 자체를 gram 으로 쓴다.
+    """
+    if len(text) == 1:
+        return {text}
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class AdSearchIndex:
+    """
+    활성 광고 title/description 에 대한 워커 메모리 2-gram 역색인.
+
+    - ad_pool 리스너로 등록되어 광고 풀과 같은 시점에 갱신된다.
+      (이 워커의 커밋, 다른 워커의 변경 이벤트, 주기적 전체 재적재)
+      전체 재적재 때는 title/description 이 바뀐 광고만 다시 색인한다.
+    - 처음 색인은 광고 수에 비례해 오래 걸리므로 스레드에서 새 색인을 만든 뒤 교체하고,
+      그동안 들어온 변경은 모아 두었다가 교체 직후 반영한다. (그 전까지 ready=False → LIKE 검색)
+    - search(): 검색어의 2-gram posting 교집합으로 후보를 좁힌 뒤,
+      후보만 실제 부분 문자열 포함 여부를 확인한다. (LIKE '%kw%' 와 같은 결과, 대소문자 무시)
+      검색어가 정확히 2글자면 posting 자체가 답이라 확인도 생략하고,
+      1글자면 그 글자가 들어 있는 gram 들의 posting 합집합이 답이다.
+    - 순위: 제목에 포함 > 설명에만 포함, 같은 등급은 최신(id 큰) 순
+      제목 전용 posting 을 따로 두어 등급을 집합 연산으로 나눈다.
+    - 같은 검색어의 결과는 다음 변경 전까지 캐시한다. (목록 페이지 넘김)
+    """
+
+    def __init__(self):
+        # id → 원문 (title, description). 재적재 때 바뀌었는지 정규화 없이 비교하는 용도
+        self._raw: dict[int, tuple[str | None, str | None]] = {}
+        # id → 정규화된 (title, description)
+        self._docs: dict[int, tuple[str, str]] = {}
+        # 2-gram → 광고 id (title + description / title 만)
+        self._postings: dict[str, set[int]] = {}
+        self._title_postings: dict[str, set[int]] = {}
+        # 정규화된 검색어 → 정렬된 결과 id 목록. 색인이 바뀌면 비운다.
+        self._results = TTLCache(maxsize=128, ttl=settings.ad_count_cache_seconds)
+        self.ready = False
+
+        self._building: asyncio.Future | None = None
+        # 스레드 색인 중에 들어온 리스너 호출 인자 (snapshot, upserts, removed_ids)
+        self._pending: list[tuple] = []
+
+        self.searches = 0
+        self.last_build_ms: float | None = None
+
+    # -------------------------
+    # 색인
+    # -------------------------
+    @staticmethod
+    def _index(postings: dict[str, set[int]], grams: set[str], ad_id: int) -> None:
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {ad_id}
+            else:
+                posting.add(ad_id)
+
+    @staticmethod
+    def _unindex(postings: dict[str, set[int]], grams: set[str], ad_id: int) -> None:
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is not None:
+                posting.discard(ad_id)
+                if not posting:
+                    del postings[gram]
+
+    def _add(self, ad_id: int, title: str, description: str) -> None:
+        self._docs[ad_id] = (title, description)
+        title_grams = bigrams(title)
+        self._index(self._postings, title_grams | bigrams(description), ad_id)
+        self._index(self._title_postings, title_grams, ad_id)
+        self._results.clear()
+
+    def _remove(self, ad_id: int) -> None:
+        self._raw.pop(ad_id, None)
+        doc = self._docs.pop(ad_id, None)
+        if doc is None:
+            return
+        title_grams = bigrams(doc[0])
+        self._unindex(self._postings, title_grams | bigrams(doc[1]), ad_id)
+        self._unindex(self._title_postings, title_grams, ad_id)
+        self._results.clear()
+
+    def _upsert(self, ad: PooledAd) -> None:
+        raw = (ad.title, ad.description)
+        if self._raw.get(ad.id) == raw:
+            return
+        self._remove(ad.id)
+        self._raw[ad.id] = raw
+        self._add(ad.id, normalize_text(ad.title), normalize_text(ad.description))
+
+    def build(self, ads: Iterable[PooledAd]) -> None:
+        """전체 광고 목록에 맞춘다. 내용이 같은 광고는 다시 색인하지 않는다."""
+        start = time.perf_counter()
+        seen = set()
+        for ad in ads:
+            seen.add(ad.id)
+            self._upsert(ad)
+        for ad_id in [ad_id for ad_id in self._docs if ad_id not in seen]:
+            self._remove(ad_id)
+        self.ready = True
+        self.last_build_ms = (time.perf_counter() - start) * 1000
+
+    def _apply(self, upserts: tuple[PooledAd, ...], removed_ids: tuple[int, ...]) -> None:
+        for ad_id in removed_ids:
+            self._remove(ad_id)
+        for ad in upserts:
+            self._upsert(ad)
+
+    def _build_in_background(self, ads: tuple[PooledAd, ...]) -> None:
+        fresh = AdSearchIndex()
+        self._building = asyncio.get_running_loop().run_in_executor(None, fresh.build, ads)
+
+        def _swap(future: asyncio.Future) -> None:
+            self._building = None
+            pending, self._pending = self._pending, []
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                log.error("Ad search index build failed", exc_info=future.exception())
+                return
+            self._raw, self._docs = fresh._raw, fresh._docs
+            self._postings, self._title_postings = fresh._postings, fresh._title_postings
+            self._results.clear()
+            self.last_build_ms = fresh.last_build_ms
+            self.ready = True
+            for args in pending:
+                self.on_pool_change(*args)
+
+        self._building.add_done_callback(_swap)
+
+    def on_pool_change(
+        self,
+        snapshot: AdSnapshot | None,
+        upserts: tuple[PooledAd, ...] | None,
+        removed_ids: tuple[int, ...],
+    ) -> None:
+        if self._building is not None:
+            # 스레드에서 색인을 만드는 중이면 교체 후 반영하도록 모아 둔다.
+            self._pending.append((snapshot, upserts, removed_ids))
+            return
+        if upserts is None:
+            if self.ready:
+                self.build(snapshot.ads)
+            else:
+                self._build_in_background(snapshot.ads)
+            return
+        if self.ready:
+            self._apply(upserts, removed_ids)
+
+    # -------------------------
+    # 검색
+    # -------------------------
+    @staticmethod
+    def _candidates(postings: dict[str, set[int]], grams: set[str]) -> set[int]:
+        sets = [postings.get(gram) for gram in grams]
+        if not all(sets):
+            return set()
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    @staticmethod
+    def _union(postings: dict[str, set[int]], char: str) -> set[int]:
+        result = set()
+        for gram, posting in postings.items():
+            if char in gram:
+                result |= posting
+        return result
+
+    def search(self, keyword: str) -> list[int]:
+        """
+        검색어를 포함한 광고 id 를 관련도 순으로 반환한다.
+        반환 목록은 캐시와 공유하므로 호출부에서 수정하지 않는다.
+        """
+        self.searches += 1
+        query = normalize_text(keyword)
+        if not query:
+            return []
+        cached = self._results.get(query)
+        if cached is not None:
+            return cached
+
+        docs = self._docs
+        if len(query) == 1:
+            title_ids = self._union(self._title_postings, query)
+            desc_ids = self._union(self._postings, query) - title_ids
+        else:
+            grams = bigrams(query)
+            title_ids = self._candidates(self._title_postings, grams)
+            all_ids = self._candidates(self._postings, grams)
+            if len(query) == 2:
+                desc_ids = all_ids - title_ids
+            else:
+                # 2-gram 이 모두 있어도 이어져 있지 않을 수 있으므로 실제 포함 여부를 확인한다.
+                title_ids = {i for i in title_ids if query in docs[i][0]}
+                desc_ids = {i for i in all_ids - title_ids if query in docs[i][1]}
+
+        result = sorted(title_ids, reverse=True) + sorted(desc_ids, reverse=True)
+        self._results.set(query, result)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "docs": len(self._docs),
+            "grams": len(self._postings),
+            "searches": self.searches,
+            "result_cache": self._results.stats(),
+            "last_build_ms": self.last_build_ms,
+        }
+
+
+# 워커 단위 전역 인스턴스 (비활성화하면 ready 가 되지 않아 기존 LIKE 검색을 쓴다)
+ad_search = AdSearchIndex()
+if settings.ad_search_index_enabled:
+    ad_pool.add_listener(ad_search.on_pool_change)
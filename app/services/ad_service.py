@@ -1,19 +1,60 @@
 import os
+import re
+import json
+import base64
 import random
 import logging
-import json
+import hashlib
+import tempfile
 from datetime import datetime
 
-import httpx
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_, and_
 
 from app.models.ad import Ad
+from app.models.placement import Placement
 from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.services.ad_pool import ad_pool
+from app.services.ad_catalog_sync import ad_catalog
+from app.services.ad_search import ad_search
+from app.services.image_pipeline import image_pipeline
+from app.services.short_link_cache import short_link_cache
+from app.services.short_url_worker import short_url_worker
 from urllib.parse import urlparse
 
 log = logging.getLogger("ad_service")
 
+# 업로드 이미지를 읽고 쓰는 청크 크기
+IMAGE_CHUNK_BYTES = 64 * 1024
+# 저장 파일에 붙일 확장자 허용 형식 (".png", ".jpeg" 등)
+_IMAGE_EXT_RE = re.compile(r"\.[a-z0-9]{1,5}")
+
+# 관리자 목록 검색 조건(keyword)별 전체 건수 캐시
+_count_cache = TTLCache(maxsize=settings.ad_count_cache_size, ttl=settings.ad_count_cache_seconds)
+# 광고가 바뀌면(이 워커의 커밋, 다른 워커의 변경 이벤트, 주기적 재적재) 건수 캐시를 비운다.
+# 노출 기간 경계/노출 예산 멈춤·재개는 DB 행이 그대로이므로 비우지 않는다. (페이싱 중에는 몇 초마다 일어난다)
+ad_pool.add_listener(lambda *_: _count_cache.clear(), transitions=False)
+
+
+def _encode_cursor(ad: Ad, direction: str) -> str:
+    """(created_at, id) 위치 + 방향("next" | "prev")을 불투명한 문자열로 만든다."""
+    raw = json.dumps([ad.created_at.isoformat(), ad.id, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, ad_id, direction = json.loads(raw)
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), int(ad_id), direction
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
 class AdService:
 
     @staticmethod
@@ -28,8 +69,10 @@ class AdService:
         return embed_src
 
     @staticmethod
-    def create_image_ad(db: Session, data, image_url: str):
-        short_url = AdService._create_short_url_with_buly(data.target_url) or data.target_url
+    async def create_image_ad(db: AsyncSession, data, image_url: str):
+        # 같은 target_url 의 단축링크가 캐시에 있으면 buly 호출 없이 재사용
+        placement_ids = await AdService._validate_placement_ids(db, data.placement_ids or [])
+        cached_short_url = await short_link_cache.lookup(db, data.target_url)
 
         ad = Ad(
             ad_type="IMAGE",
@@ -37,17 +80,30 @@ class AdService:
             description=data.description,
             image_url=image_url,
             target_url=data.target_url,
-            short_url=short_url,
+            # 캐시에 없으면 단축링크는 백그라운드에서 채워진다 (short_url_worker)
+            short_url=cached_short_url or data.target_url,
+            weight=data.weight,
+            placement_ids=placement_ids,
+            start_at=data.start_at,
+            end_at=data.end_at,
+            daily_impression_cap=data.daily_impression_cap,
+            total_impression_cap=data.total_impression_cap,
+            pacing=data.pacing,
             is_active=True,
         )
         db.add(ad)
-        db.commit()
-        db.refresh(ad)
+        await db.commit()
+        await db.refresh(ad)
+        await ad_catalog.notify(ad)
+        if not cached_short_url:
+            short_url_worker.enqueue(ad.id, ad.target_url)
+        image_pipeline.attach(ad.id, ad.image_url)
         return ad
 
     @staticmethod
-    def create_iframe_ad(db: Session, data):
+    async def create_iframe_ad(db: AsyncSession, data):
         embed_src = AdService._validate_iframe_src(data.embed_src)
+        placement_ids = await AdService._validate_placement_ids(db, data.placement_ids or [])
 
         ad = Ad(
             ad_type="IFRAME",
@@ -56,127 +112,260 @@ class AdService:
             embed_src=embed_src,
             embed_width=data.embed_width,
             embed_height=data.embed_height,
+            weight=data.weight,
+            placement_ids=placement_ids,
+            start_at=data.start_at,
+            end_at=data.end_at,
+            daily_impression_cap=data.daily_impression_cap,
+            total_impression_cap=data.total_impression_cap,
+            pacing=data.pacing,
             is_active=True,
         )
         db.add(ad)
-        db.commit()
-        db.refresh(ad)
+        await db.commit()
+        await db.refresh(ad)
+        await ad_catalog.notify(ad)
         return ad
 
     @staticmethod
-    def save_image(upload_file, upload_dir="static/ads"):
-        """이미지 파일을 저장하고 경로를 반환한다."""
-        os.makedirs(upload_dir, exist_ok=True)
-
-        filename = f"{datetime.now().timestamp()}_{upload_file.filename}"
-        file_path = os.path.join(upload_dir, filename)
-
-        with open(file_path, "wb") as f:
-            f.write(upload_file.file.read())
+    async def save_image(upload_file, upload_dir="static/ads"):
+        """
+        이미지 파일을 저장하고 경로를 반환한다.
+        - 파일 I/O 는 스레드풀에서 수행해서 이벤트 루프를 막지 않는다.
+        - 파일명은 내용의 sha256 이므로 같은 이미지는 한 번만 저장되고 항상 같은 URL 이 된다.
+        - 저장 직후 리사이즈/WebP 파생본 생성을 프로세스 풀에 예약한다 (image_pipeline).
+        """
+        max_bytes = settings.ad_image_max_bytes
+        # 업로드 크기를 미리 알 수 있으면 읽기 전에 거절
+        if upload_file.size is not None and upload_file.size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"이미지는 최대 {max_bytes} 바이트까지 업로드할 수 있습니다.",
+            )
 
-        return f"/static/ads/{filename}"
+        image_url = await run_in_threadpool(
+            AdService._store_image_file,
+            upload_file.file,
+            upload_file.filename,
+            upload_dir,
+            max_bytes,
+        )
+        image_pipeline.submit(image_url, os.path.join(upload_dir, os.path.basename(image_url)))
+        return image_url
 
-    # -------------------------
-    # 2) buly 단축URL 생성
-    # -------------------------
     @staticmethod
-    def _create_short_url_with_buly(org_url: str) -> str | None:
+    def _store_image_file(src, original_filename: str | None, upload_dir: str, max_bytes: int) -> str:
         """
-        buly 단축링크 생성.
-        실패하면 None 반환.
+        업로드 스트림을 고정 크기 청크로 읽으면서
+        sha256 계산 + 임시 파일 쓰기를 동시에 하고, 끝나면 해시 이름으로 옮긴다.
+        전체 파일을 메모리에 올리지 않으며, 최대 크기를 넘는 순간 중단한다.
         """
-        if not org_url:
-            return None
-
-        try:
-            payload = {
-                "customer_id": settings.buly_customer_id,
-                "partner_api_id": settings.buly_partner_api_id,
-                "org_url": org_url,
-            }
-
-            # x-www-form-urlencoded 이므로 data= 사용
-            resp = httpx.post(
-                settings.buly_api_url,
-                data=payload,
-                timeout=5.0,
-            )
-            resp.raise_for_status()
-
-            # 일부 환경에서 문자열로 내려올 수도 있으니 방어적으로 처리
-            data = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else json.loads(resp.text)
+        os.makedirs(upload_dir, exist_ok=True)
 
-            # 예시: {"result":"Y","message":"성공적으로 생성하였습니다.","url":"https://buly.kr/uRIBxG"}
-            if data.get("result") == "Y":
-                return data.get("url")
+        ext = os.path.splitext(original_filename or "")[1].lower()
+        if not _IMAGE_EXT_RE.fullmatch(ext):
+            ext = ""
 
-            # 실패 메시지는 로그만 남기고 None 리턴
-            log.warning(f"Buly shorturl failed: {data}")
-            return None
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := src.read(IMAGE_CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"이미지는 최대 {max_bytes} 바이트까지 업로드할 수 있습니다.",
+                        )
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            filename = f"{digest.hexdigest()}{ext}"
+            file_path = os.path.join(upload_dir, filename)
+            if os.path.exists(file_path):
+                # 같은 내용이 이미 저장돼 있으면 디스크를 더 쓰지 않는다.
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
-        except Exception as e:
-            # log.exception("Buly shorturl exception")
-            return None    
+        return f"/static/ads/{filename}"
 
     @staticmethod
-    def create_ad(db: Session, data, image_url: str):
+    async def create_ad(db: AsyncSession, data, image_url: str):
         """
         광고 생성 로직
         - image_url: save_image 로 저장한 경로
         - short_url 은 오직 buly API로 생성
+          같은 target_url 의 단축링크가 캐시에 있으면 그대로 재사용하고,
+          없으면 target_url 로 먼저 저장한 뒤 short_url_worker 가 나중에 채운다.
         """
-        # 1) buly 단축링크 생성 시도
-        short_url = AdService._create_short_url_with_buly(data.target_url)
-
-        # 2) 실패 시 target_url 그대로 사용
-        if not short_url:
-            short_url = data.target_url
-
+        placement_ids = await AdService._validate_placement_ids(db, data.placement_ids or [])
+        cached_short_url = await short_link_cache.lookup(db, data.target_url)
 
         ad = Ad(
             title=data.title,
             description=data.description,
             image_url=image_url,
             target_url=data.target_url,
-            short_url=short_url,
+            short_url=cached_short_url or data.target_url,
+            weight=data.weight,
+            placement_ids=placement_ids,
+            start_at=data.start_at,
+            end_at=data.end_at,
+            daily_impression_cap=data.daily_impression_cap,
+            total_impression_cap=data.total_impression_cap,
+            pacing=data.pacing,
             is_active=True,
         )
         db.add(ad)
-        db.commit()
-        db.refresh(ad)
+        await db.commit()
+        await db.refresh(ad)
+        await ad_catalog.notify(ad)
+        if not cached_short_url:
+            short_url_worker.enqueue(ad.id, ad.target_url)
+        image_pipeline.attach(ad.id, ad.image_url)
         return ad
 
     @staticmethod
-    def get_ad(db: Session, ad_id: int):
-        ad = db.query(Ad).filter(Ad.id == ad_id, Ad.is_active == True).first()
-        return ad
+    async def get_ad(db: AsyncSession, ad_id: int):
+        result = await db.execute(
+            select(Ad).where(Ad.id == ad_id, Ad.is_active == True)
+        )
+        return result.scalars().first()
 
     @staticmethod
-    def list_ads(db: Session, page: int, size: int, keyword: str | None):
-        query = db.query(Ad).filter(Ad.is_active == True)
+    def _list_conditions(keyword: str | None) -> list:
+        conditions = [Ad.is_active == True]
 
         if keyword:
-            query = query.filter(
+            conditions.append(
                 or_(
                     Ad.title.like(f"%{keyword}%"),
                     Ad.description.like(f"%{keyword}%")
                 )
             )
+        return conditions
+
+    @staticmethod
+    async def count_ads(db: AsyncSession, keyword: str | None) -> int:
+        """
+        검색 조건별 전체 건수.
+        짧은 TTL 로 캐시하고, 광고가 바뀌면 ad_pool 리스너가 비운다.
+        """
+        key = keyword or ""
+        total = _count_cache.get(key)
+        if total is None:
+            total = await db.scalar(
+                select(func.count()).select_from(Ad).where(*AdService._list_conditions(keyword))
+            )
+            _count_cache.set(key, total)
+        return total
+
+    @staticmethod
+    async def list_ads(db: AsyncSession, page: int, size: int, keyword: str | None):
+        if keyword and ad_search.ready:
+            # 메모리 2-gram 색인으로 찾고 관련도 순으로 정렬한다. 건수 쿼리도 필요 없다.
+            ids = ad_search.search(keyword)
+            page_ids = ids[page * size:(page + 1) * size]
+            if not page_ids:
+                return [], len(ids)
+            result = await db.execute(
+                select(Ad).where(Ad.id.in_(page_ids), Ad.is_active == True)
+            )
+            rank = {ad_id: i for i, ad_id in enumerate(page_ids)}
+            ads = sorted(result.scalars().all(), key=lambda ad: rank[ad.id])
+            return ads, len(ids)
+
+        conditions = AdService._list_conditions(keyword)
 
-        total = query.count()
-        ads = (
-            query.order_by(Ad.created_at.desc())
+        total = await AdService.count_ads(db, keyword)
+        result = await db.execute(
+            select(Ad)
+            .where(*conditions)
+            .order_by(Ad.created_at.desc(), Ad.id.desc())
             .offset(page * size)
             .limit(size)
-            .all()
         )
+        ads = result.scalars().all()
 
         return ads, total
 
     @staticmethod
-    def update_ad(db: Session, ad: Ad, update_data: dict):
+    async def list_ads_keyset(db: AsyncSession, size: int, keyword: str | None, cursor: str | None):
+        """
+        커서(keyset) 방식 목록 조회. 정렬은 offset 방식과 같은 (created_at DESC, id DESC).
+        - cursor 없음 : 첫 페이지
+        - next cursor : 그 위치보다 오래된 광고 size 개
+        - prev cursor : 그 위치보다 최신 광고 size 개 (역순으로 읽고 뒤집는다)
+        OFFSET 으로 앞 페이지를 건너뛰지 않으므로 몇 번째 페이지든 비용이 같다.
+
+        검색어가 있으면 색인 결과가 ad_search_in_limit 건 이하일 때 LIKE 대신 id IN (...) 으로 거른다.
+
+        반환: (ads, total, next_cursor, prev_cursor)
+        """
+        matched_ids = ad_search.search(keyword) if keyword and ad_search.ready else None
+        if matched_ids is not None and len(matched_ids) <= settings.ad_search_in_limit:
+            conditions = [Ad.is_active == True, Ad.id.in_(matched_ids)]
+        else:
+            conditions = AdService._list_conditions(keyword)
+        direction = "next"
+
+        if cursor:
+            created_at, ad_id, direction = _decode_cursor(cursor)
+            if direction == "next":
+                conditions.append(
+                    or_(
+                        Ad.created_at < created_at,
+                        and_(Ad.created_at == created_at, Ad.id < ad_id),
+                    )
+                )
+            else:
+                conditions.append(
+                    or_(
+                        Ad.created_at > created_at,
+                        and_(Ad.created_at == created_at, Ad.id > ad_id),
+                    )
+                )
+
+        if direction == "next":
+            order_by = (Ad.created_at.desc(), Ad.id.desc())
+        else:
+            order_by = (Ad.created_at.asc(), Ad.id.asc())
+
+        # 한 개 더 읽어서 그 방향으로 다음 페이지가 있는지 판단한다.
+        result = await db.execute(
+            select(Ad).where(*conditions).order_by(*order_by).limit(size + 1)
+        )
+        ads = list(result.scalars().all())
+        has_more = len(ads) > size
+        ads = ads[:size]
+        if direction == "prev":
+            ads.reverse()
+
+        next_cursor = prev_cursor = None
+        if ads:
+            if direction == "next":
+                next_cursor = _encode_cursor(ads[-1], "next") if has_more else None
+                prev_cursor = _encode_cursor(ads[0], "prev") if cursor else None
+            else:
+                next_cursor = _encode_cursor(ads[-1], "next")
+                prev_cursor = _encode_cursor(ads[0], "prev") if has_more else None
+
+        if matched_ids is not None:
+            total = len(matched_ids)
+        else:
+            total = await AdService.count_ads(db, keyword)
+        return ads, total, next_cursor, prev_cursor
+
+    @staticmethod
+    async def update_ad(db: AsyncSession, ad: Ad, update_data: dict):
         # 공통 허용
-        allowed = {"title", "description"}
+        allowed = {"title", "description", "weight", "pacing"}
 
         if ad.ad_type == "IMAGE":
             allowed |= {"target_url"}  # 필요하면 image_url도 포함
@@ -189,24 +378,144 @@ class AdService:
                     value = AdService._validate_iframe_src(value)
                 setattr(ad, key, value)
 
+        if update_data.get("placement_ids") is not None:
+            ad.placement_ids = await AdService._validate_placement_ids(db, update_data["placement_ids"])
+
+        # 노출 기간/한도는 null 로 제한을 풀 수 있으므로 보낸 키는 None 이어도 반영한다.
+        for key in ("start_at", "end_at", "daily_impression_cap", "total_impression_cap"):
+            if key in update_data:
+                setattr(ad, key, update_data[key])
+        if ad.start_at is not None and ad.end_at is not None and ad.start_at >= ad.end_at:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="end_at 은 start_at 보다 뒤여야 한다.")
+
         # IMAGE에서 target_url 바뀌면 short_url도 재생성할지 정책 결정
-        # 보통은 재생성하는 게 일관됨
+        # 보통은 재생성하는 게 일관됨 → 캐시에 있으면 재사용, 없으면 target_url 로 두고 백그라운드에서 재생성
+        regenerate_short_url = False
         if ad.ad_type == "IMAGE" and "target_url" in update_data and update_data.get("target_url"):
-            ad.short_url = AdService._create_short_url_with_buly(ad.target_url) or ad.target_url
-
-        db.commit()
-        db.refresh(ad)
+            cached_short_url = await short_link_cache.lookup(db, ad.target_url)
+            ad.short_url = cached_short_url or ad.target_url
+            regenerate_short_url = not cached_short_url
+
+        await db.commit()
+        await db.refresh(ad)
+        await ad_catalog.notify(ad)
+        if regenerate_short_url:
+            short_url_worker.enqueue(ad.id, ad.target_url)
         return ad
 
 
     @staticmethod
-    def delete_ad(db: Session, ad: Ad):
+    async def _validate_placement_ids(db: AsyncSession, placement_ids: list[int]) -> list[int] | None:
+        """활성 광고 자리 id 인지 확인하고 정렬/중복 제거한 목록을 돌려준다. 빈 목록이면 None (지정 해제)"""
+        placement_ids = sorted(set(placement_ids))
+        if not placement_ids:
+            return None
+        result = await db.execute(
+            select(Placement.id).where(Placement.id.in_(placement_ids), Placement.is_active == True)
+        )
+        missing = set(placement_ids) - set(result.scalars().all())
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"존재하지 않는 광고 자리입니다: {sorted(missing)}",
+            )
+        return placement_ids
+
+    @staticmethod
+    def _batch_conditions(ids: list[int] | None, filter) -> list:
+        if ids is not None:
+            return [Ad.id.in_(ids)]
+
+        conditions = []
+        if filter.keyword:
+            conditions.append(
+                or_(
+                    Ad.title.like(f"%{filter.keyword}%"),
+                    Ad.description.like(f"%{filter.keyword}%")
+                )
+            )
+        if filter.ad_type is not None:
+            conditions.append(Ad.ad_type == filter.ad_type)
+        if filter.is_active is not None:
+            conditions.append(Ad.is_active == filter.is_active)
+        return conditions
+
+    @staticmethod
+    async def batch_update(db: AsyncSession, ids: list[int] | None, filter, values: dict) -> dict:
+        """
+        ids 또는 filter 로 고른 광고들에 같은 값(values)을 한 번에 적용한다.
+        - 대상 id 와 현재 값을 한 번 읽고, 값이 다른 광고만 UPDATE 한 문장으로 바꾼다.
+        - 광고 풀/캐시 갱신도 광고마다가 아니라 한 번만 한다.
+          (바뀐 광고가 많으면 광고 필드 대신 전체 재적재 이벤트 하나)
+        반환: {"matched", "updated", "results": [{"id", "status"}]}
+        """
+        if ids is not None:
+            ids = list(dict.fromkeys(ids))
+        conditions = AdService._batch_conditions(ids, filter)
+        # 이미 같은 값인 광고는 건드리지 않는다. (NULL 도 값으로 비교)
+        differs = or_(*(getattr(Ad, key).is_distinct_from(value) for key, value in values.items()))
+        columns = [Ad.id] + [getattr(Ad, key) for key in values]
+
+        rows = (
+            await db.execute(select(*columns).where(*conditions).order_by(Ad.id).with_for_update())
+        ).all()
+        changed_ids = [
+            row.id for row in rows
+            if any(getattr(row, key) != value for key, value in values.items())
+        ]
+
+        updated = 0
+        if changed_ids:
+            result = await db.execute(
+                update(Ad)
+                .where(*conditions, differs)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            updated = result.rowcount
+        await db.commit()
+
+        if changed_ids:
+            if len(changed_ids) > settings.ad_batch_notify_limit:
+                await ad_catalog.publish_reload()
+            else:
+                ads = (await db.execute(select(Ad).where(Ad.id.in_(changed_ids)))).scalars().all()
+                await ad_catalog.notify(*ads)
+
+        changed = set(changed_ids)
+        results = [
+            {"id": row.id, "status": "updated" if row.id in changed else "unchanged"}
+            for row in rows
+        ]
+        if ids is not None:
+            found = {row.id for row in rows}
+            results += [{"id": ad_id, "status": "not_found"} for ad_id in ids if ad_id not in found]
+
+        return {"matched": len(rows), "updated": updated, "results": results}
+
+    @staticmethod
+    async def delete_ad(db: AsyncSession, ad: Ad):
         ad.is_active = False
-        db.commit()
+        await db.commit()
+        await ad_catalog.notify(ad)
 
     @staticmethod
-    def random_ad(db: Session):
-        ads = db.query(Ad).filter(Ad.is_active == True).all()
+    async def random_ad(db: AsyncSession):
+        """
+        DB 에서 직접 랜덤 광고를 고른다.
+        평소에는 ad_pool 스냅샷을 사용하고, 풀이 아직 적재되지 않았을 때만 폴백으로 쓴다.
+        """
+        now = datetime.now()
+        result = await db.execute(
+            select(Ad).where(
+                Ad.is_active == True,
+                Ad.weight > 0,
+                or_(Ad.start_at.is_(None), Ad.start_at <= now),
+                or_(Ad.end_at.is_(None), Ad.end_at > now),
+            )
+        )
+        ads = result.scalars().all()
         if not ads:
             return None
-        return random.choice(ads)
+        return random.choices(ads, weights=[ad.weight for ad in ads])[0]
@@ -3,19 +3,25 @@
 from typing import Dict
 
 from fastapi import HTTPException, status, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
-import bcrypt
 
+from app.core.config import settings
 from app.models.admin import AdminUser
 from app.core.session import create_admin_session
+from app.services.password_hasher import (
+    hash_password_sync,
+    password_hasher,
+    verify_password_sync,
+)
 
 
 class AdminAuthService:
     """
     관리자 로그인/세션 관련 비즈니스 로직을 모아 둔 서비스 클래스.
     역할:
-    - 비밀번호 해시/검증 (bcrypt 사용)
+    - 비밀번호 해시/검증 (bcrypt 사용, 요청 처리 중에는 password_hasher 스레드 풀에서 실행)
     - 관리자 계정 인증 (DB 조회 + 비밀번호 비교)
     - 세션 생성 + 쿠키 세팅 (create_admin_session 호출)
     """
@@ -26,9 +32,9 @@ class AdminAuthService:
 
         관리자 계정을 미리 생성할 때(초기 데이터), 이 함수를 사용해서
         password_hash 컬럼에 저장한다.
+        이벤트 루프 밖(스크립트 등)에서 쓰는 동기 버전이다.
         """
-        hashed = bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt())
-        return hashed.decode("utf-8")
+        return hash_password_sync(plain, settings.bcrypt_rounds)
 
     @staticmethod
     def verify_password(plain: str, hashed: str) -> bool:
@@ -37,24 +43,46 @@ class AdminAuthService:
 
         - 로그인 시 클라이언트에서 넘어온 password(plain)를
           DB에 저장된 password_hash(hashed)와 비교한다.
+        이벤트 루프 밖(스크립트 등)에서 쓰는 동기 버전이다.
         """
-        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+        return verify_password_sync(plain, hashed)
 
     @staticmethod
-    def authenticate(db: Session, login_id: str, password: str) -> AdminUser:
+    async def _rehash_if_needed(db: AsyncSession, admin: AdminUser, password: str) -> None:
+        """
+        저장된 해시의 cost 가 BCRYPT_ROUNDS 와 다르면 방금 검증한 평문으로 다시 해시해 저장한다.
+        로그인 성공이 우선이므로 해시 풀이 꽉 차 있으면 다음 로그인으로 미룬다.
+        """
+        if not password_hasher.needs_rehash(admin.password_hash) or not password_hasher.has_capacity():
+            return
+
+        old_hash = admin.password_hash
+        new_hash = await password_hasher.hash(password)
+        # 같은 계정의 동시 로그인끼리 덮어쓰지 않도록 이전 해시가 그대로일 때만 바꾼다.
+        result = await db.execute(
+            update(AdminUser)
+            .where(AdminUser.id == admin.id, AdminUser.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        await db.commit()
+        password_hasher.rehashed += result.rowcount
+
+    @staticmethod
+    async def authenticate(db: AsyncSession, login_id: str, password: str) -> AdminUser:
         """
         관리자 계정 인증 로직.
         [동작]
         1) DB에서 login_id 로 AdminUser 를 조회.
         2) 계정이 없으면 400 에러(관리자 계정 없음).
         3) 비밀번호가 일치하지 않으면 400 에러(비밀번호 불일치).
-        4) 모두 통과하면 AdminUser 엔티티를 반환한다.
+           (bcrypt 검증은 전용 스레드 풀에서 하고, 풀이 가득 차면 503 LOGIN_BUSY)
+        4) 해시 cost 가 설정과 다르면 새 cost 로 다시 해시해 저장한다.
+        5) 모두 통과하면 AdminUser 엔티티를 반환한다.
         """
-        admin = (
-            db.query(AdminUser)
-            .filter(AdminUser.login_id == login_id)
-            .first()
+        result = await db.execute(
+            select(AdminUser).where(AdminUser.login_id == login_id)
         )
+        admin = result.scalars().first()
 
         if not admin:
             raise HTTPException(
@@ -62,17 +90,18 @@ class AdminAuthService:
                 detail="관리자 계정이 존재하지 않습니다.",
             )
 
-        if not AdminAuthService.verify_password(password, admin.password_hash):
+        if not await password_hasher.verify(password, admin.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="비밀번호가 일치하지 않습니다.",
             )
 
+        await AdminAuthService._rehash_if_needed(db, admin, password)
         return admin
 
     @staticmethod
     async def login(
-        db: Session,
+        db: AsyncSession,
         login_id: str,
         password: str,
         response: Response,
@@ -92,7 +121,7 @@ class AdminAuthService:
         이 메서드는 실제 라우터(/admin/login)에서 호출되고,
         세션 + 쿠키 처리를 한 곳에서 관리한다는 점이 핵심이다.
         """
-        admin = AdminAuthService.authenticate(db, login_id, password)
+        admin = await AdminAuthService.authenticate(db, login_id, password)
         await create_admin_session(login_id=admin.login_id, response=response, redis=redis)
         return admin
 
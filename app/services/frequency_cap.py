@@ -0,0 +1,136 @@
+# app/services/frequency_cap.py
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Sequence
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.ad_pool import PooledAd
+
+log = logging.getLogger("frequency_cap")
+
+FCAP_PREFIX = "fcap:"
+# 슬롯 하나의 카운터 크기. OVERFLOW SAT 이라 255 에서 멈춘다.
+_COUNTER = "u8"
+
+
+class FrequencyCap:
+    """
+    시청자(viewer)별 광고 노출 빈도 제한. (윈도우당 광고 하나를 최대 max_impressions 번)
+
+    [저장 구조]
+    - 시청자 + 고정 윈도우마다 Redis 문자열 하나를 slots 개의 8bit 카운터 배열(BITFIELD)로 쓴다.
+      광고 id 는 해시로 슬롯에 대응시키므로 시청자당 메모리는 광고 수와 상관없이 slots 바이트로 고정이다.
+      (기본 1024 슬롯 = 1KB, 윈도우가 지나면 TTL 로 사라진다)
+    - 서로 다른 광고가 같은 슬롯에 걸리면 노출 수가 합쳐진다.
+      즉 실제보다 일찍 제한될 수는 있어도 제한을 넘겨 노출되지는 않는다. (count-min sketch 와 같은 방향의 오차)
+
+    [조회 (Redis 왕복 1번)]
+    - 광고 풀에서 필요한 수(k)보다 넉넉히 후보를 뽑는다. 앞의 k 개가 1순위, 나머지는 예비.
+    - 파이프라인 한 번에 1순위는 INCRBY(노출로 가정하고 바로 증가), 예비는 GET, 그리고 EXPIRE 를 보낸다.
+    - 증가 후 값이 한도를 넘은 1순위는 이미 한도에 찬 광고이므로 빼고(포화 카운터라 더 올려도 무해),
+      빈자리를 한도 미만인 예비 광고로 채운다. 예비 광고의 증가만 응답 후 백그라운드로 보낸다.
+    - Redis 오류 시에는 제한 없이 1순위 광고를 그대로 내보낸다. (광고 송출이 우선)
+    """
+
+    def __init__(self, redis: Redis, max_impressions: int, window_seconds: int, slots: int):
+        self.redis = redis
+        self.max_impressions = max_impressions
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self._tasks: set[asyncio.Task] = set()
+
+        self.lookups = 0
+        self.capped = 0
+        self.backfilled = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_impressions > 0
+
+    def _key(self, viewer: str, window: int) -> str:
+        digest = hashlib.blake2b(viewer.encode("utf-8"), digest_size=12).hexdigest()
+        return f"{FCAP_PREFIX}{window}:{digest}"
+
+    def _slot(self, ad_id: int, window: int) -> str:
+        # 윈도우마다 섞는 방식을 바꿔서 같은 광고 쌍이 계속 같은 슬롯에 걸리지 않게 한다.
+        return f"#{((ad_id ^ window) * 0x9E3779B1 & 0xFFFFFFFF) % self.slots}"
+
+    async def _increment(self, key: str, slots: list[str]) -> None:
+        args = ["OVERFLOW", "SAT"]
+        for slot in slots:
+            args += ["INCRBY", _COUNTER, slot, 1]
+        try:
+            await self.redis.execute_command("BITFIELD", key, *args)
+        except Exception:
+            self.failures += 1
+            log.exception("Frequency cap increment failed")
+
+    async def select(self, viewer: str, candidates: Sequence[PooledAd], count: int) -> list[PooledAd]:
+        """후보(앞쪽이 우선) 중 이 시청자에게 아직 한도가 남은 광고를 최대 count 개 고르고 노출로 센다."""
+        primary, backup = list(candidates[:count]), list(candidates[count:])
+        if not primary:
+            return []
+
+        window = int(time.time()) // self.window_seconds
+        key = self._key(viewer, window)
+        args = ["OVERFLOW", "SAT"]
+        for ad in primary:
+            args += ["INCRBY", _COUNTER, self._slot(ad.id, window), 1]
+        for ad in backup:
+            args += ["GET", _COUNTER, self._slot(ad.id, window)]
+
+        self.lookups += 1
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.execute_command("BITFIELD", key, *args)
+            pipe.expire(key, self.window_seconds)
+            counts, _ = await pipe.execute()
+        except Exception:
+            self.failures += 1
+            log.exception("Frequency cap lookup failed")
+            return primary
+
+        chosen = [ad for ad, n in zip(primary, counts) if n <= self.max_impressions]
+        self.capped += len(primary) - len(chosen)
+
+        extra = []
+        for ad, n in zip(backup, counts[len(primary):]):
+            if len(chosen) + len(extra) >= count:
+                break
+            if n < self.max_impressions:
+                extra.append(ad)
+        if extra:
+            self.backfilled += len(extra)
+            task = asyncio.get_running_loop().create_task(
+                self._increment(key, [self._slot(ad.id, window) for ad in extra])
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return chosen + extra
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_impressions": self.max_impressions,
+            "window_seconds": self.window_seconds,
+            "bytes_per_viewer": self.slots,
+            "lookups": self.lookups,
+            "capped": self.capped,
+            "backfilled": self.backfilled,
+            "failures": self.failures,
+        }
+
+
+# 워커 단위 전역 인스턴스
+frequency_cap = FrequencyCap(
+    redis=redis_client,
+    max_impressions=settings.frequency_cap_impressions,
+    window_seconds=settings.frequency_cap_window_seconds,
+    slots=settings.frequency_cap_slots,
+)
@@ -0,0 +1,200 @@
+# app/services/image_pipeline.py
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.ad import Ad
+from app.services.ad_catalog_sync import ad_catalog
+
+log = logging.getLogger("image_pipeline")
+
+# Pillow 저장 포맷 이름 / 확장자
+_FORMATS = {
+    "webp": ("WEBP", "webp"),
+    "avif": ("AVIF", "avif"),
+    "png": ("PNG", "png"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+
+def _save(img, path: str, fmt: str) -> None:
+    pil_format, _ = _FORMATS[fmt]
+    if fmt == "webp":
+        img.save(path, pil_format, quality=80, method=6)
+    elif fmt == "avif":
+        img.save(path, pil_format, quality=60)
+    elif fmt == "png":
+        img.save(path, pil_format, optimize=True)
+    else:
+        img.convert("RGB").save(path, pil_format, quality=82, optimize=True, progressive=True)
+
+
+def generate_variants(
+    src_path: str,
+    out_dir: str,
+    url_prefix: str,
+    widths: list[int],
+    formats: list[str],
+) -> dict:
+    """
+    원본 이미지 하나로 너비 버킷별 파생 이미지를 만든다. (프로세스 풀에서 실행)
+
+    - 원본보다 작은 버킷마다: 지정 포맷(webp/avif) + 원본 계열 포맷(png/jpeg 최적화)
+    - 원본 너비 그대로: 지정 포맷만 (원본 계열은 원본 파일이 이미 있음)
+    - 파일명은 원본(내용 해시) 이름에서 파생되므로 이미 있으면 다시 인코딩하지 않는다.
+
+    반환: {"width", "height", "variants": [{"url", "width", "height", "format"}, ...]}
+    """
+    from PIL import Image, features
+
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+
+    with Image.open(src_path) as img:
+        width, height = img.size
+        # 투명도가 있으면 PNG, 없으면 JPEG 를 원본 계열 포맷으로 사용
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+        fallback = "png" if has_alpha else "jpeg"
+        enabled = [f for f in formats if f in _FORMATS and features.check(f)]
+
+        buckets = sorted({w for w in widths if w < width} | {width})
+        variants = []
+        for w in buckets:
+            h = max(1, round(height * w / width))
+            resized = None
+            targets = enabled if w == width else enabled + [fallback]
+            for fmt in targets:
+                _, ext = _FORMATS[fmt]
+                filename = f"{stem}_w{w}.{ext}"
+                path = os.path.join(out_dir, filename)
+                if not os.path.exists(path):
+                    if resized is None:
+                        base = img if img.mode in ("RGB", "RGBA") else img.convert("RGBA" if has_alpha else "RGB")
+                        resized = base if w == width else base.resize((w, h), Image.LANCZOS)
+                    tmp_path = f"{path}.tmp"
+                    _save(resized, tmp_path, fmt)
+                    os.replace(tmp_path, path)
+                variants.append({
+                    "url": f"{url_prefix}/{filename}",
+                    "width": w,
+                    "height": h,
+                    "format": fmt,
+                })
+
+    return {"width": width, "height": height, "variants": variants}
+
+
+class ImagePipeline:
+    """
+    광고 이미지 파생본(리사이즈 + WebP/AVIF/최적화 PNG·JPEG) 생성 파이프라인.
+
+    [동작 개요]
+    1. AdService.save_image 가 원본을 저장하면 submit() 으로 프로세스 풀에 작업을 넘긴다.
+       (인코딩은 CPU 를 많이 쓰므로 이벤트 루프/스레드가 아니라 별도 프로세스에서 수행)
+    2. 광고가 커밋되면 attach() 가 결과를 기다렸다가
+       ads.image_width / image_height / image_variants 를 채우고 광고 풀에 알린다.
+    같은 이미지에 대한 작업은 진행 중인 future 를 공유한다.
+    """
+
+    def __init__(self, max_workers: int, widths: list[int], formats: list[str]):
+        self.max_workers = max_workers
+        self.widths = widths
+        self.formats = formats
+        self._executor: ProcessPoolExecutor | None = None
+        self._futures: dict[str, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+        self.processed = 0
+        self.failed = 0
+
+    def _executor_or_create(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, image_url: str, file_path: str) -> asyncio.Future:
+        """파생본 생성을 예약한다. 이미 진행 중이면 그 future 를 돌려준다."""
+        future = self._futures.get(image_url)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor_or_create(),
+            generate_variants,
+            file_path,
+            os.path.dirname(file_path),
+            image_url.rsplit("/", 1)[0],
+            self.widths,
+            self.formats,
+        )
+        self._futures[image_url] = future
+        future.add_done_callback(lambda _: self._futures.pop(image_url, None))
+        return future
+
+    async def _attach(self, ad_id: int, image_url: str) -> None:
+        future = self._futures.get(image_url)
+        if future is None:
+            # 이미 끝난 작업이면 다시 예약 (파일이 있으면 인코딩 없이 치수만 읽는다)
+            future = self.submit(image_url, image_url.lstrip("/"))
+
+        try:
+            result = await future
+        except Exception:
+            self.failed += 1
+            log.exception(f"Image variant generation failed: {image_url}")
+            return
+
+        async with AsyncSessionLocal() as db:
+            # 그 사이 이미지가 바뀐 광고에는 기록하지 않는다.
+            updated = await db.execute(
+                update(Ad)
+                .where(Ad.id == ad_id, Ad.image_url == image_url)
+                .values(
+                    image_width=result["width"],
+                    image_height=result["height"],
+                    image_variants=result["variants"],
+                )
+            )
+            await db.commit()
+            if updated.rowcount:
+                ad = await db.scalar(select(Ad).where(Ad.id == ad_id))
+                if ad is not None:
+                    await ad_catalog.notify(ad)
+        self.processed += 1
+
+    def attach(self, ad_id: int, image_url: str | None) -> None:
+        """광고 커밋 후 호출. 파생본 결과를 광고에 기록하는 작업을 백그라운드로 띄운다."""
+        if not image_url:
+            return
+        task = asyncio.get_running_loop().create_task(self._attach(ad_id, image_url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._futures),
+            "processed": self.processed,
+            "failed": self.failed,
+            "widths": self.widths,
+            "formats": self.formats,
+        }
+
+
+# 워커 단위 전역 인스턴스
+image_pipeline = ImagePipeline(
+    max_workers=settings.image_pipeline_workers,
+    widths=settings.ad_image_variant_widths,
+    formats=settings.ad_image_variant_formats,
+)
@@ -0,0 +1,418 @@
+# app/services/impression_budget.py
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.ad_pool import AdSnapshot, PooledAd, ad_pool
+
+log = logging.getLogger("impression_budget")
+
+BUDGET_PREFIX = "budget:"
+# 광고 id → Redis 장애 중 빌린 몫 없이 나간 노출 수 (전체 워커 합계)
+OVERSHOOT_KEY = "budget:overshoot"
+# 일 카운터/페이싱 버킷 보관 기간. 날짜가 바뀐 뒤에도 전날 사용량을 조회할 수 있게 하루 더 둔다.
+_DAY_TTL = 2 * 86400
+
+# 빌리기: 전체/일 한도와 페이싱 버킷에서 남은 만큼(최대 want)을 원자적으로 떼어 카운터에 더한다.
+# KEYS: total, daily, bucket / ARGV: want, total_cap(-1 = 없음), daily_cap(-1 = 없음), rate(초당 토큰, 0 = 페이싱 없음), burst, ttl
+# 반환: {빌려 준 수, 빌린 뒤 전체 사용량, 빌린 뒤 오늘 사용량}
+_LEASE_SCRIPT = """
+local want = tonumber(ARGV[1])
+local total_cap = tonumber(ARGV[2])
+local daily_cap = tonumber(ARGV[3])
+local rate = tonumber(ARGV[4])
+local burst = tonumber(ARGV[5])
+local ttl = tonumber(ARGV[6])
+
+local grant = want
+local total = tonumber(redis.call('GET', KEYS[1]) or '0')
+if total_cap >= 0 then grant = math.min(grant, total_cap - total) end
+local daily = tonumber(redis.call('GET', KEYS[2]) or '0')
+if daily_cap >= 0 then grant = math.min(grant, daily_cap - daily) end
+
+local tokens = 0
+local now = 0
+if rate > 0 then
+  local t = redis.call('TIME')
+  now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+  local bucket = redis.call('HMGET', KEYS[3], 'tokens', 'ts')
+  tokens = tonumber(bucket[1]) or burst
+  local ts = tonumber(bucket[2]) or now
+  tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+  grant = math.min(grant, math.floor(tokens))
+end
+if grant < 0 then grant = 0 end
+
+if grant > 0 then
+  total = redis.call('INCRBY', KEYS[1], grant)
+  daily = redis.call('INCRBY', KEYS[2], grant)
+  redis.call('EXPIRE', KEYS[2], ttl)
+end
+if rate > 0 then
+  redis.call('HSET', KEYS[3], 'tokens', tostring(tokens - grant), 'ts', tostring(now))
+  redis.call('EXPIRE', KEYS[3], ttl)
+end
+return {grant, total, daily}
+"""
+
+# 돌려주기: 쓰지 않은 몫을 카운터에서 뺀다. (일 카운터가 이미 사라졌으면 전체 카운터만)
+# KEYS: total, daily / ARGV: n
+_RELEASE_SCRIPT = """
+local n = tonumber(ARGV[1])
+redis.call('DECRBY', KEYS[1], n)
+if redis.call('EXISTS', KEYS[2]) == 1 then redis.call('DECRBY', KEYS[2], n) end
+return n
+"""
+
+
+def _local_day(now: float) -> tuple[str, float]:
+    """now 가 속한 서버 로컬 날짜("20261018")와 그날이 끝나는 시각(epoch 초)."""
+    t = time.localtime(now)
+    end = time.mktime((t.tm_year, t.tm_mon, t.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return time.strftime("%Y%m%d", t), end
+
+
+class ImpressionBudget:
+    """
+    광고별 노출 예산(일 한도 / 전체 한도 / 페이싱).
+
+    [저장 구조 (Redis)]
+    - budget:{id}:total        전체 사용량
+    - budget:{id}:day:{날짜}   그날 사용량 (서버 로컬 날짜, 이틀 뒤 만료)
+    - budget:{id}:bucket       페이싱 토큰 버킷 (일 한도 / 86400 의 속도로 채워지고, 최대 burst_seconds 분량까지 쌓인다)
+    사용량은 "실제 노출 수"가 아니라 "워커들이 빌려 간 수"다. 두 한도와 버킷을 Lua 스크립트 하나로
+    원자적으로 확인하고 더하므로, 여러 워커가 동시에 빌려도 빌려 준 합계는 한도를 넘지 않는다.
+
+    [노출 경로]
+    - 한도가 없는 광고는 아무것도 보지 않는다.
+    - 한도가 있는 광고는 워커가 빌려 둔 몫(lease_block 개씩)에서 1 을 뺀다. Redis 왕복 없음.
+      남은 몫이 low_water 이하가 되면 백그라운드로 다음 몫을 미리 빌린다.
+    - 몫이 없으면 이번 노출은 거절하고(호출부가 다른 광고를 고른다) 백그라운드로 빌린다.
+    - 한도에 닿아 더 빌릴 수 없으면 광고 풀에서 그 광고를 멈춘다. (일 한도: 다음 날 0시까지, 전체 한도: 광고가 바뀔 때까지)
+      페이싱 버킷이 비었을 때도 pacing_pause 초(토큰 하나가 찰 시간보다 짧으면 그 시간)만큼 멈추고,
+      그 뒤에는 그동안 쌓인 만큼을 한 번에 빌린다. (몫 없는 광고를 계속 뽑았다 버리지 않도록)
+
+    [초과(overshoot)]
+    - 정상 상태에서는 빌려 준 만큼만 노출하므로 한도를 넘지 않는다.
+      (빌려 두고 쓰지 못한 몫은 날짜가 바뀌거나 광고가 빠지거나 워커가 종료될 때 돌려준다)
+    - Redis 장애 중에는 워커 하나가 광고 하나를 최대 fail_open 번까지 몫 없이 내보낸다.
+      즉 초과는 장애 한 번당 (워커 수 x fail_open) 으로 제한되고, 이 노출은 overshoot 로 집계해
+      Redis 가 살아나면 사용량 카운터와 budget:overshoot 에 더한다.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        lease_block: int,
+        low_water: int,
+        burst_seconds: float,
+        pacing_pause: float,
+        fail_open: int,
+        retry_seconds: float,
+    ):
+        self.redis = redis
+        self.lease_block = lease_block
+        self.low_water = low_water
+        self.burst_seconds = burst_seconds
+        self.pacing_pause = pacing_pause
+        self.fail_open = fail_open
+        self.retry_seconds = retry_seconds
+        self._lease_script = redis.register_script(_LEASE_SCRIPT)
+        self._release_script = redis.register_script(_RELEASE_SCRIPT)
+
+        # 광고 id → 이 워커가 빌려 두고 아직 쓰지 않은 노출 수 (오늘 몫)
+        self._leases: dict[int, int] = {}
+        self._inflight: set[int] = set()
+        # 광고 id → 이 시각(monotonic)까지 다시 빌리지 않는다 (Redis 오류)
+        self._backoff: dict[int, float] = {}
+        # 광고 id → 빌려 둔 몫을 다 쓰면 광고 풀에서 이 시각(epoch 초)까지 멈춘다.
+        # (일 한도면 그날 끝 / 전체 한도면 inf / 페이싱 버킷이 비었으면 잠시 뒤)
+        self._exhausted: dict[int, float] = {}
+        # Redis 장애 중 몫 없이 내보낸 수 (광고별 허용량 확인용 / 아직 Redis 에 보고하지 않은 수)
+        self._fail_open_used: dict[int, int] = defaultdict(int)
+        self._overshoot_pending: dict[int, int] = defaultdict(int)
+        self._redis_down_until = 0.0
+        self._day, self._day_end = _local_day(time.time())
+        self._tasks: set[asyncio.Task] = set()
+
+        self.lease_requests = 0
+        self.leased = 0
+        self.served = 0
+        self.denied = 0
+        self.released = 0
+        self.overshoot = 0
+        self.suspended = 0
+        self.failures = 0
+
+    # -------------------------
+    # Redis 키
+    # -------------------------
+    @staticmethod
+    def _total_key(ad_id: int) -> str:
+        return f"{BUDGET_PREFIX}{ad_id}:total"
+
+    @staticmethod
+    def _daily_key(ad_id: int, day: str) -> str:
+        return f"{BUDGET_PREFIX}{ad_id}:day:{day}"
+
+    @staticmethod
+    def _bucket_key(ad_id: int) -> str:
+        return f"{BUDGET_PREFIX}{ad_id}:bucket"
+
+    # -------------------------
+    # 노출 경로 (await 없음)
+    # -------------------------
+    def available(self, ad: PooledAd) -> bool:
+        """이 워커가 지금 ad 를 한 번 더 노출할 수 있는지. 몫을 쓰지는 않는다."""
+        if not ad.is_budgeted:
+            return True
+        self._roll_day()
+        if self._leases.get(ad.id, 0) > 0:
+            return True
+        self._refill(ad)
+        return self._can_fail_open(ad)
+
+    def consume(self, ad: PooledAd) -> bool:
+        """ad 노출 1 회를 예산에서 뺀다. 몫이 없으면 False (노출하지 않는다)."""
+        if not ad.is_budgeted:
+            return True
+        self._roll_day()
+        remaining = self._leases.get(ad.id, 0)
+        if remaining > 0:
+            remaining -= 1
+            self._leases[ad.id] = remaining
+            self.served += 1
+            if remaining <= self.low_water:
+                self._refill(ad)
+            return True
+
+        self._refill(ad)
+        if self._can_fail_open(ad):
+            self._fail_open_used[ad.id] += 1
+            self._overshoot_pending[ad.id] += 1
+            self.overshoot += 1
+            self.served += 1
+            return True
+        self.denied += 1
+        return False
+
+    def _can_fail_open(self, ad: PooledAd) -> bool:
+        return (
+            time.monotonic() < self._redis_down_until
+            and self._fail_open_used.get(ad.id, 0) < self.fail_open
+        )
+
+    def _roll_day(self) -> None:
+        now = time.time()
+        if now < self._day_end:
+            return
+        # 어제 빌리고 남은 몫은 어제 사용량에서 돌려주고, 오늘 몫은 새로 빌린다.
+        day, leases = self._day, self._leases
+        self._day, self._day_end = _local_day(now)
+        self._leases = {}
+        self._exhausted = {ad_id: until for ad_id, until in self._exhausted.items() if until > now}
+        for ad_id, remaining in leases.items():
+            self._release(ad_id, remaining, day)
+
+    def _refill(self, ad: PooledAd) -> None:
+        if ad.id in self._inflight:
+            return
+        until = self._exhausted.get(ad.id)
+        if until is not None:
+            # 더 빌릴 수 없고 빌려 둔 몫도 다 썼으면 광고 풀에서 멈춘다.
+            if self._leases.get(ad.id, 0) <= 0:
+                del self._exhausted[ad.id]
+                self.suspended += 1
+                ad_pool.suspend(ad.id, until)
+            return
+        if self._backoff.get(ad.id, 0.0) > time.monotonic():
+            return
+        self._inflight.add(ad.id)
+        self._spawn(self._lease(ad))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # -------------------------
+    # 빌리기 / 돌려주기
+    # -------------------------
+    def _pacing_pause(self, rate: float) -> float:
+        # 토큰 하나가 찰 시간보다는 길게, 5분보다는 짧게
+        return min(300.0, max(self.pacing_pause, 1.0 / rate))
+
+    async def _lease(self, ad: PooledAd) -> None:
+        day, day_end = self._day, self._day_end
+        rate = ad.daily_impression_cap / 86400 if ad.pacing and ad.daily_impression_cap else 0.0
+        burst = max(float(self.lease_block), rate * self.burst_seconds) if rate else 0.0
+        # 페이싱 광고는 멈춰 있던 동안 쌓인 토큰을 한 번에 빌릴 수 있게 한다.
+        want = max(self.lease_block, math.ceil(rate * self._pacing_pause(rate))) if rate else self.lease_block
+        self.lease_requests += 1
+        try:
+            granted, total, daily = await self._lease_script(
+                keys=[self._total_key(ad.id), self._daily_key(ad.id, day), self._bucket_key(ad.id)],
+                args=[
+                    want,
+                    ad.total_impression_cap if ad.total_impression_cap is not None else -1,
+                    ad.daily_impression_cap if ad.daily_impression_cap is not None else -1,
+                    rate,
+                    burst,
+                    _DAY_TTL,
+                ],
+            )
+        except Exception:
+            self.failures += 1
+            self._redis_down_until = time.monotonic() + self.retry_seconds
+            self._backoff[ad.id] = self._redis_down_until
+            log.exception(f"Impression budget lease failed: ad_id={ad.id}")
+            return
+        finally:
+            self._inflight.discard(ad.id)
+
+        granted, total, daily = int(granted), int(total), int(daily)
+        self._redis_down_until = 0.0
+        self._backoff.pop(ad.id, None)
+        if day != self._day:
+            # 빌리는 사이 날짜가 바뀌었으면 어제 몫이므로 돌려준다.
+            await self._release_now(ad.id, granted, day)
+            return
+
+        self.leased += granted
+        if granted:
+            self._leases[ad.id] = self._leases.get(ad.id, 0) + granted
+            self._fail_open_used.pop(ad.id, None)
+        if granted < want:
+            if ad.total_impression_cap is not None and total >= ad.total_impression_cap:
+                self._exhausted[ad.id] = math.inf
+            elif ad.daily_impression_cap is not None and daily >= ad.daily_impression_cap:
+                self._exhausted[ad.id] = day_end
+            elif rate:
+                # 페이싱 버킷이 비었다: 빌린 몫을 다 쓰면 토큰이 쌓일 때까지 잠시 멈춘다.
+                self._exhausted[ad.id] = time.time() + self._pacing_pause(rate)
+        if ad.id in self._exhausted and not self._leases.get(ad.id):
+            self._refill(ad)
+
+        if self._overshoot_pending:
+            await self._report_overshoot()
+
+    async def _release_now(self, ad_id: int, count: int, day: str) -> None:
+        if count <= 0:
+            return
+        try:
+            await self._release_script(keys=[self._total_key(ad_id), self._daily_key(ad_id, day)], args=[count])
+            self.released += count
+        except Exception:
+            self.failures += 1
+            log.exception(f"Impression budget release failed: ad_id={ad_id}")
+
+    def _release(self, ad_id: int, count: int, day: str | None = None) -> None:
+        if count > 0:
+            self._spawn(self._release_now(ad_id, count, day or self._day))
+
+    async def _report_overshoot(self) -> None:
+        pending, self._overshoot_pending = self._overshoot_pending, defaultdict(int)
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            for ad_id, count in pending.items():
+                pipe.incrby(self._total_key(ad_id), count)
+                pipe.incrby(self._daily_key(ad_id, self._day), count)
+                pipe.expire(self._daily_key(ad_id, self._day), _DAY_TTL)
+                pipe.hincrby(OVERSHOOT_KEY, str(ad_id), count)
+            await pipe.execute()
+        except Exception:
+            self.failures += 1
+            for ad_id, count in pending.items():
+                self._overshoot_pending[ad_id] += count
+            log.exception("Impression budget overshoot report failed")
+
+    def _drop(self, ad_id: int) -> None:
+        self._release(ad_id, self._leases.pop(ad_id, 0))
+        self._exhausted.pop(ad_id, None)
+        self._backoff.pop(ad_id, None)
+
+    def on_pool_change(
+        self,
+        snapshot: AdSnapshot | None,
+        upserts: tuple[PooledAd, ...] | None,
+        removed_ids: tuple[int, ...],
+    ) -> None:
+        # 빠진 광고의 몫은 돌려주고, 바뀐 광고는 한도를 다시 판단한다. (한도 상향 등)
+        if upserts is None:
+            for ad_id in [ad_id for ad_id in self._leases if ad_id not in snapshot.by_id]:
+                self._drop(ad_id)
+            return
+        for ad_id in removed_ids:
+            self._drop(ad_id)
+        for ad in upserts:
+            if not ad.is_budgeted:
+                self._drop(ad.id)
+            else:
+                self._exhausted.pop(ad.id, None)
+                self._backoff.pop(ad.id, None)
+
+    # -------------------------
+    # 조회 / 종료
+    # -------------------------
+    async def usage(self, ad_id: int) -> dict:
+        """광고 하나의 전체/오늘 사용량(빌려 간 수)과 누적 초과 노출 수."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(self._total_key(ad_id))
+        pipe.get(self._daily_key(ad_id, self._day))
+        pipe.hget(OVERSHOOT_KEY, str(ad_id))
+        total, daily, overshoot = await pipe.execute()
+        return {
+            "total_used": int(total or 0),
+            "today_used": int(daily or 0),
+            "overshoot": int(overshoot or 0),
+            "worker_lease_remaining": self._leases.get(ad_id, 0),
+        }
+
+    async def overshoot_by_ad(self) -> dict[str, int]:
+        return {ad_id: int(count) for ad_id, count in (await self.redis.hgetall(OVERSHOOT_KEY)).items()}
+
+    async def stop(self) -> None:
+        """빌려 두고 쓰지 않은 몫을 돌려주고, 보고하지 못한 초과 노출을 보고한다."""
+        leases, self._leases = self._leases, {}
+        for ad_id, remaining in leases.items():
+            await self._release_now(ad_id, remaining, self._day)
+        if self._overshoot_pending:
+            await self._report_overshoot()
+        for task in list(self._tasks):
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "lease_block": self.lease_block,
+            "ads_with_lease": sum(1 for remaining in self._leases.values() if remaining > 0),
+            "lease_remaining": sum(self._leases.values()),
+            "lease_requests": self.lease_requests,
+            "leased": self.leased,
+            "released": self.released,
+            "served": self.served,
+            "denied": self.denied,
+            "suspended": self.suspended,
+            "overshoot": self.overshoot,
+            "overshoot_unreported": sum(self._overshoot_pending.values()),
+            "redis_down": time.monotonic() < self._redis_down_until,
+            "failures": self.failures,
+        }
+
+
+# 워커 단위 전역 인스턴스
+impression_budget = ImpressionBudget(
+    redis=redis_client,
+    lease_block=settings.budget_lease_block,
+    low_water=settings.budget_lease_low_water,
+    burst_seconds=settings.budget_pacing_burst_seconds,
+    pacing_pause=settings.budget_pacing_pause_seconds,
+    fail_open=settings.budget_fail_open_impressions,
+    retry_seconds=settings.budget_retry_seconds,
+)
+ad_pool.add_listener(impression_budget.on_pool_change)
@@ -0,0 +1,110 @@
+# app/services/password_hasher.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+def hash_password_sync(plain: str, rounds: int) -> str:
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def verify_password_sync(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def hash_rounds(hashed: str) -> int | None:
+    """bcrypt 해시("$2b$12$...")에 기록된 cost(work factor). 형식이 다르면 None."""
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """
+    bcrypt 해시/검증 전용 스레드 풀.
+
+    [동작 개요]
+    - bcrypt 는 한 번에 수십~수백 ms 동안 CPU 를 쓰므로 이벤트 루프에서 직접 돌리면
+      그동안 같은 워커의 광고 송출 요청까지 모두 멈춘다.
+      bcrypt 는 계산 중 GIL 을 놓기 때문에 작은 전용 스레드 풀에서 돌리면 루프가 막히지 않는다.
+    - 실행 중 + 대기 중 작업 수를 max_pending 으로 제한하고,
+      가득 차면 기다리지 않고 바로 503 으로 거절한다. (로그인 폭주/크리덴셜 스터핑 시 메모리·지연 상한)
+    - 기본 스레드 풀(run_in_executor(None))과 나눠 두어 다른 작업(검색 색인 등)과 서로 밀어내지 않는다.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, rounds: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    def _executor_or_create(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    def has_capacity(self) -> bool:
+        return self._pending < self.max_pending
+
+    async def _run(self, fn, *args):
+        if not self.has_capacity():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="LOGIN_BUSY",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor_or_create(), fn, *args
+            )
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    async def hash(self, plain: str) -> str:
+        return await self._run(hash_password_sync, plain, self.rounds)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password_sync, plain, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """저장된 해시의 cost 가 현재 설정(BCRYPT_ROUNDS)과 다르면 True."""
+        return hash_rounds(hashed) != self.rounds
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "rounds": self.rounds,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+        }
+
+
+# 워커 단위 전역 인스턴스
+password_hasher = PasswordHasher(
+    max_workers=settings.bcrypt_workers,
+    max_pending=settings.bcrypt_max_pending,
+    rounds=settings.bcrypt_rounds,
+)
@@ -0,0 +1,228 @@
+# app/services/placement_index.py
+import random
+import time
+from typing import Iterable
+
+from app.services.ad_pool import AdSnapshot, PooledAd, PooledPlacement, ad_pool
+from app.services.ad_sampler import AliasSampler
+
+# 자리를 지정하지 않은 광고의 묶음 키: (ad_type, embed_width, embed_height). IMAGE 는 크기를 보지 않는다.
+GroupKey = tuple[str, int | None, int | None]
+
+
+def _group_key(ad: PooledAd) -> GroupKey:
+    if ad.ad_type == "IFRAME":
+        return ad.ad_type, ad.embed_width, ad.embed_height
+    return ad.ad_type, None, None
+
+
+class _CandidatePool:
+    """
+    후보 광고 묶음 하나. 광고가 바뀌면 표만 버리고, 다음 추첨 때 alias 테이블을 다시 만든다.
+    (변경이 몰려도 추첨 전까지는 다시 만들지 않는다)
+    """
+    __slots__ = ("ads", "_sampler", "_total")
+
+    def __init__(self):
+        self.ads: dict[int, PooledAd] = {}
+        self._sampler: AliasSampler[PooledAd] | None = None
+        self._total = 0
+
+    def put(self, ad: PooledAd) -> None:
+        self.ads[ad.id] = ad
+        self._sampler = None
+
+    def discard(self, ad_id: int) -> None:
+        if self.ads.pop(ad_id, None) is not None:
+            self._sampler = None
+
+    def _build(self) -> AliasSampler[PooledAd]:
+        ads = tuple(self.ads.values())
+        self._sampler = AliasSampler(ads, [ad.weight for ad in ads])
+        self._total = sum(ad.weight for ad in ads if ad.weight > 0)
+        return self._sampler
+
+    @property
+    def sampler(self) -> AliasSampler[PooledAd]:
+        if self._sampler is None:
+            return self._build()
+        return self._sampler
+
+    @property
+    def total_weight(self) -> int:
+        if self._sampler is None:
+            self._build()
+        return self._total
+
+
+class PlacementIndex:
+    """
+    광고 자리(placement) → 후보 광고 역색인. GET /api/public/ad?site=&slot= 용.
+
+    [구조]
+    - (site, slot) → 자리: dict 조회 한 번
+    - 자리를 지정한 광고: 자리 id → 후보 묶음. 지정한 자리 중 종류/크기가 맞는 자리에만 넣는다.
+    - 자리를 지정하지 않은 광고: (ad_type, embed 크기) 묶음에 한 번만 넣는다.
+      자리마다 맞는 묶음 목록을 캐시해 두므로, 자리가 수천 개여도 광고를 자리 수만큼 복제하지 않는다.
+      (메모리/갱신 비용이 자리 수가 아니라 광고 수에 비례)
+    - 추첨: 자리의 후보 묶음들 중 총 weight 비율로 묶음 하나를 고르고, 그 묶음의 alias 테이블에서 하나를 고른다.
+      전체 광고에서 weight 비율대로 고르는 것과 같은 분포이고, 광고를 하나하나 걸러 보지 않는다.
+
+    ad_pool 리스너로 등록되어 광고 풀과 같은 시점에 갱신된다.
+    노출 기간 안인 광고(snapshot.live)만 색인하므로, 기간 경계에 광고 풀이 알려 주는 광고도 같은 방식으로 넣고 뺀다.
+    자리 정보는 전체 재적재 때만 바뀐다. (자리 추가/수정은 ad_catalog.publish_reload 로 전체 재적재를 요청)
+    """
+
+    def __init__(self):
+        self._by_key: dict[tuple[str, str], PooledPlacement] = {}
+        self._by_id: dict[int, PooledPlacement] = {}
+        # 광고 id → 현재 색인된 광고 (바뀐 광고를 이전 위치에서 빼는 용도)
+        self._ads: dict[int, PooledAd] = {}
+        self._targeted: dict[int, _CandidatePool] = {}
+        self._groups: dict[GroupKey, _CandidatePool] = {}
+        # 자리 id → 종류/크기가 맞는 미지정 광고 묶음들. 묶음이 새로 생기면 비운다.
+        self._group_cache: dict[int, tuple[_CandidatePool, ...]] = {}
+        self.ready = False
+
+        self.lookups = 0
+        self.unknown = 0
+        self.empty = 0
+        self.last_build_ms: float | None = None
+
+    # -------------------------
+    # 색인
+    # -------------------------
+    def _add(self, ad: PooledAd) -> None:
+        self._ads[ad.id] = ad
+        if ad.placement_ids:
+            for placement_id in ad.placement_ids:
+                placement = self._by_id.get(placement_id)
+                if placement is None or not placement.accepts(ad.ad_type, ad.embed_width, ad.embed_height):
+                    continue
+                pool = self._targeted.get(placement_id)
+                if pool is None:
+                    pool = self._targeted[placement_id] = _CandidatePool()
+                pool.put(ad)
+            return
+
+        key = _group_key(ad)
+        pool = self._groups.get(key)
+        if pool is None:
+            pool = self._groups[key] = _CandidatePool()
+            self._group_cache.clear()
+        pool.put(ad)
+
+    def _remove(self, ad_id: int) -> None:
+        ad = self._ads.pop(ad_id, None)
+        if ad is None:
+            return
+        if ad.placement_ids:
+            for placement_id in ad.placement_ids:
+                pool = self._targeted.get(placement_id)
+                if pool is not None:
+                    pool.discard(ad_id)
+            return
+        pool = self._groups.get(_group_key(ad))
+        if pool is not None:
+            pool.discard(ad_id)
+
+    def build(self, placements: tuple[PooledPlacement, ...], ads: Iterable[PooledAd]) -> None:
+        start = time.perf_counter()
+        self._by_key = {(p.site, p.slot): p for p in placements}
+        self._by_id = {p.id: p for p in placements}
+        self._ads = {}
+        self._targeted = {}
+        self._groups = {}
+        self._group_cache = {}
+        for ad in ads:
+            self._add(ad)
+        self.ready = True
+        self.last_build_ms = (time.perf_counter() - start) * 1000
+
+    def on_pool_change(
+        self,
+        snapshot: AdSnapshot | None,
+        upserts: tuple[PooledAd, ...] | None,
+        removed_ids: tuple[int, ...],
+    ) -> None:
+        if upserts is None:
+            self.build(snapshot.placements, snapshot.live.values())
+            return
+        if not self.ready or snapshot is None:
+            return
+        for ad_id in removed_ids:
+            self._remove(ad_id)
+        for ad in upserts:
+            self._remove(ad.id)
+            if ad.id in snapshot.live:
+                self._add(ad)
+
+    # -------------------------
+    # 조회
+    # -------------------------
+    def placement(self, site: str, slot: str) -> PooledPlacement | None:
+        placement = self._by_key.get((site, slot))
+        if placement is None:
+            self.unknown += 1
+        return placement
+
+    def _pools(self, placement: PooledPlacement) -> tuple[_CandidatePool, ...]:
+        groups = self._group_cache.get(placement.id)
+        if groups is None:
+            groups = self._group_cache[placement.id] = tuple(
+                pool for key, pool in self._groups.items() if placement.accepts(*key)
+            )
+        targeted = self._targeted.get(placement.id)
+        return (targeted, *groups) if targeted is not None else groups
+
+    @staticmethod
+    def _sample(pools: tuple[_CandidatePool, ...], weights: list[int], total: int) -> PooledAd | None:
+        r = random.random() * total
+        for pool, weight in zip(pools, weights):
+            if r < weight:
+                return pool.sampler.sample()
+            r -= weight
+        # 부동소수 오차로 끝까지 온 경우
+        return None
+
+    def pick(self, placement: PooledPlacement) -> PooledAd | None:
+        """자리에 맞는 광고를 weight 비율대로 하나 고른다. 후보가 없으면 None."""
+        picked = self.pick_many(placement, 1)
+        return picked[0] if picked else None
+
+    def pick_many(self, placement: PooledPlacement, count: int) -> list[PooledAd]:
+        """자리에 맞는 서로 다른 광고를 weight 비율대로 최대 count 개 고른다. (AdPool.pick_many 와 같은 방식)"""
+        self.lookups += 1
+        pools = self._pools(placement)
+        weights = [pool.total_weight for pool in pools]
+        total = sum(weights)
+        if total <= 0:
+            self.empty += 1
+            return []
+
+        count = min(count, sum(len(pool.sampler) for pool in pools))
+        picked: dict[int, PooledAd] = {}
+        for _ in range(count * 8):
+            if len(picked) >= count:
+                break
+            ad = self._sample(pools, weights, total)
+            if ad is not None:
+                picked.setdefault(ad.id, ad)
+        return list(picked.values())
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "placements": len(self._by_id),
+            "targeted_ads": sum(1 for ad in self._ads.values() if ad.placement_ids),
+            "untargeted_groups": len(self._groups),
+            "lookups": self.lookups,
+            "unknown_placement": self.unknown,
+            "empty": self.empty,
+            "last_build_ms": self.last_build_ms,
+        }
+
+
+# 워커 단위 전역 인스턴스
+placement_index = PlacementIndex()
+ad_pool.add_listener(placement_index.on_pool_change)
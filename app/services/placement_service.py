@@ -0,0 +1,76 @@
+# app/services/placement_service.py
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.placement import Placement
+from app.schemas.placement import PlacementCreate
+from app.services.ad_catalog_sync import ad_catalog
+
+
+class PlacementService:
+    """
+    광고 자리(placement) 관리.
+    자리는 자주 바뀌지 않으므로 변경 후에는 광고 필드 단위 이벤트 대신 전체 재적재를 요청한다.
+    (모든 워커가 광고 풀과 함께 placement_index 를 다시 만든다)
+    """
+
+    @staticmethod
+    async def list_placements(db: AsyncSession, site: str | None = None):
+        query = select(Placement).where(Placement.is_active == True)
+        if site:
+            query = query.where(Placement.site == site)
+        result = await db.execute(query.order_by(Placement.site, Placement.slot))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_placement(db: AsyncSession, placement_id: int):
+        result = await db.execute(select(Placement).where(Placement.id == placement_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def create_placement(db: AsyncSession, dto: PlacementCreate):
+        placement = await db.scalar(
+            select(Placement).where(Placement.site == dto.site, Placement.slot == dto.slot)
+        )
+        if placement is not None and placement.is_active:
+            raise HTTPException(status_code=409, detail="이미 등록된 광고 자리입니다.")
+
+        if placement is None:
+            placement = Placement(site=dto.site, slot=dto.slot)
+            db.add(placement)
+        # 삭제(비활성)된 같은 자리가 있으면 id 를 그대로 살려 쓴다. (광고의 placement_ids 가 다시 이어진다)
+        placement.width = dto.width
+        placement.height = dto.height
+        placement.ad_types = ",".join(dict.fromkeys(dto.ad_types))
+        placement.is_active = True
+
+        try:
+            await db.commit()
+        except IntegrityError:
+            # 동시에 같은 (site, slot) 을 등록한 요청이 먼저 커밋했다. (unique 키)
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="이미 등록된 광고 자리입니다.")
+        await db.refresh(placement)
+        await ad_catalog.publish_reload()
+        return placement
+
+    @staticmethod
+    async def update_placement(db: AsyncSession, placement: Placement, update_data: dict):
+        for key in ("width", "height"):
+            if key in update_data:
+                setattr(placement, key, update_data[key])
+        if update_data.get("ad_types"):
+            placement.ad_types = ",".join(dict.fromkeys(update_data["ad_types"]))
+
+        await db.commit()
+        await db.refresh(placement)
+        await ad_catalog.publish_reload()
+        return placement
+
+    @staticmethod
+    async def delete_placement(db: AsyncSession, placement: Placement):
+        placement.is_active = False
+        await db.commit()
+        await ad_catalog.publish_reload()
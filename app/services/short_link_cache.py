@@ -0,0 +1,188 @@
+# app/services/short_link_cache.py
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.short_link import ShortLink
+
+log = logging.getLogger("short_link_cache")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    캐시 키로 쓸 URL 정규화.
+    - 앞뒤 공백 제거, scheme/host 소문자화
+    - 기본 포트(:80, :443) 제거, 빈 path 는 "/" 로
+    - fragment(#...) 제거 (서버로 전달되지 않으므로 같은 목적지)
+    쿼리스트링은 제휴 파라미터 순서까지 의미가 있을 수 있어 그대로 둔다.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{userinfo}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def _url_hash(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """같은 URL 을 먼저 단축하던 요청이 취소됨. 기다리던 요청은 다시 조회한다."""
+
+
+class ShortLinkCache:
+    """
+    target_url → buly 단축링크 캐시 (메모리 LRU + short_links 테이블).
+
+    [조회 순서]
+    1. 워커 메모리 LRU
+    2. short_links 테이블 (url_hash unique 인덱스 1회 조회)
+    3. 둘 다 없으면 buly 호출. 같은 URL 에 대한 동시 요청은 하나의 호출로 합친다(coalescing).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lru: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _remember(self, key: str, short_url: str) -> None:
+        self._lru[key] = short_url
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    def _from_memory(self, key: str) -> str | None:
+        short_url = self._lru.get(key)
+        if short_url is not None:
+            self._lru.move_to_end(key)
+            self.memory_hits += 1
+        return short_url
+
+    async def _from_db(self, db: AsyncSession, key: str) -> str | None:
+        short_url = await db.scalar(
+            select(ShortLink.short_url).where(ShortLink.url_hash == _url_hash(key))
+        )
+        if short_url is not None:
+            self.db_hits += 1
+            self._remember(key, short_url)
+        return short_url
+
+    async def lookup(self, db: AsyncSession, url: str | None) -> str | None:
+        """
+        네트워크 호출 없이 캐시에서만 찾는다. (광고 생성/수정 요청 경로용)
+        없으면 None → 호출부는 백그라운드 단축 작업을 예약한다.
+        """
+        if not url:
+            return None
+        key = normalize_url(url)
+        return self._from_memory(key) or await self._from_db(db, key)
+
+    async def _store(self, db: AsyncSession, key: str, short_url: str) -> str:
+        db.add(ShortLink(url_hash=_url_hash(key), target_url=key, short_url=short_url))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # 다른 워커가 먼저 저장했으면 그쪽 값을 따른다.
+            await db.rollback()
+            existing = await db.scalar(
+                select(ShortLink.short_url).where(ShortLink.url_hash == _url_hash(key))
+            )
+            short_url = existing or short_url
+        self._remember(key, short_url)
+        return short_url
+
+    async def get_or_create(
+        self,
+        url: str,
+        create: Callable[[str], Awaitable[str | None]],
+        wait_inflight: bool = True,
+    ) -> str | None:
+        """
+        캐시에 있으면 그대로, 없으면 create(url) 로 만들어서 저장 후 반환한다.
+        같은 URL 로 동시에 들어온 요청은 먼저 시작한 호출의 결과를 함께 기다린다.
+        wait_inflight=False 면 기다리지 않고 None 을 반환한다. (먼저 시작한 호출이 재시도 중일 수 있으므로)
+
+        DB 세션은 조회/저장할 때만 짧게 연다. create(url) 은 buly 호출(재시도/백오프/서킷 대기 포함)이라
+        그동안 커넥션을 붙잡고 있으면 단축 작업 수만큼 커넥션 풀이 묶인다.
+        """
+        key = normalize_url(url)
+        while True:
+            short_url = self._from_memory(key)
+            if short_url is not None:
+                return short_url
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            if not wait_inflight:
+                return None
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                # 먼저 시작한 요청이 취소됐다. 이 요청은 실패시키지 않고 처음부터 다시 조회한다.
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with AsyncSessionLocal() as db:
+                short_url = await self._from_db(db, key)
+            if short_url is None:
+                self.misses += 1
+                short_url = await create(url)
+                if short_url and short_url != url:
+                    async with AsyncSessionLocal() as db:
+                        short_url = await self._store(db, key, short_url)
+            future.set_result(short_url)
+            return short_url
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 쪽이 없으면 "Future exception was never retrieved" 경고가 나므로 소비해둔다.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        total = hits + self.misses
+        return {
+            "size": len(self._lru),
+            "max_size": self.max_size,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (hits / total) if total else None,
+        }
+
+
+# 워커 단위 전역 인스턴스
+short_link_cache = ShortLinkCache(max_size=settings.short_link_cache_size)
@@ -0,0 +1,372 @@
+# app/services/short_url_worker.py
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+
+import httpx
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_client
+from app.models.ad import Ad
+from app.services.ad_catalog_sync import ad_catalog
+from app.services.short_link_cache import normalize_url, short_link_cache
+
+log = logging.getLogger("short_url_worker")
+
+# 여러 워커가 동시에 기동해도 backfill 은 한 워커만 수행하도록 잡는 Redis 락
+BACKFILL_LOCK_KEY = "short_url:backfill_lock"
+# buly 가 명시적으로 거절한 URL 표시 (short_url:rejected:<정규화 URL sha256>). backfill 이 다시 넣지 않는다.
+REJECTED_KEY_PREFIX = "short_url:rejected:"
+
+
+def _rejected_key(url: str) -> str:
+    return REJECTED_KEY_PREFIX + hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class ShortUrlRetryableError(Exception):
+    """네트워크 오류, 타임아웃, 5xx 등 다시 시도하면 성공할 수 있는 실패."""
+
+
+class CircuitBreaker:
+    """
+    buly 장애 시 계속 두드리지 않도록 막아주는 서킷 브레이커.
+
+    - closed   : 정상. 연속 실패가 failure_threshold 에 도달하면 open 으로 전환.
+    - open     : reset_timeout 동안 호출을 막는다.
+    - half-open: reset_timeout 이 지나면 한 번 시험 호출을 허용하고,
+                 성공하면 closed, 실패하면 다시 open.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """open 상태가 풀릴 때까지 남은 시간(초)."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            # half-open 시험 호출이 실패했거나 임계치 도달 → (다시) open
+            self.opened_at = time.monotonic()
+
+
+class ShortUrlWorker:
+    """
+    광고 생성/수정 요청 경로에서 buly 호출을 떼어낸 백그라운드 단계.
+
+    [동작 개요]
+    1. AdService 는 short_url = target_url 로 광고를 먼저 저장하고 enqueue() 만 호출한다.
+    2. 워커 태스크들이 큐에서 (ad_id, target_url) 을 꺼내
+       재사용되는 httpx.AsyncClient(커넥션 풀)로 buly 를 호출한다.
+    3. 재시도 가능한 실패는 지수 백오프(+지터)로 max_retries 번까지 다시 시도하고,
+       연속 실패가 쌓이면 서킷 브레이커가 열려 일정 시간 호출을 멈춘다.
+    4. 성공하면 target_url 이 그대로인 경우에만 short_url 을 갱신하고, 광고 풀에 변경을 알린다.
+    5. buly 가 거절한 URL 은 Redis 에 reject_ttl 동안 표시해 두고, 기동 시 backfill 에서 건너뛴다.
+       (재시도 소진 같은 일시적 실패는 표시하지 않으므로 다음 기동 때 다시 시도된다)
+
+    api_url / transport 를 주입할 수 있어서 로컬 stub HTTP 서버나
+    httpx.MockTransport 를 상대로 그대로 돌려볼 수 있다.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        timeout: float,
+        breaker: CircuitBreaker,
+        queue_size: int,
+        reject_ttl: int,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_url = api_url
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.breaker = breaker
+        self.queue_size = queue_size
+        self.reject_ttl = reject_ttl
+        self._transport = transport
+
+        self._queue: asyncio.Queue | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._tasks: list[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.breaker_rejections = 0
+        self.rejected = 0
+        self.backfill_skipped = 0
+
+    # -------------------------
+    # buly 호출
+    # -------------------------
+    async def _mark_rejected(self, org_url: str) -> None:
+        """buly 가 거절한 URL 을 표시한다. 표시에 실패해도 단축 결과(None)에는 영향이 없다."""
+        self.rejected += 1
+        try:
+            await redis_client.set(_rejected_key(org_url), "1", ex=self.reject_ttl)
+        except Exception:
+            log.warning(f"Failed to mark rejected short url: {org_url}", exc_info=True)
+
+    async def shorten(self, org_url: str) -> str | None:
+        """
+        buly 단축링크 생성 (1회 시도).
+        - 재시도 가능한 실패는 ShortUrlRetryableError 로 올린다.
+        - buly 가 명시적으로 거절한 경우(4xx, result != "Y")는 거절 표시를 남기고 None 을 반환한다.
+        """
+        payload = {
+            "customer_id": settings.buly_customer_id,
+            "partner_api_id": settings.buly_partner_api_id,
+            "org_url": org_url,
+        }
+
+        try:
+            # x-www-form-urlencoded 이므로 data= 사용
+            resp = await self._client.post(self.api_url, data=payload)
+        except httpx.HTTPError as e:
+            raise ShortUrlRetryableError(str(e)) from e
+
+        if resp.status_code >= 500 or resp.status_code == 429:
+            raise ShortUrlRetryableError(f"buly status {resp.status_code}")
+        if resp.status_code >= 400:
+            log.warning(f"Buly shorturl rejected: status={resp.status_code}")
+            await self._mark_rejected(org_url)
+            return None
+
+        try:
+            # 일부 환경에서 문자열로 내려올 수도 있으니 방어적으로 처리
+            data = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else json.loads(resp.text)
+        except ValueError as e:
+            raise ShortUrlRetryableError("buly invalid response") from e
+
+        if not isinstance(data, dict):
+            raise ShortUrlRetryableError("buly unexpected response")
+
+        # 예시: {"result":"Y","message":"성공적으로 생성하였습니다.","url":"https://buly.kr/uRIBxG"}
+        if data.get("result") == "Y":
+            return data.get("url")
+
+        log.warning(f"Buly shorturl failed: {data}")
+        await self._mark_rejected(org_url)
+        return None
+
+    async def shorten_with_retry(self, org_url: str) -> str | None:
+        """백오프 재시도 + 서킷 브레이커를 적용한 단축 호출. 최종 실패 시 None."""
+        for attempt in range(self.max_retries + 1):
+            while not self.breaker.allow():
+                self.breaker_rejections += 1
+                await asyncio.sleep(max(self.breaker.retry_after(), 0.1))
+
+            try:
+                short_url = await self.shorten(org_url)
+                self.breaker.record_success()
+                return short_url
+            except ShortUrlRetryableError as e:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    log.warning(f"Buly shorturl gave up after {attempt + 1} attempts: {e}")
+                    return None
+                self.retries += 1
+                delay = self.backoff_base * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+            except BaseException:
+                # 예상 밖 예외나 취소로 빠져나가도 기록은 남긴다.
+                # (half-open 시험 호출 표시가 남으면 이후 호출이 전부 allow() 에서 멈춘다)
+                self.breaker.record_failure()
+                raise
+        return None
+
+    @property
+    def is_running(self) -> bool:
+        """start() 로 HTTP 클라이언트가 준비됐는지 (shorten 을 직접 호출할 수 있는지)."""
+        return self._client is not None
+
+    # -------------------------
+    # 큐 / 워커
+    # -------------------------
+    def enqueue(self, ad_id: int, target_url: str | None) -> bool:
+        """
+        단축 작업을 큐에 넣는다. 요청 경로에서 호출되므로 절대 기다리지 않는다.
+        큐가 가득 찼으면 버리고 False (다음 기동 시 backfill 이 다시 채운다).
+        """
+        if not target_url or self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait((ad_id, target_url))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            log.warning(f"Short url queue full, dropped ad_id={ad_id}")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _apply(self, ad_id: int, target_url: str, short_url: str) -> None:
+        async with AsyncSessionLocal() as db:
+            # 그 사이 target_url 이 바뀌었다면 이전 URL 의 단축링크로 덮어쓰지 않는다.
+            result = await db.execute(
+                update(Ad)
+                .where(Ad.id == ad_id, Ad.target_url == target_url)
+                .values(short_url=short_url)
+            )
+            await db.commit()
+            if result.rowcount:
+                ad = await db.scalar(select(Ad).where(Ad.id == ad_id))
+                if ad is not None:
+                    await ad_catalog.notify(ad)
+
+    async def _run(self) -> None:
+        while True:
+            ad_id, target_url = await self._queue.get()
+            try:
+                # 같은 target_url 은 캐시(메모리 LRU → short_links 테이블)를 먼저 보고,
+                # 동시에 같은 URL 이 들어와도 buly 호출은 한 번만 일어난다.
+                short_url = await short_link_cache.get_or_create(target_url, self.shorten_with_retry)
+                if short_url and short_url != target_url:
+                    await self._apply(ad_id, target_url, short_url)
+                    self.succeeded += 1
+                else:
+                    self.failed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failed += 1
+                log.exception(f"Short url job failed: ad_id={ad_id}")
+            finally:
+                self._queue.task_done()
+
+    async def backfill(self) -> int:
+        """
+        아직 단축되지 않은(short_url == target_url) 활성 IMAGE 광고를 다시 큐에 넣는다.
+        프로세스 재시작으로 큐가 유실돼도 기동 시점에 복구된다.
+        buly 가 이미 거절한 URL(거절 표시가 남아 있는 것)은 기동할 때마다 다시 두드리지 않도록 건너뛴다.
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Ad.id, Ad.target_url).where(
+                    Ad.is_active == True,
+                    Ad.target_url.is_not(None),
+                    Ad.short_url == Ad.target_url,
+                )
+            )
+            rows = result.all()
+
+        count = 0
+        for i in range(0, len(rows), 1000):
+            chunk = rows[i:i + 1000]
+            rejected = await redis_client.mget([_rejected_key(target_url) for _, target_url in chunk])
+            for (ad_id, target_url), mark in zip(chunk, rejected):
+                if mark is not None:
+                    self.backfill_skipped += 1
+                    continue
+                if self.enqueue(ad_id, target_url):
+                    count += 1
+        return count
+
+    async def _backfill_safely(self) -> None:
+        try:
+            if not await redis_client.set(BACKFILL_LOCK_KEY, "1", nx=True, ex=60):
+                return
+            await self.backfill()
+        except Exception:
+            log.exception("Short url backfill failed")
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+        )
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._backfill_safely()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._queue = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "breaker_state": self.breaker.state,
+            "breaker_rejections": self.breaker_rejections,
+            "rejected": self.rejected,
+            "backfill_skipped": self.backfill_skipped,
+            "cache": short_link_cache.stats(),
+        }
+
+
+# 워커 단위 전역 인스턴스
+short_url_worker = ShortUrlWorker(
+    api_url=settings.buly_api_url,
+    concurrency=settings.short_url_concurrency,
+    max_retries=settings.short_url_max_retries,
+    backoff_base=settings.short_url_backoff_seconds,
+    timeout=settings.buly_timeout_seconds,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.short_url_breaker_failures,
+        reset_timeout=settings.short_url_breaker_reset_seconds,
+    ),
+    queue_size=settings.short_url_queue_size,
+    reject_ttl=settings.short_url_reject_ttl_seconds,
+)
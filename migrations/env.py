@@ -0,0 +1,55 @@
+# migrations/env.py
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.database import DATABASE_URL
+from app.models import Base
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# autogenerate 비교 대상 (app.models 에서 모든 모델을 import 한 Base)
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    """기본은 .env 설정의 DB. `alembic -x db_url=sqlite:///local.db upgrade head` 로 바꿀 수 있다."""
+    return context.get_x_argument(as_dictionary=True).get("db_url", DATABASE_URL)
+
+
+def run_migrations_offline() -> None:
+    """DB 에 붙지 않고 SQL 만 출력 (alembic upgrade head --sql)"""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(_database_url(), poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite 는 ALTER TABLE 이 제한적이라 batch 모드로 테이블을 다시 만든다.
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
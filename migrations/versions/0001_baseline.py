@@ -0,0 +1,57 @@
+"""baseline: admin_users, ads (create_all 로 만들던 최초 스키마)
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "admin_users",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("login_id", sa.String(length=100), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_admin_users_login_id", "admin_users", ["login_id"], unique=True)
+
+    op.create_table(
+        "ads",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("ad_type", sa.String(length=20), server_default="IMAGE", nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("image_url", sa.String(length=500), nullable=True),
+        sa.Column("target_url", sa.String(length=1000), nullable=True),
+        sa.Column("short_url", sa.String(length=500), nullable=True),
+        sa.Column("embed_src", sa.String(length=2000), nullable=True),
+        sa.Column("embed_width", sa.Integer(), nullable=True),
+        sa.Column("embed_height", sa.Integer(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), server_default="1", nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("ads")
+    op.drop_index("ix_admin_users_login_id", table_name="admin_users")
+    op.drop_table("admin_users")
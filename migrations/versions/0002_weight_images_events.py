@@ -0,0 +1,65 @@
+"""ads.weight / 이미지 파생본 컬럼, short_links, ad_events
+
+Revision ID: 0002_weight_images_events
+Revises: 0001_baseline
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_weight_images_events"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.add_column(sa.Column("image_width", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("image_height", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("image_variants", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("weight", sa.Integer(), server_default="1", nullable=False))
+
+    op.create_table(
+        "short_links",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("url_hash", sa.String(length=64), nullable=False),
+        sa.Column("target_url", sa.String(length=1000), nullable=False),
+        sa.Column("short_url", sa.String(length=500), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_short_links_url_hash", "short_links", ["url_hash"], unique=True)
+
+    op.create_table(
+        "ad_events",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), autoincrement=True, nullable=False),
+        sa.Column("stream_id", sa.String(length=32), nullable=False),
+        sa.Column("seq", sa.SmallInteger(), nullable=False),
+        sa.Column("ad_id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=10), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("stream_id", "seq", name="uq_ad_events_stream_seq"),
+    )
+    op.create_index("ix_ad_events_ad_occurred", "ad_events", ["ad_id", "occurred_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ad_events_ad_occurred", table_name="ad_events")
+    op.drop_table("ad_events")
+    op.drop_index("ix_short_links_url_hash", table_name="short_links")
+    op.drop_table("short_links")
+
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.drop_column("weight")
+        batch_op.drop_column("image_variants")
+        batch_op.drop_column("image_height")
+        batch_op.drop_column("image_width")
@@ -0,0 +1,35 @@
+"""ads 조회 경로용 복합 인덱스
+
+- ix_ads_active_created (is_active, created_at, id)
+  관리자 목록 WHERE is_active = 1 ORDER BY created_at DESC, id DESC LIMIT n
+  offset / 커서 방식 모두 정렬(filesort) 없이 인덱스 순서대로 읽는다. 건수 쿼리도 이 인덱스만 읽는다.
+- ix_ads_active_weight (is_active, weight)
+  공개 광고 DB 폴백 WHERE is_active = 1 AND weight > 0
+
+Revision ID: 0003_ads_hot_indexes
+Revises: 0002_weight_images_events
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_ads_hot_indexes"
+down_revision: Union[str, Sequence[str], None] = "0002_weight_images_events"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_ads_active_created", "ads", ["is_active", "created_at", "id"])
+    op.create_index("ix_ads_active_weight", "ads", ["is_active", "weight"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ads_active_weight", table_name="ads")
+    op.drop_index("ix_ads_active_created", table_name="ads")
@@ -0,0 +1,45 @@
+"""광고 자리(placements) + ads.placement_ids
+
+Revision ID: 0004_placements
+Revises: 0003_ads_hot_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_placements"
+down_revision: Union[str, Sequence[str], None] = "0003_ads_hot_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "placements",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("site", sa.String(length=100), nullable=False),
+        sa.Column("slot", sa.String(length=100), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=True),
+        sa.Column("height", sa.Integer(), nullable=True),
+        sa.Column("ad_types", sa.String(length=40), server_default="IMAGE,IFRAME", nullable=False),
+        sa.Column("is_active", sa.Boolean(), server_default="1", nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("site", "slot", name="uq_placements_site_slot"),
+    )
+
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.add_column(sa.Column("placement_ids", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.drop_column("placement_ids")
+    op.drop_table("placements")
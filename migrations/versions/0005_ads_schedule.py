@@ -0,0 +1,32 @@
+"""ads.start_at / ads.end_at (노출 기간)
+
+Revision ID: 0005_ads_schedule
+Revises: 0004_placements
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_ads_schedule"
+down_revision: Union[str, Sequence[str], None] = "0004_placements"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.add_column(sa.Column("start_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("end_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.drop_column("end_at")
+        batch_op.drop_column("start_at")
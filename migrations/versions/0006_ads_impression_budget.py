@@ -0,0 +1,34 @@
+"""ads.daily_impression_cap / total_impression_cap / pacing (노출 예산)
+
+Revision ID: 0006_ads_impression_budget
+Revises: 0005_ads_schedule
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_ads_impression_budget"
+down_revision: Union[str, Sequence[str], None] = "0005_ads_schedule"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.add_column(sa.Column("daily_impression_cap", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("total_impression_cap", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("pacing", sa.Boolean(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("ads") as batch_op:
+        batch_op.drop_column("pacing")
+        batch_op.drop_column("total_impression_cap")
+        batch_op.drop_column("daily_impression_cap")
@@ -38,6 +38,8 @@ document.addEventListener("DOMContentLoaded", () => {
   const embedSrcInput = document.getElementById("embed_src");
   const embedWInput = document.getElementById("embed_width");
   const embedHInput = document.getElementById("embed_height");
+  // 가중치 칸을 비우면 서버 기본값과 같은 1 로 보낸다. (0 은 "노출 안 함" 이라 직접 입력했을 때만)
+  const weightInput = document.getElementById("weight");
 
   const targetRow = document.getElementById("target-row");
   const imageRow = document.getElementById("image-row");
@@ -88,11 +90,13 @@ document.addEventListener("DOMContentLoaded", () => {
                 embed_src: embedSrcInput.value,
                 embed_width: Number(embedWInput.value || 300),
                 embed_height: Number(embedHInput.value || 250),
+                weight: Number(weightInput.value || 1),
               }
             : {
                 title: titleInput.value,
                 description: descInput.value,
                 target_url: urlInput.value,
+                weight: Number(weightInput.value || 1),
               };
 
         await apiFetch(`/api/admin/ads/${adId}`, {
@@ -114,6 +118,7 @@ document.addEventListener("DOMContentLoaded", () => {
           embed_src: embedSrcInput.value,
           embed_width: Number(embedWInput.value || 300),
           embed_height: Number(embedHInput.value || 250),
+          weight: Number(weightInput.value || 1),
         };
 
         const created = await apiFetch("/api/admin/ads/iframe", {
@@ -129,6 +134,7 @@ document.addEventListener("DOMContentLoaded", () => {
         fd.append("title", titleInput.value);
         fd.append("description", descInput.value);
         fd.append("target_url", urlInput.value);
+        fd.append("weight", weightInput.value || "1");
 
         if (!imageInput.files[0]) throw new Error("이미지를 선택해줘.");
         fd.append("image", imageInput.files[0]);
@@ -155,6 +161,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
       titleInput.value = ad.title ?? "";
       descInput.value = ad.description ?? "";
+      weightInput.value = ad.weight ?? 1;
 
       if (t === "IFRAME") {
         embedSrcInput.value = ad.embed_src ?? "";